@@ -0,0 +1,189 @@
+"""
+Bot handlerlari uchun ma'lumotlar qatlami.
+
+Har bir funksiya sinxron bo'lib, handler uni bitta
+``await sync_to_async(...)()`` bilan chaqiradi: kerakli barcha obyektlar
+select_related bilan bitta thread-pool sakrashida yuklanadi va oddiy
+dataclass sifatida qaytariladi, shuning uchun handlerda lazy FK so'rovlari
+bo'lmaydi.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from django.db import models, transaction
+
+from set_main.models import BallPricing, CustomUser, DriverApplication, Order
+
+from .user_cache import user_profiles
+
+
+# Buyurtma turi -> BallPricing.service_type
+ORDER_PRICING = {
+    'taxi': 'taxi_parcel',
+    'parcel': 'taxi_parcel',
+    'cargo': 'cargo',
+}
+
+# Buyurtma turi -> Order'dagi qo'shimcha maydon va uning standart qiymati
+ORDER_DETAILS = {
+    'taxi': ('passengers', 1),
+    'parcel': ('parcel_content', 'Mavjud emas'),
+    'cargo': ('cargo_details', 'Mavjud emas'),
+}
+
+
+@dataclass
+class DriverInfo:
+    pk: int
+    telegram_id: int
+    role: str
+    balls: int
+    full_name: str
+    phone: str
+    language: str
+
+
+@dataclass
+class ClientInfo:
+    telegram_id: int
+    full_name: str
+    phone: str
+
+
+@dataclass
+class CarInfo:
+    full_name: str
+    phone: str
+    car_model: str
+    car_number: str
+    car_year: Optional[int]
+    car_photo_file_id: Optional[str]
+
+    def describe(self, icon: str) -> str:
+        """Mijozga yuboriladigan mashina qatori"""
+        text = f"{icon} {self.car_model} ({self.car_number})"
+        if self.car_year:
+            text += f" - {self.car_year} yil"
+        return text
+
+
+@dataclass
+class OrderInfo:
+    pk: int
+    status: str
+    client: ClientInfo
+    from_location: str
+    to_location: str
+    travel_date: str
+    details: object
+    comment: str
+
+
+@dataclass
+class OrderAcceptance:
+    driver: Optional[DriverInfo]
+    order: Optional[OrderInfo]
+    car: Optional[CarInfo]
+    ball_cost: int
+
+
+def _driver_info(user) -> DriverInfo:
+    return DriverInfo(
+        pk=user.pk,
+        telegram_id=user.telegram_id,
+        role=user.role,
+        balls=user.balls,
+        full_name=user.full_name,
+        phone=user.phone,
+        language=user.language,
+    )
+
+
+def _car_info(driver_app) -> Optional[CarInfo]:
+    if driver_app is None:
+        return None
+    return CarInfo(
+        full_name=driver_app.full_name,
+        phone=driver_app.phone,
+        car_model=driver_app.car_model,
+        car_number=driver_app.car_number,
+        car_year=driver_app.car_year,
+        car_photo_file_id=getattr(driver_app, 'car_photo_file_id', None),
+    )
+
+
+def _ball_cost(order_type: str, details) -> int:
+    """Buyurtma turi bo'yicha ball narxi (taksi uchun yo'lovchilar soniga qarab)"""
+    pricing = BallPricing.objects.filter(service_type=ORDER_PRICING[order_type], is_active=True).first()
+    if order_type == 'taxi':
+        return pricing.calculate_price(details) if pricing else details
+    return pricing.calculate_price() if pricing else 1
+
+
+def load_order_acceptance(order_id, driver_telegram_id: int, order_type: str) -> OrderAcceptance:
+    """
+    Haydovchi buyurtmani qabul qilishi uchun kerak bo'lgan hamma narsa:
+    haydovchi, buyurtma va mijoz, haydovchi arizasi va ball narxi.
+    Topilmagan obyektlar None bo'ladi.
+    """
+    user = CustomUser.objects.filter(telegram_id=driver_telegram_id).first()
+    if user is None:
+        return OrderAcceptance(driver=None, order=None, car=None, ball_cost=0)
+
+    order = Order.objects.select_related('client').filter(pk=order_id).first()
+    if order is None:
+        return OrderAcceptance(driver=_driver_info(user), order=None, car=None, ball_cost=0)
+
+    field, default = ORDER_DETAILS[order_type]
+    details = getattr(order, field, default)
+    client = order.client
+    order_info = OrderInfo(
+        pk=order.pk,
+        status=order.status,
+        client=ClientInfo(
+            telegram_id=client.telegram_id,
+            full_name=client.full_name,
+            phone=client.phone or "Kiritilmagan",
+        ),
+        from_location=order.from_location,
+        to_location=order.to_location,
+        travel_date=order.date.strftime('%d.%m.%Y') if order.date else '',
+        details=details,
+        comment=order.description or "Yo'q",
+    )
+    driver_app = DriverApplication.objects.filter(user=user).first()
+    return OrderAcceptance(
+        driver=_driver_info(user),
+        order=order_info,
+        car=_car_info(driver_app),
+        ball_cost=_ball_cost(order_type, details),
+    )
+
+
+def claim_order(order_id, driver_id, ball_cost, charge):
+    """
+    Buyurtmani haydovchiga bitta tranzaksiyada biriktiradi: status sharti
+    UPDATE ichida tekshiriladi, ball esa F() orqali yechiladi, shuning uchun
+    bir vaqtda bosgan ikki haydovchidan faqat bittasi yutadi.
+    Natija: 'accepted', 'already_accepted' yoki 'insufficient_balls'.
+    """
+    with transaction.atomic():
+        won = (
+            Order.objects.filter(pk=order_id)
+            .exclude(status='accepted')
+            .update(status='accepted', accepted_driver_id=driver_id)
+        )
+        if not won:
+            return 'already_accepted'
+        if charge:
+            paid = (
+                CustomUser.objects.filter(pk=driver_id, balls__gte=ball_cost)
+                .update(balls=models.F('balls') - ball_cost)
+            )
+            if not paid:
+                transaction.set_rollback(True)
+                return 'insufficient_balls'
+    if charge:
+        # update() signal yubormaydi
+        user_profiles.invalidate_pk(driver_id)
+    return 'accepted'
@@ -0,0 +1,135 @@
+"""
+Bot sozlamalari va kanal obunasi holati keshi.
+
+BotSettings jadvali kichik va kam o'zgaradi, lekin get_bot_setting() har
+chaqiruvda bazaga borardi. settings_snapshot barcha faol sozlamalarni bitta
+so'rov bilan yuklaydi; bot jarayonidagi save/delete uni darhol eskirgan deb
+belgilaydi, admin paneldagi o'zgarishlar SETTINGS_TTL ichida yetib keladi.
+
+/start va menyuga qaytishda get_chat_member har safar Telegram API'ga
+borardi. subscription_cache natijani foydalanuvchi bo'yicha qisqa muddat
+saqlaydi va bir foydalanuvchi uchun bir vaqtdagi so'rovlarni birlashtiradi.
+"""
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+from django.db.models.signals import post_delete, post_save
+
+from set_main.models import BotSettings
+
+from .db_executor import sync_to_async
+
+
+SETTINGS_TTL = 300
+
+# Obuna bo'lganlar uzoqroq, obuna bo'lmaganlar qisqa saqlanadi
+SUBSCRIBED_TTL = 300
+NOT_SUBSCRIBED_TTL = 20
+SUBSCRIBED_STATUSES = ('member', 'administrator', 'creator')
+MAX_STATUSES = 100000
+
+
+class SettingsSnapshot:
+    def __init__(self, ttl: float = SETTINGS_TTL):
+        self.ttl = ttl
+        self._values: Dict[str, str] = {}
+        self._channel: Dict[str, str] = {}
+        self._expires = 0.0
+        self._loading: Optional[asyncio.Future] = None
+
+    def _load(self):
+        values = dict(BotSettings.objects.filter(is_active=True).values_list('key', 'value'))
+        channel = BotSettings.get_channel_settings()
+        return values, channel
+
+    def _loaded(self, loading: asyncio.Future):
+        if self._loading is loading:
+            self._loading = None
+        if not loading.cancelled() and loading.exception() is None:
+            self._values, self._channel = loading.result()
+            self._expires = time.monotonic() + self.ttl
+
+    async def refresh(self):
+        """
+        Sozlamalarni bazadan qayta yuklash (bir vaqtda bitta yuklash).
+        Kutayotganlardan biri bekor qilinsa ham umumiy yuklash davom etadi.
+        """
+        loading = self._loading
+        if loading is None:
+            loading = asyncio.ensure_future(sync_to_async(self._load)())
+            self._loading = loading
+            loading.add_done_callback(self._loaded)
+        await asyncio.shield(loading)
+
+    def invalidate(self):
+        self._expires = 0.0
+
+    async def _ensure(self):
+        if time.monotonic() >= self._expires:
+            await self.refresh()
+
+    async def get(self, key: str, default_value=None):
+        await self._ensure()
+        return self._values.get(key, default_value)
+
+    async def channel_settings(self) -> Dict[str, str]:
+        await self._ensure()
+        return self._channel
+
+
+class SubscriptionCache:
+    def __init__(self):
+        self._statuses: Dict[Tuple[str, int], Tuple[bool, float]] = {}
+        self._pending: Dict[Tuple[str, int], asyncio.Future] = {}
+
+    async def _fetch(self, bot, channel: str, user_id: int) -> bool:
+        member = await bot.get_chat_member(channel, user_id)
+        return member.status in SUBSCRIBED_STATUSES
+
+    async def is_subscribed(self, bot, channel: str, user_id: int, recheck: bool = False) -> bool:
+        """
+        Foydalanuvchi kanalga obuna bo'lganmi. recheck=True bo'lsa "obuna
+        bo'lmagan" natijasi keshdan olinmaydi (foydalanuvchi "Obuna bo'ldim"
+        tugmasini bosganda). API xatolari keshlanmaydi va chaqiruvchiga
+        o'tkaziladi.
+        """
+        key = (channel, user_id)
+        cached = self._statuses.get(key)
+        if cached is not None and cached[1] > time.monotonic() and (cached[0] or not recheck):
+            return cached[0]
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch(bot, channel, user_id))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        subscribed = await asyncio.shield(pending)
+
+        if len(self._statuses) >= MAX_STATUSES:
+            self.purge()
+        ttl = SUBSCRIBED_TTL if subscribed else NOT_SUBSCRIBED_TTL
+        self._statuses[key] = (subscribed, time.monotonic() + ttl)
+        return subscribed
+
+    def forget(self, user_id: int):
+        for key in [key for key in self._statuses if key[1] == user_id]:
+            del self._statuses[key]
+
+    def purge(self):
+        """Muddati o'tgan yozuvlarni tozalash"""
+        now = time.monotonic()
+        for key in [key for key, (_, expires) in self._statuses.items() if expires <= now]:
+            del self._statuses[key]
+
+
+settings_snapshot = SettingsSnapshot()
+subscription_cache = SubscriptionCache()
+
+
+def _invalidate_settings(sender, **kwargs):
+    settings_snapshot.invalidate()
+
+
+post_save.connect(_invalidate_settings, sender=BotSettings, dispatch_uid='settings_snapshot_save')
+post_delete.connect(_invalidate_settings, sender=BotSettings, dispatch_uid='settings_snapshot_delete')
@@ -0,0 +1,42 @@
+"""
+Bot ORM chaqiruvlari uchun alohida thread pool.
+
+asgiref'ning sync_to_async'i standart holatda (thread_sensitive=True)
+hamma sinxron chaqiruvlarni bitta oqimda navbat bilan bajaradi - buyurtmalar
+ko'p bo'lganda barcha handlerlar shu oqimni kutadi. Bu moduldagi
+sync_to_async xuddi shu interfeysga ega, lekin chaqiruvlarni BOT_DB_THREADS
+o'lchamli pool'da bajaradi. Har bir oqim o'z DB ulanishiga ega, shuning
+uchun pool o'lchami ma'lumotlar bazasi ulanishlari chegarasidan kichik
+bo'lishi kerak.
+
+Bitta chaqiruv ichidagi transaction.atomic() odatdagidek ishlaydi; bir
+nechta chaqiruvni bitta tranzaksiyaga birlashtirib bo'lmaydi (har biri
+boshqa oqimga tushishi mumkin) - bunday ishni bitta sinxron funksiyaga
+yig'ing (bot_queries.claim_order kabi).
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async as _sync_to_async
+from django.db import close_old_connections
+
+
+BOT_DB_THREADS = int(os.environ.get('BOT_DB_THREADS', 8))
+
+db_executor = ThreadPoolExecutor(max_workers=BOT_DB_THREADS, thread_name_prefix='bot-db')
+
+
+def _with_usable_connection(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        # Uzoq yashaydigan oqimlarda eskirgan/uzilgan ulanishlarni yopish
+        # (so'rov/javob sikli yo'q, CONN_MAX_AGE shu yerda hisobga olinadi)
+        close_old_connections()
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def sync_to_async(func):
+    """asgiref.sync.sync_to_async o'rnini bosuvchi - bot DB pool'ida bajaradi"""
+    return _sync_to_async(_with_usable_connection(func), thread_sensitive=False, executor=db_executor)
@@ -0,0 +1,241 @@
+"""
+Bot suhbatlari (FSM) uchun SQLite WAL saqlagichi.
+
+Ko'p bosqichli StatesGroup oqimlari (TaxiOrder, ParcelOrder, CargoOrder,
+DriverRegistration, BallBuyFSM ...) holati aiogram xotirasida turardi -
+bot qayta ishga tushganda yarim to'ldirilgan buyurtmalar yo'qolardi.
+
+SQLiteStorage:
+- holat va ma'lumotlarni xotirada saqlaydi (o'qishlar bazaga bormaydi);
+- har bir yozuvni "dirty" deb belgilaydi va FLUSH_INTERVAL oralig'ida
+  bitta tranzaksiyada SQLite'ga yozadi (WAL rejimi, synchronous=NORMAL);
+- ishga tushganda oxirgi STATE_TTL ichidagi suhbatlarni tiklaydi, STATE_TTL
+  dan eski suhbatlarni esa PRUNE_INTERVAL oralig'ida xotiradan ham, bazadan
+  ham o'chiradi; state.clear() qilingan suhbat darhol xotiradan chiqadi.
+
+Bir nechta bot jarayoni bitta faylni ishlatganda cache=False bering:
+o'qishlar bazadan, yozuvlar darhol bo'ladi (WAL parallel o'qishga imkon
+beradi). Ma'lumotlar JSON sifatida saqlanadi - JSON'ga aylanmaydigan
+qiymatlar qayta ishga tushgandan keyin satr bo'lib qaytadi.
+
+Ulash: main_router startup'da install_fsm_storage(dispatcher) Dispatcher'ning
+MemoryStorage'ini shu saqlagich bilan almashtiradi (loader o'zgarmaydi).
+BOT_FSM_STORAGE=memory bo'lsa almashtirilmaydi. Loader'da to'g'ridan-to'g'ri:
+
+    from .fsm_storage import create_fsm_storage
+    dp = Dispatcher(storage=create_fsm_storage())
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+logger = logging.getLogger(__name__)
+
+
+# 'sqlite' (standart) yoki 'memory' - aiogram'ning o'z MemoryStorage'i
+FSM_STORAGE = os.environ.get('BOT_FSM_STORAGE', 'sqlite')
+FSM_DB_PATH = os.environ.get('BOT_FSM_DB', os.path.join(os.path.dirname(__file__), 'bot_fsm.db'))
+FLUSH_INTERVAL = 0.5
+# Shundan eski suhbatlar o'chiriladi (ishga tushganda va har PRUNE_INTERVAL'da)
+STATE_TTL = 7 * 24 * 3600
+PRUNE_INTERVAL = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fsm_state (
+    key TEXT PRIMARY KEY,
+    state TEXT,
+    data TEXT NOT NULL DEFAULT '{}',
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def _storage_key(key: StorageKey) -> str:
+    parts = [key.bot_id, key.chat_id, key.user_id, key.thread_id or '']
+    business_connection_id = getattr(key, 'business_connection_id', None)
+    if business_connection_id:
+        parts.append(business_connection_id)
+    parts.append(key.destiny)
+    return ':'.join(str(part) for part in parts)
+
+
+def _state_name(state) -> Optional[str]:
+    return state.state if isinstance(state, State) else state
+
+
+class SQLiteStorage(BaseStorage):
+    def __init__(self, path: str = FSM_DB_PATH, cache: bool = True,
+                 flush_interval: float = FLUSH_INTERVAL, state_ttl: float = STATE_TTL):
+        self.path = path
+        self.cache = cache
+        self.flush_interval = flush_interval
+        self.state_ttl = state_ttl
+        # SQLite ulanishi bitta oqimda ishlatiladi
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fsm-sqlite')
+        self._connection = None
+        self._entries: Dict[str, Tuple[Optional[str], Dict[str, Any]]] = {}
+        # Suhbat oxirgi marta o'zgargan vaqt (time.time()), TTL uchun
+        self._touched: Dict[str, float] = {}
+        self._dirty = set()
+        self._flusher: Optional[asyncio.Task] = None
+        self._next_prune = time.monotonic() + PRUNE_INTERVAL
+        self._executor.submit(self._open, state_ttl).result()
+
+    # SQLite tomoni (faqat executor oqimida)
+
+    def _open(self, state_ttl):
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute(SCHEMA)
+        self._connection = connection
+        self._delete_expired(time.time() - state_ttl)
+        if self.cache:
+            for key, state, data, updated_at in connection.execute('SELECT key, state, data, updated_at FROM fsm_state'):
+                self._entries[key] = (state, json.loads(data))
+                self._touched[key] = updated_at
+            logger.info("FSM: %d ta suhbat tiklandi (%s)", len(self._entries), self.path)
+
+    def _delete_expired(self, cutoff: float):
+        self._connection.execute('DELETE FROM fsm_state WHERE updated_at < ?', (cutoff,))
+
+    def _read(self, key: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        row = self._connection.execute('SELECT state, data FROM fsm_state WHERE key = ?', (key,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else (None, {})
+
+    def _write(self, rows):
+        now = time.time()
+        connection = self._connection
+        connection.execute('BEGIN')
+        try:
+            for key, entry in rows:
+                if entry is None or (entry[0] is None and not entry[1]):
+                    connection.execute('DELETE FROM fsm_state WHERE key = ?', (key,))
+                else:
+                    connection.execute(
+                        'INSERT INTO fsm_state (key, state, data, updated_at) VALUES (?, ?, ?, ?) '
+                        'ON CONFLICT(key) DO UPDATE SET state = excluded.state, data = excluded.data, '
+                        'updated_at = excluded.updated_at',
+                        (key, entry[0], json.dumps(entry[1], ensure_ascii=False, default=str), now),
+                    )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    # Yozuvlarni yig'ib yozish
+
+    def _mark_dirty(self, key: str):
+        self._dirty.add(key)
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def prune(self):
+        """STATE_TTL'dan eski suhbatlarni xotiradan va bazadan o'chirish"""
+        self._next_prune = time.monotonic() + PRUNE_INTERVAL
+        cutoff = time.time() - self.state_ttl
+        for key in [key for key, touched in self._touched.items() if touched < cutoff]:
+            del self._touched[key]
+            self._entries.pop(key, None)
+            self._dirty.discard(key)
+        await self._run(self._delete_expired, cutoff)
+
+    async def _maybe_prune(self):
+        if time.monotonic() >= self._next_prune:
+            try:
+                await self.prune()
+            except Exception as e:
+                logger.error("FSM: eski suhbatlar o'chirilmadi: %s", e)
+
+    async def flush(self):
+        """Hamma o'zgargan suhbatlarni bazaga yozish"""
+        await self._maybe_prune()
+        if not self._dirty:
+            return
+        keys, self._dirty = self._dirty, set()
+        rows = [(key, self._entries.get(key)) for key in keys]
+        try:
+            await self._run(self._write, rows)
+        except Exception as e:
+            logger.error("FSM: bazaga yozilmadi: %s", e)
+            self._dirty |= keys
+
+    async def _get(self, key: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        if self.cache:
+            return self._entries.get(key, (None, {}))
+        return await self._run(self._read, key)
+
+    async def _set(self, key: str, state: Optional[str], data: Dict[str, Any]):
+        if self.cache:
+            if state is None and not data:
+                # Tozalangan suhbat xotirada qolmaydi, flush() bazadan o'chiradi
+                self._entries.pop(key, None)
+                self._touched.pop(key, None)
+            else:
+                self._entries[key] = (state, data)
+                self._touched[key] = time.time()
+            self._mark_dirty(key)
+        else:
+            await self._maybe_prune()
+            await self._run(self._write, [(key, (state, data))])
+
+    # BaseStorage
+
+    async def set_state(self, key: StorageKey, state=None) -> None:
+        name = _storage_key(key)
+        _, data = await self._get(name)
+        await self._set(name, _state_name(state), data)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        state, _ = await self._get(_storage_key(key))
+        return state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        name = _storage_key(key)
+        state, _ = await self._get(name)
+        await self._set(name, state, dict(data))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, data = await self._get(_storage_key(key))
+        return data.copy()
+
+    async def close(self) -> None:
+        if self._connection is None:
+            return
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+        await self.flush()
+        await self._run(self._connection.close)
+        self._connection = None
+        self._executor.shutdown(wait=True)
+
+
+def create_fsm_storage(path: str = FSM_DB_PATH, **kwargs) -> SQLiteStorage:
+    return SQLiteStorage(path, **kwargs)
+
+
+def install_fsm_storage(dispatcher, **kwargs) -> BaseStorage:
+    """
+    Dispatcher standart MemoryStorage bilan yaratilgan bo'lsa, uni
+    SQLiteStorage bilan almashtirish (BOT_FSM_STORAGE=memory bo'lmasa).
+    Update'lar qayta ishlanishidan oldin - startup'da chaqiriladi.
+    """
+    if FSM_STORAGE != 'memory' and isinstance(dispatcher.fsm.storage, MemoryStorage):
+        dispatcher.fsm.storage = create_fsm_storage(**kwargs)
+    return dispatcher.fsm.storage
@@ -0,0 +1,155 @@
+"""
+Davlat / viloyat / shahar ma'lumotnomasining xotiradagi indeksi.
+
+Bu ma'lumotlar deyarli o'zgarmaydi, lekin har bir joy tanlash klaviaturasi
+ularni bazadan qayta o'qib, nom bo'yicha takrorlarni olib tashlab,
+saralab chiqardi. Indeks bot ishga tushganda (yoki refresh() chaqirilganda)
+uchta so'rov bilan yuklanadi va har bir til uchun tayyor, saralangan
+ro'yxatlarni saqlaydi - keyingi murojaatlar faqat dict qidiruvi.
+
+Bot jarayonidagi o'zgarishlar signal orqali indeksni darhol eskirgan deb
+belgilaydi. Django admin boshqa jarayonda ishlaydi, shuning uchun bot
+indeksni har GEO_REFRESH_INTERVAL soniyada qayta yuklaydi (admin /refresh_geo
+buyrug'i bilan darhol yangilash mumkin).
+"""
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from django.db.models.signals import post_delete, post_save
+
+from set_main.models import City, Country, Region
+
+
+# Botdagi tillar (main_router 'kk' ni 'kz' ga almashtiradi)
+BOT_LANGUAGES = ('uz', 'ru', 'en', 'tj', 'kz')
+
+GEO_REFRESH_INTERVAL = 600
+
+
+def localized_name(obj, lang: str) -> str:
+    """main_router'dagi kabi: name_<lang>, bo'lmasa name_uz"""
+    return getattr(obj, f'name_{lang}', obj.name_uz)
+
+
+def unique_sorted(objects, lang: str) -> List[Tuple[str, int]]:
+    """
+    (nom, id) ro'yxati: bir xil nomdan eng kichik id'li (birinchi
+    yaratilgani) qoladi, natija nom bo'yicha saralanadi.
+    """
+    unique = {}
+    for obj in objects:
+        name = localized_name(obj, lang)
+        if name not in unique or obj.id < unique[name][1]:
+            unique[name] = (name, obj.id)
+    return sorted(unique.values(), key=lambda item: item[0])
+
+
+class GeoIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._countries: Dict[str, Country] = {}
+        self._regions: Dict[int, Region] = {}
+        self._cities: Dict[int, City] = {}
+        self._country_regions: Dict[str, List[Region]] = {}
+        self._region_cities: Dict[int, List[City]] = {}
+        self._tables: Dict[str, dict] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self):
+        """Bazadan to'liq yuklash (sinxron - sync_to_async orqali chaqiring)"""
+        countries = list(Country.objects.all())
+        regions = list(Region.objects.all())
+        cities = list(City.objects.all())
+
+        code_by_pk = {country.pk: country.code for country in countries}
+        country_regions = defaultdict(list)
+        for region in regions:
+            country_regions[code_by_pk.get(region.country_id)].append(region)
+        region_cities = defaultdict(list)
+        for city in cities:
+            region_cities[city.region_id].append(city)
+
+        with self._lock:
+            self._countries = {country.code: country for country in countries}
+            self._regions = {region.id: region for region in regions}
+            self._cities = {city.id: city for city in cities}
+            self._country_regions = dict(country_regions)
+            self._region_cities = dict(region_cities)
+            self._tables = {}
+            for lang in BOT_LANGUAGES:
+                self._tables[lang] = self._build(lang)
+            self._loaded = True
+
+    def refresh(self):
+        """Ma'lumotnoma o'zgarganda indeksni qayta qurish"""
+        self.load()
+
+    def invalidate(self):
+        """Keyingi murojaatda qayta yuklanishi uchun belgilash"""
+        self._loaded = False
+
+    def _build(self, lang: str) -> dict:
+        return {
+            'regions': {
+                code: unique_sorted(regions, lang)
+                for code, regions in self._country_regions.items()
+            },
+            'region_cities': {
+                region_id: unique_sorted(cities, lang)
+                for region_id, cities in self._region_cities.items()
+            },
+            'country_cities': {
+                code: unique_sorted(
+                    [city for region in regions for city in self._region_cities.get(region.id, [])],
+                    lang,
+                )
+                for code, regions in self._country_regions.items()
+            },
+        }
+
+    def _table(self, lang: str) -> dict:
+        table = self._tables.get(lang)
+        if table is None:
+            with self._lock:
+                table = self._tables.setdefault(lang, self._build(lang))
+        return table
+
+    # Lookups - natijadagi ro'yxatlar umumiy, ularni o'zgartirmang
+
+    def country_name(self, code: str, lang: str = 'uz') -> str:
+        country = self._countries.get(code)
+        return localized_name(country, lang) if country else code
+
+    def region_name(self, region_id, lang: str = 'uz') -> Optional[str]:
+        region = self._regions.get(int(region_id))
+        return localized_name(region, lang) if region else None
+
+    def city_name(self, city_id, lang: str = 'uz') -> Optional[str]:
+        city = self._cities.get(int(city_id))
+        return localized_name(city, lang) if city else None
+
+    def regions_for_country(self, country_code: str, lang: str = 'uz') -> List[Tuple[str, int]]:
+        return self._table(lang)['regions'].get(country_code, [])
+
+    def cities_for_region(self, region_id, lang: str = 'uz') -> List[Tuple[str, int]]:
+        return self._table(lang)['region_cities'].get(int(region_id), [])
+
+    def cities_for_country(self, country_code: str, lang: str = 'uz') -> List[Tuple[str, int]]:
+        return self._table(lang)['country_cities'].get(country_code, [])
+
+
+geo_index = GeoIndex()
+
+
+def _invalidate_geo_index(sender, **kwargs):
+    geo_index.invalidate()
+
+
+for _model in (Country, Region, City):
+    post_save.connect(_invalidate_geo_index, sender=_model, dispatch_uid=f'geo_index_{_model.__name__}_save')
+    post_delete.connect(_invalidate_geo_index, sender=_model, dispatch_uid=f'geo_index_{_model.__name__}_delete')
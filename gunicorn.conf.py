@@ -35,3 +35,9 @@ tmp_upload_dir = None
 # SSL (uncomment when using HTTPS)
 # keyfile = "/path/to/keyfile"
 # certfile = "/path/to/certfile"
+
+
+def worker_exit(server, worker):
+    # Write audit rows and queued reviews/feedback still held by this worker
+    from menu.buffers import close_all
+    close_all()
@@ -49,3 +49,9 @@ graceful_timeout = 30
 
 # Max worker memory (Beget uchun)
 worker_memory_limit = 512  # MB
+
+
+def worker_exit(server, worker):
+    # Write audit rows and queued reviews/feedback still held by this worker
+    from menu.buffers import close_all
+    close_all()
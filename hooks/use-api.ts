@@ -226,9 +226,8 @@ export function useRestaurantInfo() {
       try {
         setLoading(true);
         
-        // Add cache-busting to always get fresh data
-        const timestamp = new Date().getTime();
-        const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'https://api.tokyokafe.uz/api'}/restaurant-info/?t=${timestamp}`, {
+        // no-cache revalidates with the ETag, unchanged data comes back as 304
+        const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'https://api.tokyokafe.uz/api'}/restaurant-info/`, {
           method: 'GET',
           headers: {
             'Content-Type': 'application/json',
@@ -270,9 +269,8 @@ export function useSiteSettings() {
       try {
         setLoading(true);
         
-        // Add cache-busting to always get fresh data
-        const timestamp = new Date().getTime();
-        const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'https://api.tokyokafe.uz/api'}/site-settings/?t=${timestamp}`, {
+        // no-cache revalidates with the ETag, unchanged data comes back as 304
+        const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'https://api.tokyokafe.uz/api'}/site-settings/`, {
           method: 'GET',
           headers: {
             'Content-Type': 'application/json',
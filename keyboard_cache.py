@@ -0,0 +1,71 @@
+"""
+Tayyor klaviaturalar keshi.
+
+Statik menyular (til bo'yicha) va kalendar klaviaturalari har bosishda
+qaytadan InlineKeyboardMarkup va get_text chaqiruvlari bilan qurilardi.
+@cached_keyboard bilan o'ralgan builder natijasi (builder, argumentlar)
+kaliti bo'yicha saqlanadi. daily=True bo'lgan klaviaturalar bugungi sanaga
+bog'liq (o'tgan kunlar yashiriladi), shuning uchun ularning kalitiga sana
+qo'shiladi va kun almashganda eski yozuvlar tashlanadi.
+
+Keshdagi klaviaturalar umumiy obyekt - ularni joyida o'zgartirmang.
+"""
+import threading
+from datetime import date
+from functools import wraps
+
+
+_lock = threading.Lock()
+_keyboards = {}
+_day = None
+
+# Yozuvlar soni chegarasi (callback_prefix kabi argumentlar ko'p bo'lishi mumkin)
+MAX_ENTRIES = 4096
+
+
+def clear_keyboard_cache():
+    """Hamma klaviaturalarni tashlash (masalan, matnlar qayta yuklanganda)"""
+    with _lock:
+        _keyboards.clear()
+
+
+def _roll_day(today):
+    """Kun almashganda sanaga bog'liq yozuvlarni o'chirish"""
+    global _day
+    with _lock:
+        if _day != today:
+            for key in [key for key in _keyboards if key[1] is not None]:
+                del _keyboards[key]
+            _day = today
+
+
+def cached_keyboard(daily=False):
+    def decorator(builder):
+        name = f'{builder.__module__}.{builder.__qualname__}'
+
+        @wraps(builder)
+        def wrapper(*args, **kwargs):
+            today = None
+            if daily:
+                today = date.today()
+                if today != _day:
+                    _roll_day(today)
+            key = (name, today, args, tuple(sorted(kwargs.items())))
+            try:
+                return _keyboards[key]
+            except KeyError:
+                pass
+            except TypeError:
+                # Hash qilinmaydigan argument - keshsiz quramiz
+                return builder(*args, **kwargs)
+
+            keyboard = builder(*args, **kwargs)
+            with _lock:
+                if len(_keyboards) >= MAX_ENTRIES:
+                    _keyboards.clear()
+                _keyboards[key] = keyboard
+            return keyboard
+
+        wrapper.uncached = builder
+        return wrapper
+    return decorator
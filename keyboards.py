@@ -2,8 +2,10 @@ import calendar
 import datetime
 from datetime import date
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
-from data_manager import load_settings
+from .data_manager import load_settings
+from .keyboard_cache import cached_keyboard
 
+@cached_keyboard()
 def get_trip_type_kb():
     """Sayohat turi klaviaturasi"""
     return InlineKeyboardMarkup(
@@ -13,6 +15,7 @@ def get_trip_type_kb():
         ]
     )
 
+@cached_keyboard()
 def get_confirm_kb():
     """Tasdiqlash klaviaturasi"""
     return InlineKeyboardMarkup(
@@ -22,6 +25,7 @@ def get_confirm_kb():
         ]
     )
 
+@cached_keyboard()
 def get_admin_kb():
     """Admin panel klaviaturasi"""
     return InlineKeyboardMarkup(
@@ -55,6 +59,7 @@ def get_date_settings_kb():
         ]
     )
 
+@cached_keyboard()
 def get_no_comment_kb():
     """Izoh yo'q klaviaturasi"""
     return InlineKeyboardMarkup(
@@ -63,6 +68,7 @@ def get_no_comment_kb():
         ]
     )
 
+@cached_keyboard(daily=True)
 def get_year_kb():
     """Yil tanlash klaviaturasi"""
     now = datetime.datetime.now()
@@ -75,6 +81,7 @@ def get_year_kb():
         ]
     )
 
+@cached_keyboard(daily=True)
 def get_month_kb(selected_year):
     """Oy tanlash klaviaturasi"""
     now = datetime.datetime.now()
@@ -93,6 +100,7 @@ def get_month_kb(selected_year):
         ])
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
+@cached_keyboard(daily=True)
 def get_day_kb(selected_year, selected_month):
     """Kun tanlash klaviaturasi"""
     now = datetime.datetime.now()
@@ -112,6 +120,7 @@ def get_day_kb(selected_year, selected_month):
         buttons.append(row)
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
+@cached_keyboard()
 def get_main_menu():
     """Asosiy menyu klaviaturasi"""
     return ReplyKeyboardMarkup(
@@ -123,6 +132,7 @@ def get_main_menu():
         resize_keyboard=True
     )
 
+@cached_keyboard()
 def get_cancel_kb():
     """Bekor qilish klaviaturasi"""
     return ReplyKeyboardMarkup(
@@ -132,6 +142,7 @@ def get_cancel_kb():
         resize_keyboard=True
     ) 
 
+@cached_keyboard(daily=True)
 def create_calendar_kb(year=None, month=None):
     now = datetime.datetime.now()
     if year is None:
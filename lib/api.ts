@@ -1,6 +1,14 @@
 // API configuration and types
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'https://api.tokyokafe.uz/api';
 
+// Resized copies of an uploaded image; srcset strings are keyed by format (avif/webp/jpeg)
+export interface ImageVariants {
+  width: number;
+  height: number;
+  sizes: Record<'thumb' | 'card' | 'hero', { width: number; height: number; avif?: string; webp?: string; jpeg?: string }>;
+  srcset: { avif?: string; webp?: string; jpeg?: string };
+}
+
 export interface MenuItem {
   id: number;
   name: string;
@@ -11,6 +19,8 @@ export interface MenuItem {
   description_ru: string;
   price: number;
   image?: string;
+  image_variants?: ImageVariants | null;
+  image_placeholder?: string;  // tiny WebP data URI shown (blurred) while the image loads
   category: number;
   category_name: string;
   category_name_uz: string;
@@ -32,6 +42,8 @@ export interface Category {
   name_ru: string;
   icon: string;
   image?: string;
+  image_variants?: ImageVariants | null;
+  image_placeholder?: string;  // tiny WebP data URI shown (blurred) while the image loads
   created_at: string;
   updated_at: string;
 }
@@ -99,6 +111,8 @@ export interface Promotion {
   description_uz: string;
   description_ru: string;
   image?: string;
+  image_variants?: ImageVariants | null;
+  image_placeholder?: string;  // tiny WebP data URI shown (blurred) while the image loads
   active: boolean;
   link?: string;
   category?: number;
@@ -145,6 +159,15 @@ export interface SiteSettings {
   updated_at: string;
 }
 
+export interface Bootstrap {
+  version: string;
+  site_settings: SiteSettings;
+  restaurant_info: RestaurantInfo;
+  categories: Category[];
+  menu_items: MenuItem[];
+  reviews: Review[];
+}
+
 export interface TextContent {
   id: number;
   content_type: string;
@@ -219,7 +242,9 @@ export interface RestaurantInfo {
   no_reviews_text_uz: string;
   no_reviews_text_ru: string;
   hero_image?: string;
+  hero_image_variants?: ImageVariants | null;
   about_image?: string;
+  about_image_variants?: ImageVariants | null;
   created_at: string;
   updated_at: string;
 }
@@ -572,6 +597,13 @@ export class ApiClient {
     }, false); // Don't try to parse JSON for DELETE requests
   }
 
+  async bulkModerateReviews(ids: number[], action: 'approve' | 'reject' | 'delete', reason?: string): Promise<{action: string; updated: number; ids: number[]}> {
+    return this.request<{action: string; updated: number; ids: number[]}>('/admin/reviews/bulk/', {
+      method: 'POST',
+      body: JSON.stringify({ ids, action, reason: reason || '' }),
+    });
+  }
+
   // Review Actions
   async getReviewActions(): Promise<any[]> {
     const response = await this.request<{results: any[]}>('/admin/review-actions/');
@@ -663,6 +695,11 @@ export class ApiClient {
     return this.request<RestaurantInfo>('/restaurant-info/');
   }
 
+  // Bootstrap - site settings, restaurant info, categories, menu items and reviews in one request
+  async getBootstrap(): Promise<Bootstrap> {
+    return this.request<Bootstrap>('/bootstrap/');
+  }
+
   // Cart
   async getCart(): Promise<Cart> {
     try {
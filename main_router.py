@@ -11,7 +11,7 @@ from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from django.contrib.auth import get_user_model
-from asgiref.sync import sync_to_async
+from .db_executor import sync_to_async
 from set_main.models import CustomUser, Country, Region, City, BotSettings
 from set_main.utils import format_uzbekistan_datetime
 from set_main.bot_utils import get_or_create_bot_user, update_bot_user_activity, get_user_language
@@ -24,6 +24,13 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'set_app.settings')
 django.setup()
 
 from set_main.models import Order, DriverApplication
+from .bot_queries import claim_order, load_order_acceptance
+from .geo_index import GEO_REFRESH_INTERVAL, geo_index
+from .keyboard_cache import cached_keyboard, clear_keyboard_cache
+from .user_cache import ROLE_TTL, user_profiles
+from .bot_settings import settings_snapshot, subscription_cache
+from .notifier import notifier
+from .fsm_storage import SQLiteStorage, install_fsm_storage
 
 # Import avia and train routers
 from .avia_new import avia_router, FlightTicketOrder
@@ -36,14 +43,13 @@ main_router = Router()
 main_router.include_router(avia_router)
 main_router.include_router(train_router)
 
-# Reload text manager to ensure all new keys are loaded
-text_manager.reload_texts()
-
-# Fix Kazakh language code mapping
-text_manager.texts['kz'] = text_manager.texts.pop('kk', {})
+# Texts are compiled on load ('kk' is mapped to 'kz' there) and hot-reloaded
+# when uzb.json changes; cached keyboards are dropped on every reload
+text_manager.add_reload_listener(clear_keyboard_cache)
+text_manager.log_validation_report()
 
 # Add missing text keys for creative messages
-if 'country_selection_creative' not in text_manager.texts.get('uz', {}):
+if not text_manager.has_text('uz', 'country_selection_creative'):
     print("⚠️ Warning: Creative text keys not found in JSON files")
 
 # Logging
@@ -152,6 +158,7 @@ class BallBuyFSM(StatesGroup):
 # Helper functions
 # Text management is now handled by text_manager.py
 
+@cached_keyboard()
 def get_language_keyboard():
     """Create language selection keyboard"""
     return InlineKeyboardMarkup(inline_keyboard=[
@@ -170,10 +177,8 @@ def get_language_keyboard():
 
 async def get_channel_subscription_keyboard(lang):
     """Kanal obunasi uchun keyboard"""
-    from set_main.models import BotSettings
-    
-    # Kanal sozlamalarini bazadan olish
-    channel_settings = await sync_to_async(BotSettings.get_channel_settings)()
+    # Kanal sozlamalari (keshlangan)
+    channel_settings = await settings_snapshot.channel_settings()
     channel_link = channel_settings['channel_link']
     channel_name = channel_settings['channel_name']
     
@@ -183,14 +188,8 @@ async def get_channel_subscription_keyboard(lang):
     ])
 
 async def get_bot_setting(key, default_value=None):
-    """Bot sozlamasini database dan olish"""
-    from set_main.models import BotSettings
-    
-    try:
-        setting = await sync_to_async(BotSettings.objects.get)(key=key, is_active=True)
-        return setting.value
-    except BotSettings.DoesNotExist:
-        return default_value
+    """Bot sozlamasini olish (sozlamalar snapshot'idan)"""
+    return await settings_snapshot.get(key, default_value)
 
 async def get_main_menu_keyboard(lang, user=None):
     """Asosiy menyu keyboard - haydovchi yoki mijoz bo'lishiga qarab"""
@@ -223,19 +222,16 @@ async def get_main_menu_keyboard(lang, user=None):
         except Exception as e:
             print(f"❌ Haydovchi arizasini tekshirishda xatolik: {e}")
             # Xatolik bo'lsa ham mijoz menyusini ko'rsat
-            return InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text=get_text(lang, 'taxi_order'), callback_data="taxi_order")],
-                [InlineKeyboardButton(text=get_text(lang, 'parcel_order'), callback_data="parcel_order")],
-                [InlineKeyboardButton(text=get_text(lang, 'cargo_order'), callback_data="cargo_order")],
-                [InlineKeyboardButton(text=get_text(lang, 'driver_registration'), callback_data="driver_registration")],
-                [InlineKeyboardButton(text=get_text(lang, 'ball_payment'), callback_data="ball_payment")],
-                [InlineKeyboardButton(text=get_text(lang, 'admin_button'), callback_data="admin_info")],
-                [InlineKeyboardButton(text=get_text(lang, 'settings'), callback_data="settings")]
-            ])
+            return get_driver_fallback_menu_keyboard(lang)
     else:
         print(get_text('uz', 'user_not_driver'))
     
     # Mijoz uchun oddiy menyu - my_orders tugmasi yo'q
+    return get_client_menu_keyboard(lang)
+
+@cached_keyboard()
+def get_client_menu_keyboard(lang):
+    """Mijoz menyusi"""
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text=get_text(lang, 'taxi_order'), callback_data="taxi_order")],
         [InlineKeyboardButton(text=get_text(lang, 'parcel_order'), callback_data="parcel_order")],
@@ -247,6 +243,20 @@ async def get_main_menu_keyboard(lang, user=None):
         [InlineKeyboardButton(text=get_text(lang, 'settings'), callback_data="settings")]
     ])
 
+@cached_keyboard()
+def get_driver_fallback_menu_keyboard(lang):
+    """Haydovchi arizasini tekshirib bo'lmaganda ko'rsatiladigan menyu"""
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=get_text(lang, 'taxi_order'), callback_data="taxi_order")],
+        [InlineKeyboardButton(text=get_text(lang, 'parcel_order'), callback_data="parcel_order")],
+        [InlineKeyboardButton(text=get_text(lang, 'cargo_order'), callback_data="cargo_order")],
+        [InlineKeyboardButton(text=get_text(lang, 'driver_registration'), callback_data="driver_registration")],
+        [InlineKeyboardButton(text=get_text(lang, 'ball_payment'), callback_data="ball_payment")],
+        [InlineKeyboardButton(text=get_text(lang, 'admin_button'), callback_data="admin_info")],
+        [InlineKeyboardButton(text=get_text(lang, 'settings'), callback_data="settings")]
+    ])
+
+@cached_keyboard()
 def get_driver_menu_keyboard(lang):
     """Haydovchi uchun maxsus menyu - faqat ro'yxatdan o'tgan haydovchilar uchun"""
     return InlineKeyboardMarkup(inline_keyboard=[
@@ -261,12 +271,67 @@ def get_driver_menu_keyboard(lang):
     ])
 
 # Helper functions for country/region/city data
-async def get_country_name(code, lang='uz'):
+async def ensure_geo_index():
+    """Geo indeksni birinchi murojaatda (yoki o'zgarishdan keyin) yuklash"""
+    if not geo_index.loaded:
+        await sync_to_async(geo_index.load)()
+
+async def refresh_geo_index():
+    """Davlat/viloyat/shahar ma'lumotnomasini bazadan qayta yuklash"""
+    await sync_to_async(geo_index.refresh)()
+
+async def _geo_refresh_loop():
+    # Django admin'dagi o'zgarishlar bu jarayonga signal bilan kelmaydi
+    while True:
+        await asyncio.sleep(GEO_REFRESH_INTERVAL)
+        try:
+            await refresh_geo_index()
+        except Exception:
+            logger.exception("Geo indeks yangilanmadi")
+
+_geo_refresh_task = None
+
+@main_router.startup()
+async def setup_fsm_storage(dispatcher):
+    """Suhbat holatlari bot qayta ishga tushganda yo'qolmasligi uchun SQLite saqlagich"""
+    install_fsm_storage(dispatcher)
+
+@main_router.shutdown()
+async def close_fsm_storage(dispatcher):
+    # Navbatdagi o'zgarishlarni bazaga yozib yopish (close() qayta chaqirilsa ham xavfsiz)
+    if isinstance(dispatcher.fsm.storage, SQLiteStorage):
+        await dispatcher.fsm.storage.close()
+
+@main_router.startup()
+async def start_geo_index():
+    """Bot ishga tushganda indeksni yuklash va davriy yangilashni boshlash"""
+    global _geo_refresh_task
     try:
-        country = await sync_to_async(Country.objects.get)(code=code)
-        return getattr(country, f'name_{lang}', country.name_uz)
-    except Country.DoesNotExist:
-        return code
+        await refresh_geo_index()
+    except Exception:
+        logger.exception("Geo indeks yuklanmadi, birinchi murojaatda qayta uriniladi")
+    if _geo_refresh_task is None:
+        _geo_refresh_task = asyncio.ensure_future(_geo_refresh_loop())
+
+@main_router.shutdown()
+async def stop_geo_index():
+    global _geo_refresh_task
+    if _geo_refresh_task is not None:
+        _geo_refresh_task.cancel()
+        _geo_refresh_task = None
+
+@main_router.message(Command("refresh_geo"))
+async def refresh_geo_command(message: Message):
+    """Admin: joylar admin panelda o'zgargandan keyin indeksni darhol yangilash"""
+    user = await user_profiles.find(message.from_user.id, max_age=ROLE_TTL)
+    if not user or user.role != 'admin':
+        return
+    await refresh_geo_index()
+    await message.answer("✅ Davlat/viloyat/shahar ro'yxati yangilandi")
+
+async def get_country_name(code, lang='uz'):
+    await ensure_geo_index()
+    return geo_index.country_name(code, lang)
 
 async def get_language_name(language_code, user_language='uz'):
     """Get language name in user's preferred language"""
@@ -277,75 +342,18 @@ async def get_language_name(language_code, user_language='uz'):
 
 async def get_regions_for_country(country_code, lang='uz'):
     """Get unique regions for a country, removing duplicates by name"""
-    try:
-        country = await sync_to_async(Country.objects.get)(code=country_code)
-        regions = await sync_to_async(list)(country.regions.all())
-        
-        # Create a dictionary to store unique regions by name
-        unique_regions = {}
-        for region in regions:
-            region_name = getattr(region, f'name_{lang}', region.name_uz)
-            # If region name already exists, keep the one with smaller ID (first created)
-            if region_name not in unique_regions or region.id < unique_regions[region_name][1]:
-                unique_regions[region_name] = (region_name, region.id)
-        
-        # Convert back to list and sort by name
-        result = list(unique_regions.values())
-        result.sort(key=lambda x: x[0])  # Sort by name
-        return result
-    except Country.DoesNotExist:
-        return []
+    await ensure_geo_index()
+    return geo_index.regions_for_country(country_code, lang)
 
 async def get_cities_for_region(region_id, lang='uz'):
     """Get unique cities for a region, removing duplicates by name"""
-    try:
-        region = await sync_to_async(Region.objects.get)(id=region_id)
-        cities = await sync_to_async(list)(region.cities.all())
-        
-        # Create a dictionary to store unique cities by name
-        unique_cities = {}
-        for city in cities:
-            city_name = getattr(city, f'name_{lang}', city.name_uz)
-            # If city name already exists, keep the one with smaller ID (first created)
-            if city_name not in unique_cities or city.id < unique_cities[city_name][1]:
-                unique_cities[city_name] = (city_name, city.id)
-        
-        # Convert back to list and sort by name
-        result = list(unique_cities.values())
-        result.sort(key=lambda x: x[0])  # Sort by name
-        return result
-    except Region.DoesNotExist:
-        return []
+    await ensure_geo_index()
+    return geo_index.cities_for_region(region_id, lang)
 
 async def get_cities_for_country(country_code, lang='uz'):
     """Get unique cities for a specific country, removing duplicates by name"""
-    from set_main.models import City, Region, Country
-    
-    try:
-        # First get the country object
-        country = await sync_to_async(Country.objects.get)(code=country_code)
-        
-        # Then get all regions for this country
-        regions = await sync_to_async(list)(Region.objects.filter(country=country))
-        region_ids = [region.id for region in regions]
-        
-        # Finally get all cities in these regions
-        cities = await sync_to_async(list)(City.objects.filter(region_id__in=region_ids))
-        
-        # Create a dictionary to store unique cities by name
-        unique_cities = {}
-        for city in cities:
-            city_name = getattr(city, f'name_{lang}', city.name_uz)
-            # If city name already exists, keep the one with smaller ID (first created)
-            if city_name not in unique_cities or city.id < unique_cities[city_name][1]:
-                unique_cities[city_name] = (city_name, city.id)
-        
-        # Convert back to list and sort by name
-        result = list(unique_cities.values())
-        result.sort(key=lambda x: x[0])  # Sort by name
-        return result
-    except Country.DoesNotExist:
-        return []
+    await ensure_geo_index()
+    return geo_index.cities_for_country(country_code, lang)
 
 def get_month_name(month, lang='uz'):
     """Ko'p tilli oy nomlarini qaytaradi"""
@@ -420,6 +428,7 @@ def create_three_column_keyboard(items, callback_prefix, back_callback=None, lan
     
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
+@cached_keyboard()
 def create_country_keyboard(callback_prefix, back_callback=None, lang='uz'):
     """Davlatlar kalitlar taxtasini yaratish"""
     countries = [
@@ -443,6 +452,7 @@ def create_country_keyboard(callback_prefix, back_callback=None, lang='uz'):
     
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
+@cached_keyboard(daily=True)
 def create_month_keyboard(year, current_month, callback_prefix, back_callback=None, lang='uz'):
     """Oy tanlash klaviaturasi - faqat bugundan oyning oxirigacha"""
     from datetime import datetime
@@ -481,6 +491,7 @@ def create_month_keyboard(year, current_month, callback_prefix, back_callback=No
     
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
+@cached_keyboard(daily=True)
 def create_day_keyboard(year, month, callback_prefix, back_callback=None, lang='uz'):
     """Kun tanlash klaviaturasi - faqat bugundan oyning oxirigacha"""
     import calendar
@@ -529,7 +540,7 @@ async def cmd_start(message: Message, state: FSMContext):
     user_id = message.from_user.id
     
     # Check if user exists
-    user = await sync_to_async(CustomUser.objects.filter(telegram_id=user_id).first)()
+    user = await user_profiles.find(user_id, max_age=ROLE_TTL)
     
     if not user:
         # New user - language selection
@@ -555,9 +566,9 @@ async def check_subscription_and_show_menu(message, user, state):
     
     try:
         # Foydalanuvchining kanalga obuna bo'lganligini tekshirish
-        member = await bot.get_chat_member(channel_username, user.telegram_id)
+        subscribed = await subscription_cache.is_subscribed(bot, channel_username, user.telegram_id)
         
-        if member.status in ['member', 'administrator', 'creator']:
+        if subscribed:
             # Obuna bo'lgan - asosiy menyu
             welcome_text = get_text(user.language, 'welcome_driver') if user.role == 'driver' else get_text(user.language, 'welcome')
             await message.answer(
@@ -582,7 +593,7 @@ async def check_subscription_and_show_menu(message, user, state):
 
 @main_router.message(Command("help"))
 async def help_command(message: Message):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await message.answer(get_text(user.language, 'help_page'))
 
 @main_router.message(Command("id"))
@@ -623,14 +634,14 @@ async def check_subscription_callback(callback: CallbackQuery, state: FSMContext
     """Kanal obunasini tekshirish"""
     from bot.loader import bot
     
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id, max_age=ROLE_TTL)
     channel_username = await get_bot_setting('channel_username', '@your_channel_username')
     
     try:
         # Foydalanuvchining kanalga obuna bo'lganligini tekshirish
-        member = await bot.get_chat_member(channel_username, callback.from_user.id)
+        subscribed = await subscription_cache.is_subscribed(bot, channel_username, callback.from_user.id, recheck=True)
         
-        if member.status in ['member', 'administrator', 'creator']:
+        if subscribed:
             # Obuna bo'lgan - asosiy menyu
             await callback.message.edit_text(
                 text=get_text(user.language, 'channel_subscribed'),
@@ -668,7 +679,7 @@ async def set_language_callback(callback: CallbackQuery, state: FSMContext):
         
         if not created:
             user.language = lang
-            await sync_to_async(user.save)()
+            await sync_to_async(user.save)(update_fields=['language'])
         
         # Til tanlagandan keyin kanal obunasini tekshirish
         from bot.loader import bot
@@ -676,9 +687,9 @@ async def set_language_callback(callback: CallbackQuery, state: FSMContext):
         
         try:
             # Foydalanuvchining kanalga obuna bo'lganligini tekshirish
-            member = await bot.get_chat_member(channel_username, callback.from_user.id)
+            subscribed = await subscription_cache.is_subscribed(bot, channel_username, callback.from_user.id)
             
-            if member.status in ['member', 'administrator', 'creator']:
+            if subscribed:
                 # Obuna bo'lgan - asosiy menyu
                 await callback.message.edit_text(
                     text=get_text(lang, 'welcome'),
@@ -702,7 +713,7 @@ async def set_language_callback(callback: CallbackQuery, state: FSMContext):
             await state.clear()
     except Exception as e:
         # Umumiy xatolik bo'lsa, oddiy xabar yuborish
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+        user = await user_profiles.get(callback.from_user.id)
         await callback.message.edit_text(
             text=get_text(user.language, 'language_changed_success').format(lang=lang.upper()),
             reply_markup=get_language_keyboard()
@@ -711,7 +722,7 @@ async def set_language_callback(callback: CallbackQuery, state: FSMContext):
 # Main menu callbacks
 @main_router.callback_query(F.data == "taxi_order")
 async def taxi_order_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id, max_age=ROLE_TTL)
     
     # Check if user is a driver - drivers cannot place orders
     if user.role == 'driver':
@@ -733,7 +744,7 @@ async def taxi_order_callback(callback: CallbackQuery, state: FSMContext):
 
 @main_router.callback_query(F.data == "parcel_order")
 async def parcel_order_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id, max_age=ROLE_TTL)
     
     # Check if user is a driver - drivers cannot place orders
     if user.role == 'driver':
@@ -755,7 +766,7 @@ async def parcel_order_callback(callback: CallbackQuery, state: FSMContext):
 
 @main_router.callback_query(F.data == "cargo_order")
 async def cargo_order_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id, max_age=ROLE_TTL)
     
     # Check if user is a driver - drivers cannot place orders
     if user.role == 'driver':
@@ -777,7 +788,7 @@ async def cargo_order_callback(callback: CallbackQuery, state: FSMContext):
 
 @main_router.callback_query(F.data == "driver_registration")
 async def driver_registration_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     try:
         await callback.message.edit_text(
             text=get_text(user.language, 'driver_registration_title'),
@@ -804,7 +815,7 @@ async def driver_registration_callback(callback: CallbackQuery, state: FSMContex
 # Driver direction callback handlers
 @main_router.callback_query(F.data == "driver_direction_taxi")
 async def driver_direction_taxi_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await state.update_data(direction="taxi")
     await callback.message.edit_text(
         text=get_text(user.language, 'driver_full_name_prompt'),
@@ -816,7 +827,7 @@ async def driver_direction_taxi_callback(callback: CallbackQuery, state: FSMCont
 
 @main_router.callback_query(F.data == "driver_direction_cargo")
 async def driver_direction_cargo_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await state.update_data(direction="cargo")
     await callback.message.edit_text(
         text=get_text(user.language, 'driver_full_name_prompt'),
@@ -828,7 +839,7 @@ async def driver_direction_cargo_callback(callback: CallbackQuery, state: FSMCon
 
 @main_router.message(DriverRegistration.full_name)
 async def driver_full_name(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await state.update_data(full_name=message.text)
     await message.answer(
         text=get_text(user.language, 'driver_phone_prompt'),
@@ -840,7 +851,7 @@ async def driver_full_name(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.phone)
 async def driver_phone(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     phone = message.text.strip()
     if not (phone.startswith('+') and len(phone) >= 10) and not (phone.isdigit() and len(phone) >= 9):
         await message.answer(
@@ -861,7 +872,7 @@ async def driver_phone(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.passport_photo)
 async def driver_passport_photo(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     if not message.photo:
         await message.answer(
             text=get_text(user.language, 'passport_photo_error_creative'),
@@ -883,7 +894,7 @@ async def driver_passport_photo(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.sts_photo)
 async def driver_sts_photo(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     if not message.photo:
         await message.answer(
             text=get_text(user.language, 'passport_photo_error_creative'),
@@ -905,7 +916,7 @@ async def driver_sts_photo(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.driver_license)
 async def driver_license_photo(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     if not message.photo:
         await message.answer(
             text=get_text(user.language, 'passport_photo_error_creative'),
@@ -927,7 +938,7 @@ async def driver_license_photo(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.car_model)
 async def driver_car_model(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await state.update_data(car_model=message.text)
     await message.answer(
         text=get_text(user.language, 'driver_car_number_prompt'),
@@ -939,7 +950,7 @@ async def driver_car_model(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.car_number)
 async def driver_car_number(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await state.update_data(car_number=message.text)
     await message.answer(
         text=get_text(user.language, 'driver_car_year_prompt'),
@@ -951,7 +962,7 @@ async def driver_car_number(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.car_year)
 async def driver_car_year(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     try:
         year = int(message.text)
         if year < 1900 or year > 2030:
@@ -975,7 +986,7 @@ async def driver_car_year(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.car_capacity)
 async def driver_car_capacity(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     try:
         capacity = int(message.text)
         if capacity < 1 or capacity > 10000:
@@ -999,7 +1010,7 @@ async def driver_car_capacity(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.car_photo)
 async def driver_car_photo(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     if not message.photo:
         await message.answer(
             text=get_text(user.language, 'passport_photo_error_creative'),
@@ -1041,7 +1052,7 @@ async def driver_car_photo(message: Message, state: FSMContext):
 @main_router.callback_query(F.data == "flight_ticket_order")
 async def flight_ticket_order_callback(callback: CallbackQuery, state: FSMContext):
     """Start flight ticket order process"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     try:
         await callback.message.edit_text(
@@ -1063,7 +1074,7 @@ async def flight_ticket_order_callback(callback: CallbackQuery, state: FSMContex
 @main_router.callback_query(F.data == "train_ticket_order")
 async def train_ticket_order_callback(callback: CallbackQuery, state: FSMContext):
     """Start train ticket order process"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     try:
         await callback.message.edit_text(
@@ -1087,7 +1098,7 @@ async def train_ticket_order_callback(callback: CallbackQuery, state: FSMContext
 @main_router.callback_query(F.data == "flight_from_region_manual")
 async def flight_from_region_manual_callback(callback: CallbackQuery, state: FSMContext):
     """Handle manual region input for flight"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     await callback.message.edit_text(
         text=get_text(user.language, 'enter_region_name'),
@@ -1103,7 +1114,7 @@ async def flight_from_region_input(message: Message, state: FSMContext):
     print(f"🔍 DEBUG: flight_from_region_input called with text: {message.text}")
     
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+        user = await user_profiles.get(message.from_user.id)
         print(f"🔍 DEBUG: User found: {user.telegram_id}")
         
         await state.update_data(from_region=message.text)
@@ -1124,7 +1135,7 @@ async def flight_from_region_input(message: Message, state: FSMContext):
 @main_router.callback_query(F.data == "flight_from_city_manual")
 async def flight_from_city_manual_callback(callback: CallbackQuery, state: FSMContext):
     """Handle manual city input for flight"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     await callback.message.edit_text(
         text=get_text(user.language, 'enter_city_name'),
@@ -1140,7 +1151,7 @@ async def flight_from_city_input(message: Message, state: FSMContext):
     print(f"🔍 DEBUG: flight_from_city_input called with text: {message.text}")
     
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+        user = await user_profiles.get(message.from_user.id)
         print(f"🔍 DEBUG: User found: {user.telegram_id}")
         
         await state.update_data(from_city=message.text)
@@ -1161,7 +1172,7 @@ async def flight_from_city_input(message: Message, state: FSMContext):
 @main_router.callback_query(F.data == "flight_to_region_manual")
 async def flight_to_region_manual_callback(callback: CallbackQuery, state: FSMContext):
     """Handle manual region input for flight"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     await callback.message.edit_text(
         text=get_text(user.language, 'enter_region_name'),
@@ -1177,7 +1188,7 @@ async def flight_to_region_input(message: Message, state: FSMContext):
     print(f"🔍 DEBUG: flight_to_region_input called with text: {message.text}")
     
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+        user = await user_profiles.get(message.from_user.id)
         print(f"🔍 DEBUG: User found: {user.telegram_id}")
         
         await state.update_data(to_region=message.text)
@@ -1202,7 +1213,7 @@ async def flight_to_region_input(message: Message, state: FSMContext):
 @main_router.callback_query(F.data == "train_from_region_manual")
 async def train_from_region_manual_callback(callback: CallbackQuery, state: FSMContext):
     """Handle manual region input for train"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     await callback.message.edit_text(
         text=get_text(user.language, 'enter_region_name'),
@@ -1218,7 +1229,7 @@ async def train_from_region_input(message: Message, state: FSMContext):
     print(f"🔍 DEBUG: train_from_region_input called with text: {message.text}")
     
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+        user = await user_profiles.get(message.from_user.id)
         print(f"🔍 DEBUG: User found: {user.telegram_id}")
         
         await state.update_data(from_region=message.text)
@@ -1239,7 +1250,7 @@ async def train_from_region_input(message: Message, state: FSMContext):
 @main_router.callback_query(F.data == "train_from_city_manual")
 async def train_from_city_manual_callback(callback: CallbackQuery, state: FSMContext):
     """Handle manual city input for train"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     await callback.message.edit_text(
         text=get_text(user.language, 'enter_city_name'),
@@ -1255,7 +1266,7 @@ async def train_from_city_input(message: Message, state: FSMContext):
     print(f"🔍 DEBUG: train_from_city_input called with text: {message.text}")
     
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+        user = await user_profiles.get(message.from_user.id)
         print(f"🔍 DEBUG: User found: {user.telegram_id}")
         
         await state.update_data(from_city=message.text)
@@ -1276,7 +1287,7 @@ async def train_from_city_input(message: Message, state: FSMContext):
 @main_router.callback_query(F.data == "train_to_region_manual")
 async def train_to_region_manual_callback(callback: CallbackQuery, state: FSMContext):
     """Handle manual region input for train"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     await callback.message.edit_text(
         text=get_text(user.language, 'enter_region_name'),
@@ -1292,7 +1303,7 @@ async def train_to_region_input(message: Message, state: FSMContext):
     print(f"🔍 DEBUG: train_to_region_input called with text: {message.text}")
     
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+        user = await user_profiles.get(message.from_user.id)
         print(f"🔍 DEBUG: User found: {user.telegram_id}")
         
         await state.update_data(to_region=message.text)
@@ -1320,7 +1331,7 @@ async def flight_full_name(message: Message, state: FSMContext):
     print(f"🔍 DEBUG: flight_full_name called with text: {message.text}")
     
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+        user = await user_profiles.get(message.from_user.id)
         print(f"🔍 DEBUG: User found: {user.telegram_id}")
         
         await state.update_data(full_name=message.text)
@@ -1345,7 +1356,7 @@ async def flight_phone(message: Message, state: FSMContext):
     print(f"🔍 DEBUG: flight_phone called with text: {message.text}")
     
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+        user = await user_profiles.get(message.from_user.id)
         print(f"🔍 DEBUG: User found: {user.telegram_id}")
         
         # Clean phone number - keep only digits and +
@@ -1381,7 +1392,7 @@ async def flight_passport_photos(message: Message, state: FSMContext):
     print(f"🔍 DEBUG: flight_passport_photos called")
     
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+        user = await user_profiles.get(message.from_user.id)
         print(f"🔍 DEBUG: User found: {user.telegram_id}")
         
         if not message.photo:
@@ -1436,7 +1447,7 @@ async def flight_comment(message: Message, state: FSMContext):
     print(f"🔍 DEBUG: flight_comment called with text: {message.text}")
     
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+        user = await user_profiles.get(message.from_user.id)
         print(f"🔍 DEBUG: User found: {user.telegram_id}")
         
         await state.update_data(comment=message.text)
@@ -1490,7 +1501,7 @@ async def train_full_name(message: Message, state: FSMContext):
     print(f"🔍 DEBUG: train_full_name called with text: {message.text}")
     
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+        user = await user_profiles.get(message.from_user.id)
         print(f"🔍 DEBUG: User found: {user.telegram_id}")
         
         await state.update_data(full_name=message.text)
@@ -1515,7 +1526,7 @@ async def train_phone(message: Message, state: FSMContext):
     print(f"🔍 DEBUG: train_phone called with text: {message.text}")
     
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+        user = await user_profiles.get(message.from_user.id)
         print(f"🔍 DEBUG: User found: {user.telegram_id}")
         
         # Clean phone number - keep only digits and +
@@ -1551,7 +1562,7 @@ async def train_passport_photos(message: Message, state: FSMContext):
     print(f"🔍 DEBUG: train_passport_photos called")
     
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+        user = await user_profiles.get(message.from_user.id)
         print(f"🔍 DEBUG: User found: {user.telegram_id}")
         
         if not message.photo:
@@ -1606,7 +1617,7 @@ async def train_comment(message: Message, state: FSMContext):
     print(f"🔍 DEBUG: train_comment called with text: {message.text}")
     
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+        user = await user_profiles.get(message.from_user.id)
         print(f"🔍 DEBUG: User found: {user.telegram_id}")
         
         await state.update_data(comment=message.text)
@@ -1656,7 +1667,7 @@ async def train_comment(message: Message, state: FSMContext):
 
 @main_router.callback_query(F.data == "main_menu")
 async def main_menu_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id, max_age=ROLE_TTL)
     await callback.message.edit_text(
         text=get_text(user.language, 'main_menu'),
         reply_markup=await get_main_menu_keyboard(user.language, user)
@@ -1665,7 +1676,7 @@ async def main_menu_callback(callback: CallbackQuery, state: FSMContext):
 
 @main_router.callback_query(F.data == "help")
 async def help_callback(callback: CallbackQuery):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     help_text = get_text(user.language, 'help_page')
     help_keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -1680,7 +1691,7 @@ async def help_callback(callback: CallbackQuery):
 @main_router.callback_query(F.data == "change_language")
 async def change_language_callback(callback: CallbackQuery):
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+        user = await user_profiles.get(callback.from_user.id)
         current_language = user.language or 'uz'  # Agar til tanlanmagan bo'lsa, o'zbek tilini ishlat
     except CustomUser.DoesNotExist:
         current_language = 'uz'  # Foydalanuvchi topilmagan bo'lsa, o'zbek tilini ishlat
@@ -1717,7 +1728,7 @@ async def ball_payment_callback(callback: CallbackQuery, state: FSMContext):
     
     cards_text += "💰 Ball miqdorini kiriting:"
     
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await callback.message.edit_text(
         text=cards_text,
         parse_mode="Markdown",
@@ -1732,17 +1743,17 @@ async def ball_amount_handler(message: Message, state: FSMContext):
     try:
         amount = int(message.text.strip())
         if amount < 1:
-            user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+            user = await user_profiles.get(message.from_user.id)
             await message.answer(get_text(user.language, 'invalid_amount'))
             return
     except Exception:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+        user = await user_profiles.get(message.from_user.id)
         await message.answer(get_text(user.language, 'ball_payment_error'))
         return
     
     await state.update_data(amount=amount)
     await state.set_state(BallBuyFSM.screenshot)
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await message.answer(get_text(user.language, 'ball_payment_screenshot'))
 
 
@@ -1758,7 +1769,7 @@ async def ball_screenshot_handler(message: Message, state: FSMContext):
     price = data.get('price', 0)
     selected_card_id = data.get('selected_card_id')
     user_id = message.from_user.id
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=user_id)
+    user = await user_profiles.get(user_id)
     
     # Tanlangan karta ma'lumotlarini olish
     card_info = ""
@@ -1793,15 +1804,14 @@ async def ball_screenshot_handler(message: Message, state: FSMContext):
     )
     
     # Admin(lar)ga yuborish (admin guruh ID yoki admin user ID)
-    from set_main.models import BotSettings
-    admin_group_id = await sync_to_async(BotSettings.get_setting)('admin_group_id', '')
+    admin_group_id = await settings_snapshot.get('admin_group_id', '')
     
     if admin_group_id:
         try:
             # Admin guruhga faqat matn yuborish (rasm yo'q)
             admin_message = f"💳 **Ball sotib olish so'rovi**\n\n👤 **{user.full_name}**\n🆔 **ID:** {user.telegram_id}\n📦 **Miqdor:** {amount} ball\n💰 **Narx:** {price:,} so'm\n\n{card_info}"
             
-            user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+            user = await user_profiles.get(message.from_user.id)
             await message.bot.send_message(
                 chat_id=int(admin_group_id),
                 text=admin_message,
@@ -2161,7 +2171,7 @@ async def view_ball_payment_driver_callback(callback: CallbackQuery):
 @main_router.callback_query(F.data == "admin_info")
 async def admin_info_callback(callback: CallbackQuery):
     """Show admin information"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     # Get admin info from dynamic text
     admin_telegram_value = get_text(user.language, 'admin_telegram_value')
@@ -2190,7 +2200,7 @@ async def admin_info_callback(callback: CallbackQuery):
 
 @main_router.callback_query(F.data == "settings")
 async def settings_callback(callback: CallbackQuery):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id, max_age=ROLE_TTL)
     
     settings_text = get_text(user.language, 'settings_page')
     
@@ -2218,7 +2228,7 @@ async def settings_callback(callback: CallbackQuery):
 
 @main_router.callback_query(F.data == "my_orders")
 async def my_orders_callback(callback: CallbackQuery):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id, max_age=ROLE_TTL)
     
     # Faqat haydovchilar uchun ruxsat berish
     if user.role != 'driver':
@@ -2249,7 +2259,7 @@ async def my_orders_callback(callback: CallbackQuery):
 @main_router.callback_query(F.data == "confirm_flight_ticket")
 async def confirm_flight_ticket_callback(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     # Check if all required data is present
     required_fields = ['from_country', 'from_region', 'to_country', 'to_region', 
@@ -2300,7 +2310,6 @@ async def confirm_flight_ticket_callback(callback: CallbackQuery, state: FSMCont
     
     # Send to admin group
     from set_app.settings import AVIA_POYEZD_GROUP_ID
-    from bot.loader import bot
     
     admin_message = f"""
 📝 **✈️ Aviabilet so'rovi**
@@ -2315,8 +2324,9 @@ async def confirm_flight_ticket_callback(callback: CallbackQuery, state: FSMCont
 🆔 **ID:** {flight_ticket.ticket_id}
 """
     
-    # Send message with photo to admin group
-    await bot.send_photo(
+    # Send message with photo to admin group (in the background)
+    notifier.submit(
+        'send_photo',
         chat_id=AVIA_POYEZD_GROUP_ID,
         photo=data['passport_photo'],
         caption=admin_message,
@@ -2338,7 +2348,7 @@ async def confirm_flight_ticket_callback(callback: CallbackQuery, state: FSMCont
 
 @main_router.callback_query(F.data == "cancel_flight_ticket")
 async def cancel_flight_ticket_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await callback.message.edit_text(
         text=get_text(user.language, 'flight_cancelled'),
         reply_markup=InlineKeyboardMarkup(inline_keyboard=[
@@ -2351,7 +2361,7 @@ async def cancel_flight_ticket_callback(callback: CallbackQuery, state: FSMConte
 @main_router.callback_query(F.data == "confirm_train_ticket")
 async def confirm_train_ticket_callback(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     # Check if all required data is present
     required_fields = ['from_country', 'from_region', 'to_country', 'to_region', 
@@ -2402,7 +2412,6 @@ async def confirm_train_ticket_callback(callback: CallbackQuery, state: FSMConte
     
     # Send to admin group
     from set_app.settings import AVIA_POYEZD_GROUP_ID
-    from bot.loader import bot
     
     admin_message = f"""
 📝 **🚆 Poyezd bileti so'rovi**
@@ -2417,8 +2426,9 @@ async def confirm_train_ticket_callback(callback: CallbackQuery, state: FSMConte
 🆔 **ID:** {train_ticket.ticket_id}
 """
     
-    # Send message with photo to admin group
-    await bot.send_photo(
+    # Send message with photo to admin group (in the background)
+    notifier.submit(
+        'send_photo',
         chat_id=AVIA_POYEZD_GROUP_ID,
         photo=data['passport_photo'],
         caption=admin_message,
@@ -2452,7 +2462,7 @@ async def cancel_train_ticket_callback(callback: CallbackQuery, state: FSMContex
 @main_router.callback_query(F.data == "confirm_taxi_order")
 async def confirm_taxi_order_callback(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     passengers = data['passengers']
     
@@ -2495,7 +2505,6 @@ async def confirm_taxi_order_callback(callback: CallbackQuery, state: FSMContext
     )
     
     # Send to taxi group
-    from bot.loader import bot
     
     # Calculate ball cost for taxi - number of balls equals number of passengers
     ball_cost = passengers
@@ -2513,13 +2522,14 @@ async def confirm_taxi_order_callback(callback: CallbackQuery, state: FSMContext
 """
     
     # Get taxi group ID from database
-    taxi_group_id = await sync_to_async(BotSettings.get_setting)('taxi_parcel_group_id', '-1002715393990')
+    taxi_group_id = await settings_snapshot.get('taxi_parcel_group_id', '-1002715393990')
     try:
         taxi_group_id = int(taxi_group_id)
     except (ValueError, TypeError):
         taxi_group_id = -1002715393990  # Fallback to correct group ID
     
-    await bot.send_message(
+    notifier.submit(
+        'send_message',
         chat_id=taxi_group_id,
         text=admin_message,
         parse_mode="Markdown",
@@ -2538,7 +2548,7 @@ async def confirm_taxi_order_callback(callback: CallbackQuery, state: FSMContext
 
 @main_router.callback_query(F.data == "cancel_taxi_order")
 async def cancel_taxi_order_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await callback.message.edit_text(
         text=get_text(user.language, 'order_cancelled'),
         reply_markup=InlineKeyboardMarkup(inline_keyboard=[
@@ -2551,7 +2561,7 @@ async def cancel_taxi_order_callback(callback: CallbackQuery, state: FSMContext)
 @main_router.callback_query(F.data == "confirm_parcel_order")
 async def confirm_parcel_order_callback(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     ball_cost = 1  # 1 ball for parcel (haydovchidan olinadi)
     
@@ -2581,11 +2591,8 @@ async def confirm_parcel_order_callback(callback: CallbackQuery, state: FSMConte
     )
     
     # Send to taxi group (parcels go to taxi group too)
-    from bot.loader import bot
-    from set_main.models import BotSettings
-    
-    # Get group ID from database
-    taxi_group_id = await sync_to_async(BotSettings.get_setting)('taxi_parcel_group_id', '-1002715393990')
+    # Get group ID from settings
+    taxi_group_id = await settings_snapshot.get('taxi_parcel_group_id', '-1002715393990')
     try:
         taxi_group_id = int(taxi_group_id)
     except (ValueError, TypeError):
@@ -2603,7 +2610,8 @@ async def confirm_parcel_order_callback(callback: CallbackQuery, state: FSMConte
 {get_text('uz', 'parcelOrderBallCost', ball_cost=ball_cost)}
 """
     
-    await bot.send_message(
+    notifier.submit(
+        'send_message',
         chat_id=taxi_group_id,
         text=admin_message,
         parse_mode="Markdown",
@@ -2622,7 +2630,7 @@ async def confirm_parcel_order_callback(callback: CallbackQuery, state: FSMConte
 
 @main_router.callback_query(F.data == "cancel_parcel_order")
 async def cancel_parcel_order_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await callback.message.edit_text(
         text=get_text(user.language, 'parcel_order_cancelled'),
         reply_markup=InlineKeyboardMarkup(inline_keyboard=[
@@ -2635,7 +2643,7 @@ async def cancel_parcel_order_callback(callback: CallbackQuery, state: FSMContex
 @main_router.callback_query(F.data == "confirm_cargo_order")
 async def confirm_cargo_order_callback(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     ball_cost = 1  # 1 ball for cargo (haydovchidan olinadi)
     
@@ -2665,11 +2673,8 @@ async def confirm_cargo_order_callback(callback: CallbackQuery, state: FSMContex
     )
     
     # Send to cargo group
-    from bot.loader import bot
-    from set_main.models import BotSettings
-    
-    # Get cargo group ID from database
-    cargo_group_id = await sync_to_async(BotSettings.get_setting)('cargo_group_id', '-1002715393990')
+    # Get cargo group ID from settings
+    cargo_group_id = await settings_snapshot.get('cargo_group_id', '-1002715393990')
     try:
         cargo_group_id = int(cargo_group_id)
     except (ValueError, TypeError):
@@ -2687,7 +2692,8 @@ async def confirm_cargo_order_callback(callback: CallbackQuery, state: FSMContex
 💳 **Ball narxi:** {ball_cost} ball (haydovchidan olinadi)
 """
     
-    await bot.send_message(
+    notifier.submit(
+        'send_message',
         chat_id=cargo_group_id,
         text=admin_message,
         parse_mode="Markdown",
@@ -2719,23 +2725,21 @@ async def cancel_cargo_order_callback(callback: CallbackQuery, state: FSMContext
 async def accept_taxi_order_callback(callback: CallbackQuery):
     order_id = callback.data.split("_")[-1]
     
+    # Load driver, order, client, driver application and pricing in one hop
+    data = await sync_to_async(load_order_acceptance)(order_id, callback.from_user.id, 'taxi')
+    user, order, ball_cost = data.driver, data.order, data.ball_cost
+    
     # Check if user exists and is a driver or admin
-    try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
-        
-        # Check if user is driver or admin (admin ID: 1212795522)
-        if user.role not in ['driver', 'admin'] and callback.from_user.id != 1212795522:
-            await callback.answer("❌ Faqat haydovchilar buyurtmani qabul qilishi mumkin!", show_alert=True)
-            return
-            
-    except CustomUser.DoesNotExist:
+    if user is None:
         await callback.answer("❌ Siz tizimda ro'yxatdan o'tmagansiz!", show_alert=True)
         return
     
-    # Get order
-    try:
-        order = await sync_to_async(Order.objects.get)(id=order_id)
-    except Order.DoesNotExist:
+    # Check if user is driver or admin (admin ID: 1212795522)
+    if user.role not in ['driver', 'admin'] and callback.from_user.id != 1212795522:
+        await callback.answer("❌ Faqat haydovchilar buyurtmani qabul qilishi mumkin!", show_alert=True)
+        return
+    
+    if order is None:
         await callback.answer("❌ Buyurtma topilmadi!", show_alert=True)
         return
     
@@ -2744,35 +2748,24 @@ async def accept_taxi_order_callback(callback: CallbackQuery):
         await callback.answer("❌ Bu buyurtma allaqachon qabul qilingan!", show_alert=True)
         return
     
-    # Get ball pricing for taxi
-    from set_main.models import BallPricing
-    try:
-        taxi_pricing = await sync_to_async(BallPricing.objects.get)(service_type='taxi_parcel', is_active=True)
-        # Taxi uchun yo'lovchilar soni bo'yicha narx hisoblanadi
-        passengers = getattr(order, 'passengers', 1)  # Default 1 kishi
-        ball_cost = taxi_pricing.calculate_price(passengers)
-    except BallPricing.DoesNotExist:
-        ball_cost = passengers  # Default narx - odam soniga qarab
-    
-    # Check if user has enough balls (skip for admin)
-    if user.role != 'admin' and callback.from_user.id != 1212795522:
-        if user.balls < ball_cost:
-            await callback.message.edit_reply_markup(
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text=f"❌ Ball yetarli emas ({ball_cost} ball kerak)", callback_data="    ")]
-                ])
-            )
-            await callback.answer("❌ Ball yetarli emas! Ball sotib oling.", show_alert=True)
-            return
-        
-        # Deduct balls from driver
-        user.balls -= ball_cost
-        await sync_to_async(user.save)()
+    # Accept order and deduct balls atomically (skip balls for admin)
+    charge = user.role != 'admin' and callback.from_user.id != 1212795522
+    result = await sync_to_async(claim_order)(order.pk, user.pk, ball_cost, charge)
+    if result == 'already_accepted':
+        await callback.answer("❌ Bu buyurtma allaqachon qabul qilingan!", show_alert=True)
+        return
+    if result == 'insufficient_balls':
+        await callback.message.edit_reply_markup(
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text=f"❌ Ball yetarli emas ({ball_cost} ball kerak)", callback_data="    ")]
+            ])
+        )
+        await callback.answer("❌ Ball yetarli emas! Ball sotib oling.", show_alert=True)
+        return
     
-    # Update order status
+    if charge:
+        user.balls -= ball_cost
     order.status = 'accepted'
-    order.accepted_driver = user
-    await sync_to_async(order.save)()
     
     # Delete order message from group
     try:
@@ -2780,73 +2773,48 @@ async def accept_taxi_order_callback(callback: CallbackQuery):
     except Exception as e:
         print(f"Order message deletion error: {e}")
     
-    # Send notification to client with driver details
-    from bot.loader import bot
-    
     # Get client telegram_id safely
-    client_telegram_id = await sync_to_async(lambda: order.client.telegram_id)()
-    
-    # Get driver application details
-    try:
-        driver_app = await sync_to_async(DriverApplication.objects.filter(user=user).first)()
-        if driver_app:
-            car_info = f"🚗 {driver_app.car_model} ({driver_app.car_number})"
-            if driver_app.car_year:
-                car_info += f" - {driver_app.car_year} yil"
-            driver_phone = driver_app.phone
-        else:
-            car_info = "🚗 Mashina ma'lumotlari mavjud emas"
-            driver_phone = user.phone
-    except Exception:
-        car_info = "🚗 Mashina ma'lumotlari mavjud emas"
-        driver_phone = user.phone
-    
-    # Send car photo if available
-    try:
-        if driver_app and hasattr(driver_app, 'car_photo_file_id') and driver_app.car_photo_file_id:
-            admin_user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
-            await bot.send_photo(
-                chat_id=client_telegram_id,
-                photo=driver_app.car_photo_file_id,
-                caption=f"{get_text(admin_user.language, 'driver_accepted_title')}\n\n{get_text(admin_user.language, 'driver_accepted_driver')} {user.full_name}\n{get_text(admin_user.language, 'driver_accepted_phone')} {driver_phone}\n{car_info}\n\n{get_text(admin_user.language, 'driver_will_contact_soon')}",
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="👤 Haydovchi profili", url=f"tg://user?id={user.telegram_id}")]
-                ])
-            )
-        else:
-            await bot.send_message(
-                chat_id=client_telegram_id,
-                text=f"{get_text(admin_user.language, 'driver_accepted_title')}\n\n{get_text(admin_user.language, 'driver_accepted_driver')} {user.full_name}\n{get_text(admin_user.language, 'driver_accepted_phone')} {driver_phone}\n{car_info}\n\n{get_text(admin_user.language, 'driver_will_contact_soon')}",
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="👤 Haydovchi profili", url=f"tg://user?id={user.telegram_id}")]
-                ])
-            )
-    except Exception as e:
-        print(f"Client notification error: {e}")
-        # Fallback to text message
-        await bot.send_message(
+    client_telegram_id = order.client.telegram_id
+    
+    # Driver application details
+    driver_app = data.car
+    car_info = driver_app.describe("🚗") if driver_app else "🚗 Mashina ma'lumotlari mavjud emas"
+    driver_phone = driver_app.phone if driver_app else user.phone
+    
+    # Send to client: car photo if available, text otherwise (and as fallback)
+    client_message = {
+        'chat_id': client_telegram_id,
+        'text': f"{get_text(user.language, 'driver_accepted_title')}\n\n{get_text(user.language, 'driver_accepted_driver')} {user.full_name}\n{get_text(user.language, 'driver_accepted_phone')} {driver_phone}\n{car_info}\n\n{get_text(user.language, 'driver_will_contact_soon')}",
+        'parse_mode': "Markdown",
+        'reply_markup': InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="👤 Haydovchi profili", url=f"tg://user?id={user.telegram_id}")]
+        ]),
+    }
+    if driver_app and driver_app.car_photo_file_id:
+        notifier.submit(
+            'send_photo',
             chat_id=client_telegram_id,
-            text=f"{get_text(admin_user.language, 'driver_accepted_title')}\n\n{get_text(admin_user.language, 'driver_accepted_driver')} {user.full_name}\n{get_text(admin_user.language, 'driver_accepted_phone')} {driver_phone}\n{car_info}\n\n{get_text(admin_user.language, 'driver_will_contact_soon')}",
+            photo=driver_app.car_photo_file_id,
+            caption=client_message['text'],
             parse_mode="Markdown",
-            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="👤 Haydovchi profili", url=f"tg://user?id={user.telegram_id}")]
-            ])
+            reply_markup=client_message['reply_markup'],
+            fallback=('send_message', client_message),
         )
+    else:
+        notifier.submit('send_message', **client_message)
     
     # Send notification to driver with client details
     try:
-        client_telegram_id = await sync_to_async(lambda: order.client.telegram_id)()
-        client_name = await sync_to_async(lambda: order.client.full_name)()
-        client_phone = await sync_to_async(lambda: order.client.phone or "Kiritilmagan")()
+        client_telegram_id = order.client.telegram_id
+        client_name = order.client.full_name
+        client_phone = order.client.phone
         
         # Get order details
-        from_location = await sync_to_async(lambda: order.from_location)()
-        to_location = await sync_to_async(lambda: order.to_location)()
-        travel_date = await sync_to_async(lambda: order.date.strftime('%d.%m.%Y'))()
-        passengers = await sync_to_async(lambda: getattr(order, 'passengers', 1))()
-        comment = await sync_to_async(lambda: order.description or "Yo'q")()
+        from_location = order.from_location
+        to_location = order.to_location
+        travel_date = order.travel_date
+        passengers = order.details
+        comment = order.comment
         
         driver_message = (
             f"{get_text(user.language, 'driver_accepted_taxi')}\n\n"
@@ -2863,7 +2831,8 @@ async def accept_taxi_order_callback(callback: CallbackQuery):
             f"🔗 Mijoz bilan bog'lanish uchun yuqoridagi ismga bosing"
         )
         
-        await bot.send_message(
+        notifier.submit(
+            'send_message',
             chat_id=callback.from_user.id,
             text=driver_message,
             parse_mode="Markdown",
@@ -2878,23 +2847,21 @@ async def accept_taxi_order_callback(callback: CallbackQuery):
 async def accept_parcel_order_callback(callback: CallbackQuery):
     order_id = callback.data.split("_")[-1]
     
+    # Load driver, order, client, driver application and pricing in one hop
+    data = await sync_to_async(load_order_acceptance)(order_id, callback.from_user.id, 'parcel')
+    user, order, ball_cost = data.driver, data.order, data.ball_cost
+    
     # Check if user exists and is a driver or admin
-    try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
-        
-        # Check if user is driver or admin (admin ID: 1212795522)
-        if user.role not in ['driver', 'admin'] and callback.from_user.id != 1212795522:
-            await callback.answer("❌ Faqat haydovchilar buyurtmani qabul qilishi mumkin!", show_alert=True)
-            return
-            
-    except CustomUser.DoesNotExist:
+    if user is None:
         await callback.answer("❌ Siz tizimda ro'yxatdan o'tmagansiz!", show_alert=True)
         return
     
-    # Get order
-    try:
-        order = await sync_to_async(Order.objects.get)(id=order_id)
-    except Order.DoesNotExist:
+    # Check if user is driver or admin (admin ID: 1212795522)
+    if user.role not in ['driver', 'admin'] and callback.from_user.id != 1212795522:
+        await callback.answer("❌ Faqat haydovchilar buyurtmani qabul qilishi mumkin!", show_alert=True)
+        return
+    
+    if order is None:
         await callback.answer("❌ Buyurtma topilmadi!", show_alert=True)
         return
     
@@ -2903,33 +2870,24 @@ async def accept_parcel_order_callback(callback: CallbackQuery):
         await callback.answer("❌ Bu buyurtma allaqachon qabul qilingan!", show_alert=True)
         return
     
-    # Get ball pricing for parcel
-    from set_main.models import BallPricing
-    try:
-        parcel_pricing = await sync_to_async(BallPricing.objects.get)(service_type='taxi_parcel', is_active=True)
-        ball_cost = parcel_pricing.calculate_price()
-    except BallPricing.DoesNotExist:
-        ball_cost = 1  # Default narx
-    
-    # Check if user has enough balls (skip for admin)
-    if user.role != 'admin' and callback.from_user.id != 1212795522:
-        if user.balls < ball_cost:
-            await callback.message.edit_reply_markup(
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text=f"❌ Ball yetarli emas ({ball_cost} ball kerak)", callback_data="insufficient_balls")]
-                ])
-            )
-            await callback.answer("❌ Ball yetarli emas! Ball sotib oling.", show_alert=True)
-            return
-        
-        # Deduct balls from driver
-        user.balls -= ball_cost
-        await sync_to_async(user.save)()
+    # Accept order and deduct balls atomically (skip balls for admin)
+    charge = user.role != 'admin' and callback.from_user.id != 1212795522
+    result = await sync_to_async(claim_order)(order.pk, user.pk, ball_cost, charge)
+    if result == 'already_accepted':
+        await callback.answer("❌ Bu buyurtma allaqachon qabul qilingan!", show_alert=True)
+        return
+    if result == 'insufficient_balls':
+        await callback.message.edit_reply_markup(
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text=f"❌ Ball yetarli emas ({ball_cost} ball kerak)", callback_data="insufficient_balls")]
+            ])
+        )
+        await callback.answer("❌ Ball yetarli emas! Ball sotib oling.", show_alert=True)
+        return
     
-    # Update order status
+    if charge:
+        user.balls -= ball_cost
     order.status = 'accepted'
-    order.accepted_driver = user
-    await sync_to_async(order.save)()
     
     # Delete order message from group
     try:
@@ -2937,69 +2895,47 @@ async def accept_parcel_order_callback(callback: CallbackQuery):
     except Exception as e:
         print(f"Order message deletion error: {e}")
     
-    # Send notification to client with driver details
-    from bot.loader import bot
-    
     # Get client telegram_id safely
-    client_telegram_id = await sync_to_async(lambda: order.client.telegram_id)()
-    
-    # Get driver application details
-    try:
-        driver_app = await sync_to_async(DriverApplication.objects.filter(user=user).first)()
-        if driver_app:
-            car_info = f"🚗 {driver_app.car_model} ({driver_app.car_number})"
-            if driver_app.car_year:
-                car_info += f" - {driver_app.car_year} yil"
-        else:
-            car_info = "🚗 Mashina ma'lumotlari mavjud emas"
-    except Exception:
-        car_info = "🚗 Mashina ma'lumotlari mavjud emas"
-    
-    # Send car photo if available
-    try:
-        if driver_app and driver_app.car_photo_file_id:
-            await bot.send_photo(
-                chat_id=client_telegram_id,
-                photo=driver_app.car_photo_file_id,
-                caption=f"✅ **Pochta buyurtmangiz qabul qilindi!**\n\n🚖 Haydovchi: {user.full_name}\n📞 Tel: {user.phone or 'Kiritilmagan'}\n{car_info}\n\nTez orada siz bilan bog'lanishadi.",
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="👤 Haydovchi profili", url=f"tg://user?id={user.telegram_id}")]
-                ])
-            )
-        else:
-            await bot.send_message(
-                chat_id=client_telegram_id,
-                text=f"✅ **Pochta buyurtmangiz qabul qilindi!**\n\n🚖 Haydovchi: {user.full_name}\n📞 Tel: {user.phone or 'Kiritilmagan'}\n{car_info}\n\nTez orada siz bilan bog'lanishadi.",
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="👤 Haydovchi profili", url=f"tg://user?id={user.telegram_id}")]
-                ])
-            )
-    except Exception as e:
-        print(f"Client notification error: {e}")
-        # Fallback to text message
-        await bot.send_message(
+    client_telegram_id = order.client.telegram_id
+    
+    # Driver application details
+    driver_app = data.car
+    car_info = driver_app.describe("🚗") if driver_app else "🚗 Mashina ma'lumotlari mavjud emas"
+    
+    # Send to client: car photo if available, text otherwise (and as fallback)
+    client_message = {
+        'chat_id': client_telegram_id,
+        'text': f"✅ **Pochta buyurtmangiz qabul qilindi!**\n\n🚖 Haydovchi: {user.full_name}\n📞 Tel: {user.phone or 'Kiritilmagan'}\n{car_info}\n\nTez orada siz bilan bog'lanishadi.",
+        'parse_mode': "Markdown",
+        'reply_markup': InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="👤 Haydovchi profili", url=f"tg://user?id={user.telegram_id}")]
+        ]),
+    }
+    if driver_app and driver_app.car_photo_file_id:
+        notifier.submit(
+            'send_photo',
             chat_id=client_telegram_id,
-            text=f"✅ **Pochta buyurtmangiz qabul qilindi!**\n\n🚖 Haydovchi: {user.full_name}\n📞 Tel: {user.phone or 'Kiritilmagan'}\n{car_info}\n\nTez orada siz bilan bog'lanishadi.",
+            photo=driver_app.car_photo_file_id,
+            caption=client_message['text'],
             parse_mode="Markdown",
-            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="👤 Haydovchi profili", url=f"tg://user?id={user.telegram_id}")]
-            ])
+            reply_markup=client_message['reply_markup'],
+            fallback=('send_message', client_message),
         )
+    else:
+        notifier.submit('send_message', **client_message)
     
     # Send notification to driver with client details
     try:
-        client_telegram_id = await sync_to_async(lambda: order.client.telegram_id)()
-        client_name = await sync_to_async(lambda: order.client.full_name)()
-        client_phone = await sync_to_async(lambda: order.client.phone or "Kiritilmagan")()
+        client_telegram_id = order.client.telegram_id
+        client_name = order.client.full_name
+        client_phone = order.client.phone
         
         # Get order details
-        from_location = await sync_to_async(lambda: order.from_location)()
-        to_location = await sync_to_async(lambda: order.to_location)()
-        travel_date = await sync_to_async(lambda: order.date.strftime('%d.%m.%Y'))()
-        parcel_content = await sync_to_async(lambda: getattr(order, 'parcel_content', 'Mavjud emas'))()
-        comment = await sync_to_async(lambda: order.description or "Yo'q")()
+        from_location = order.from_location
+        to_location = order.to_location
+        travel_date = order.travel_date
+        parcel_content = order.details
+        comment = order.comment
         
         driver_message = (
             f"✅ **Siz pochta buyurtmasini qabul qildingiz!**\n\n"
@@ -3016,7 +2952,8 @@ async def accept_parcel_order_callback(callback: CallbackQuery):
             f"🔗 Mijoz bilan bog'lanish uchun yuqoridagi ismga bosing"
         )
         
-        await bot.send_message(
+        notifier.submit(
+            'send_message',
             chat_id=callback.from_user.id,
             text=driver_message,
             parse_mode="Markdown",
@@ -3031,23 +2968,21 @@ async def accept_parcel_order_callback(callback: CallbackQuery):
 async def accept_cargo_order_callback(callback: CallbackQuery):
     order_id = callback.data.split("_")[-1]
     
+    # Load driver, order, client, driver application and pricing in one hop
+    data = await sync_to_async(load_order_acceptance)(order_id, callback.from_user.id, 'cargo')
+    user, order, ball_cost = data.driver, data.order, data.ball_cost
+    
     # Check if user exists and is a driver or admin
-    try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
-        
-        # Check if user is driver or admin (admin ID: 1212795522)
-        if user.role not in ['driver', 'admin'] and callback.from_user.id != 1212795522:
-            await callback.answer("❌ Faqat haydovchilar buyurtmani qabul qilishi mumkin!", show_alert=True)
-            return
-            
-    except CustomUser.DoesNotExist:
+    if user is None:
         await callback.answer("❌ Siz tizimda ro'yxatdan o'tmagansiz!", show_alert=True)
         return
     
-    # Get order
-    try:
-        order = await sync_to_async(Order.objects.get)(id=order_id)
-    except Order.DoesNotExist:
+    # Check if user is driver or admin (admin ID: 1212795522)
+    if user.role not in ['driver', 'admin'] and callback.from_user.id != 1212795522:
+        await callback.answer("❌ Faqat haydovchilar buyurtmani qabul qilishi mumkin!", show_alert=True)
+        return
+    
+    if order is None:
         await callback.answer("❌ Buyurtma topilmadi!", show_alert=True)
         return
     
@@ -3056,33 +2991,24 @@ async def accept_cargo_order_callback(callback: CallbackQuery):
         await callback.answer("❌ Bu buyurtma allaqachon qabul qilingan!", show_alert=True)
         return
     
-    # Get ball pricing for cargo
-    from set_main.models import BallPricing
-    try:
-        cargo_pricing = await sync_to_async(BallPricing.objects.get)(service_type='cargo', is_active=True)
-        ball_cost = cargo_pricing.calculate_price()
-    except BallPricing.DoesNotExist:
-        ball_cost = 1  # Default narx
-    
-    # Check if user has enough balls (skip for admin)
-    if user.role != 'admin' and callback.from_user.id != 1212795522:
-        if user.balls < ball_cost:
-            await callback.message.edit_reply_markup(
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text=f"❌ Ball yetarli emas ({ball_cost} ball kerak)", callback_data="insufficient_balls")]
-                ])
-            )
-            await callback.answer("❌ Ball yetarli emas! Ball sotib oling.", show_alert=True)
-            return
-        
-        # Deduct balls from driver
-        user.balls -= ball_cost
-        await sync_to_async(user.save)()
+    # Accept order and deduct balls atomically (skip balls for admin)
+    charge = user.role != 'admin' and callback.from_user.id != 1212795522
+    result = await sync_to_async(claim_order)(order.pk, user.pk, ball_cost, charge)
+    if result == 'already_accepted':
+        await callback.answer("❌ Bu buyurtma allaqachon qabul qilingan!", show_alert=True)
+        return
+    if result == 'insufficient_balls':
+        await callback.message.edit_reply_markup(
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text=f"❌ Ball yetarli emas ({ball_cost} ball kerak)", callback_data="insufficient_balls")]
+            ])
+        )
+        await callback.answer("❌ Ball yetarli emas! Ball sotib oling.", show_alert=True)
+        return
     
-    # Update order status
+    if charge:
+        user.balls -= ball_cost
     order.status = 'accepted'
-    order.accepted_driver = user
-    await sync_to_async(order.save)()
     
     # Delete order message from group
     try:
@@ -3090,70 +3016,47 @@ async def accept_cargo_order_callback(callback: CallbackQuery):
     except Exception as e:
         print(f"Order message deletion error: {e}")
     
-    # Send notification to client with driver details
-    from bot.loader import bot
-    
     # Get client telegram_id safely
-    client_telegram_id = await sync_to_async(lambda: order.client.telegram_id)()
-    
-    # Get driver application details
-    driver_app = None
-    try:
-        driver_app = await sync_to_async(DriverApplication.objects.filter(user=user).first)()
-        if driver_app:
-            car_info = f"🚚 {driver_app.car_model} ({driver_app.car_number})"
-            if driver_app.car_year:
-                car_info += f" - {driver_app.car_year} yil"
-        else:
-            car_info = "🚚 Mashina ma'lumotlari mavjud emas"
-    except Exception:
-        car_info = "🚚 Mashina ma'lumotlari mavjud emas"
-    
-    # Send car photo if available
-    try:
-        if driver_app and hasattr(driver_app, 'car_photo_file_id') and driver_app.car_photo_file_id:
-            await bot.send_photo(
-                chat_id=client_telegram_id,
-                photo=driver_app.car_photo_file_id,
-                caption=f"✅ **Yuk buyurtmangiz qabul qilindi!**\n\n🚚 Haydovchi: {user.full_name}\n📞 Tel: {user.phone or 'Kiritilmagan'}\n{car_info}\n\nTez orada siz bilan bog'lanishadi.",
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="👤 Haydovchi profili", url=f"tg://user?id={user.telegram_id}")]
-                ])
-            )
-        else:
-            await bot.send_message(
-                chat_id=client_telegram_id,
-                text=f"✅ **Yuk buyurtmangiz qabul qilindi!**\n\n🚚 Haydovchi: {user.full_name}\n📞 Tel: {user.phone or 'Kiritilmagan'}\n{car_info}\n\nTez orada siz bilan bog'lanishadi.",
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="👤 Haydovchi profili", url=f"tg://user?id={user.telegram_id}")]
-                ])
-            )
-    except Exception as e:
-        print(f"Client notification error: {e}")
-        # Fallback to text message
-        await bot.send_message(
+    client_telegram_id = order.client.telegram_id
+    
+    # Driver application details
+    driver_app = data.car
+    car_info = driver_app.describe("🚚") if driver_app else "🚚 Mashina ma'lumotlari mavjud emas"
+    
+    # Send to client: car photo if available, text otherwise (and as fallback)
+    client_message = {
+        'chat_id': client_telegram_id,
+        'text': f"✅ **Yuk buyurtmangiz qabul qilindi!**\n\n🚚 Haydovchi: {user.full_name}\n📞 Tel: {user.phone or 'Kiritilmagan'}\n{car_info}\n\nTez orada siz bilan bog'lanishadi.",
+        'parse_mode': "Markdown",
+        'reply_markup': InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="👤 Haydovchi profili", url=f"tg://user?id={user.telegram_id}")]
+        ]),
+    }
+    if driver_app and driver_app.car_photo_file_id:
+        notifier.submit(
+            'send_photo',
             chat_id=client_telegram_id,
-            text=f"✅ **Yuk buyurtmangiz qabul qilindi!**\n\n🚚 Haydovchi: {user.full_name}\n📞 Tel: {user.phone or 'Kiritilmagan'}\n{car_info}\n\nTez orada siz bilan bog'lanishadi.",
+            photo=driver_app.car_photo_file_id,
+            caption=client_message['text'],
             parse_mode="Markdown",
-            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="👤 Haydovchi profili", url=f"tg://user?id={user.telegram_id}")]
-            ])
+            reply_markup=client_message['reply_markup'],
+            fallback=('send_message', client_message),
         )
+    else:
+        notifier.submit('send_message', **client_message)
     
     # Send notification to driver with client details
     try:
-        client_telegram_id = await sync_to_async(lambda: order.client.telegram_id)()
-        client_name = await sync_to_async(lambda: order.client.full_name)()
-        client_phone = await sync_to_async(lambda: order.client.phone or "Kiritilmagan")()
+        client_telegram_id = order.client.telegram_id
+        client_name = order.client.full_name
+        client_phone = order.client.phone
         
         # Get order details
-        from_location = await sync_to_async(lambda: order.from_location)()
-        to_location = await sync_to_async(lambda: order.to_location)()
-        travel_date = await sync_to_async(lambda: order.date.strftime('%d.%m.%Y'))()
-        cargo_details = await sync_to_async(lambda: getattr(order, 'cargo_details', 'Mavjud emas'))()
-        comment = await sync_to_async(lambda: order.description or "Yo'q")()
+        from_location = order.from_location
+        to_location = order.to_location
+        travel_date = order.travel_date
+        cargo_details = order.details
+        comment = order.comment
         
         driver_message = (
             f"✅ **Siz yuk buyurtmasini qabul qildingiz!**\n\n"
@@ -3170,7 +3073,8 @@ async def accept_cargo_order_callback(callback: CallbackQuery):
             f"🔗 Mijoz bilan bog'lanish uchun yuqoridagi ismga bosing"
         )
         
-        await bot.send_message(
+        notifier.submit(
+            'send_message',
             chat_id=callback.from_user.id,
             text=driver_message,
             parse_mode="Markdown",
@@ -3294,7 +3198,7 @@ async def reject_flight_ticket_callback(callback: CallbackQuery, state: FSMConte
     await state.update_data(reject_flight_ticket_id=ticket_id)
     
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+        user = await user_profiles.get(callback.from_user.id)
         await callback.message.edit_text(
             text=get_text(user.language, 'flight_rejection_title'),
             parse_mode="Markdown",
@@ -3450,7 +3354,7 @@ async def reject_train_ticket_callback(callback: CallbackQuery, state: FSMContex
     await state.update_data(reject_train_ticket_id=ticket_id)
     
     try:
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+        user = await user_profiles.get(callback.from_user.id)
         await callback.message.edit_text(
             text=get_text(user.language, 'train_rejection_title'),
             parse_mode="Markdown",
@@ -3506,7 +3410,7 @@ async def handle_language(message: Message, state: FSMContext):
 # Taxi Order Message Handlers
 @main_router.message(TaxiOrder.full_name)
 async def taxi_full_name(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await state.update_data(full_name=message.text)
     await message.answer(get_text(user.language, 'phone_prompt'))
     await state.set_state(TaxiOrder.phone)
@@ -3523,7 +3427,7 @@ async def taxi_passengers(message: Message, state: FSMContext):
         await message.answer("❌ Iltimos, raqam kiriting!")
         return
     
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await message.answer(
         get_text(user.language, 'comment_prompt'),
         reply_markup=InlineKeyboardMarkup(inline_keyboard=[
@@ -3538,15 +3442,15 @@ async def taxi_phone(message: Message, state: FSMContext):
     phone_raw = message.text.strip()
     phone_pattern = r"^\+?\d{7,15}$"
     if not re.match(phone_pattern, phone_raw):
-        user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+        user = await user_profiles.get(message.from_user.id)
         await message.answer(get_text(user.language, 'invalid_phone'))
         return
     phone = phone_raw
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     # Update user's phone number in database
     user.phone = phone
-    await sync_to_async(user.save)()
+    await sync_to_async(user.save)(update_fields=['phone'])
     
     await state.update_data(phone=phone)
     
@@ -3560,7 +3464,7 @@ async def taxi_no_comment_callback(callback: CallbackQuery, state: FSMContext):
     await state.update_data(comment="")
     
     data = await state.get_data()
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     passengers = data['passengers']
     
     # Build location strings
@@ -3599,7 +3503,7 @@ async def taxi_comment(message: Message, state: FSMContext):
     await state.update_data(comment=message.text)
     
     data = await state.get_data()
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     passengers = data['passengers']
     
     # Build location strings
@@ -3637,7 +3541,7 @@ async def taxi_comment(message: Message, state: FSMContext):
 @main_router.callback_query(F.data.startswith("taxi_from_country_"))
 async def taxi_from_country_callback(callback: CallbackQuery, state: FSMContext):
     country_code = callback.data.split("_")[-1]
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await state.update_data(from_country=country_code)
     
     # Show region input prompt instead of keyboard
@@ -3652,7 +3556,7 @@ async def taxi_from_country_callback(callback: CallbackQuery, state: FSMContext)
 @main_router.message(TaxiOrder.from_region)
 async def taxi_from_region_input(message: Message, state: FSMContext):
     """Handle from region text input"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     await state.update_data(from_region=message.text, from_region_name=message.text)
     
@@ -3668,7 +3572,7 @@ async def taxi_from_region_input(message: Message, state: FSMContext):
 @main_router.message(TaxiOrder.from_city)
 async def taxi_from_city_input(message: Message, state: FSMContext):
     """Handle from city text input"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     await state.update_data(from_city=message.text, from_city_name=message.text)
     
@@ -3684,7 +3588,7 @@ async def taxi_from_city_input(message: Message, state: FSMContext):
 @main_router.callback_query(F.data.startswith("taxi_to_country_"))
 async def taxi_to_country_callback(callback: CallbackQuery, state: FSMContext):
     country_code = callback.data.split("_")[-1]
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await state.update_data(to_country=country_code)
     
     # Show region input prompt instead of keyboard
@@ -3699,7 +3603,7 @@ async def taxi_to_country_callback(callback: CallbackQuery, state: FSMContext):
 @main_router.message(TaxiOrder.to_region)
 async def taxi_to_region_input(message: Message, state: FSMContext):
     """Handle to region text input"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     await state.update_data(to_region=message.text, to_region_name=message.text)
     
@@ -3715,7 +3619,7 @@ async def taxi_to_region_input(message: Message, state: FSMContext):
 @main_router.message(TaxiOrder.to_city)
 async def taxi_to_city_input(message: Message, state: FSMContext):
     """Handle to city text input"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     await state.update_data(to_city=message.text, to_city_name=message.text)
     
@@ -3729,13 +3633,13 @@ async def taxi_to_city_input(message: Message, state: FSMContext):
 # Manual city input callbacks
 @main_router.callback_query(F.data == "taxi_manual_from_city")
 async def taxi_manual_from_city_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await callback.message.edit_text(get_text(user.language, 'enter_city_name'))
     await state.set_state(TaxiOrder.manual_from_city)
 
 @main_router.callback_query(F.data == "taxi_manual_to_city")
 async def taxi_manual_to_city_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await callback.message.edit_text(get_text(user.language, 'enter_city_name'))
     await state.set_state(TaxiOrder.manual_to_city)
 
@@ -3744,7 +3648,7 @@ async def taxi_manual_from_city_input(message: Message, state: FSMContext):
     await state.update_data(from_city=message.text, from_city_name=message.text)
     
     # To country selection
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     keyboard = create_country_keyboard("taxi_to_country_", "main_menu", user.language)
     
     await message.answer(
@@ -3762,7 +3666,7 @@ async def taxi_manual_to_city_input(message: Message, state: FSMContext):
     years = [current_year, current_year + 1]
     keyboard = create_compact_keyboard([(str(year), str(year)) for year in years], "taxi_year", "main_menu")
     
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await message.answer(
         get_text(user.language, 'select_year'),
         reply_markup=keyboard
@@ -3775,7 +3679,7 @@ async def taxi_year_callback(callback: CallbackQuery, state: FSMContext):
     year = int(callback.data.split("_")[-1])
     await state.update_data(year=year)
     
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     keyboard = create_month_keyboard(year, datetime.now().month, "taxi_month", "main_menu", user.language)
     
     await callback.message.edit_text(
@@ -3791,7 +3695,7 @@ async def taxi_month_callback(callback: CallbackQuery, state: FSMContext):
     month = int(parts[-1])
     await state.update_data(year=year, month=month)
     
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     keyboard = create_day_keyboard(year, month, "taxi_day", "taxi_month_back", user.language)
     
     await callback.message.edit_text(
@@ -3810,21 +3714,21 @@ async def taxi_day_callback(callback: CallbackQuery, state: FSMContext):
     travel_date = f"{day:02d}.{month:02d}.{year}"
     await state.update_data(travel_date=travel_date)
     
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await callback.message.edit_text(get_text(user.language, 'passengers_prompt'))
     await state.set_state(TaxiOrder.passengers)
 
 # Back navigation callbacks for taxi
 @main_router.callback_query(F.data == "taxi_from_country_back")
 async def taxi_from_country_back_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     keyboard = create_country_keyboard("taxi_from_country_", "main_menu", user.language)
     await callback.message.edit_text(get_text(user.language, 'country_selection_creative'), reply_markup=keyboard)
     await state.set_state(TaxiOrder.from_country)
 
 @main_router.callback_query(F.data == "taxi_from_region_back")
 async def taxi_from_region_back_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     data = await state.get_data()
     country_code = data.get('from_country', 'UZ')
     regions = await get_regions_for_country(country_code, user.language)
@@ -3834,7 +3738,7 @@ async def taxi_from_region_back_callback(callback: CallbackQuery, state: FSMCont
 
 @main_router.callback_query(F.data == "taxi_to_country_back")
 async def taxi_to_country_back_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     data = await state.get_data()
     country_code = data.get('to_country', 'UZ')
     regions = await get_regions_for_country(country_code, user.language)
@@ -3844,14 +3748,14 @@ async def taxi_to_country_back_callback(callback: CallbackQuery, state: FSMConte
 
 @main_router.callback_query(F.data == "taxi_month_back")
 async def taxi_month_back_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     keyboard = create_month_keyboard(2025, 7, "taxi_month", "taxi_to_city_back", user.language)
     await callback.message.edit_text(get_text(user.language, 'select_month'), reply_markup=keyboard)
     await state.set_state(TaxiOrder.travel_date)
 
 @main_router.callback_query(F.data == "taxi_to_city_back")
 async def taxi_to_city_back_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     data = await state.get_data()
     country_code = data.get('to_country', 'UZ')
     regions = await get_regions_for_country(country_code, user.language)
@@ -3867,7 +3771,7 @@ async def taxi_comment(message: Message, state: FSMContext):
     passengers = data['passengers']
     ball_cost = passengers  # 1 ball per passenger
     
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     # Get country names
     from_country_name = await get_country_name(data.get('from_country', ''), user.language)
@@ -3880,29 +3784,23 @@ async def taxi_comment(message: Message, state: FSMContext):
     to_city_name = ""
     
     try:
+        await ensure_geo_index()
+        
         # Get from region name
         if data.get('from_region'):
-            from set_main.models import Region
-            from_region = await sync_to_async(Region.objects.get)(id=data['from_region'])
-            from_region_name = getattr(from_region, f'name_{user.language}', from_region.name_uz)
+            from_region_name = geo_index.region_name(data['from_region'], user.language) or ""
         
         # Get from city name
         if data.get('from_city'):
-            from set_main.models import City
-            from_city = await sync_to_async(City.objects.get)(id=data['from_city'])
-            from_city_name = getattr(from_city, f'name_{user.language}', from_city.name_uz)
+            from_city_name = geo_index.city_name(data['from_city'], user.language) or ""
         
         # Get to region name
         if data.get('to_region'):
-            from set_main.models import Region
-            to_region = await sync_to_async(Region.objects.get)(id=data['to_region'])
-            to_region_name = getattr(to_region, f'name_{user.language}', to_region.name_uz)
+            to_region_name = geo_index.region_name(data['to_region'], user.language) or ""
         
         # Get to city name
         if data.get('to_city'):
-            from set_main.models import City
-            to_city = await sync_to_async(City.objects.get)(id=data['to_city'])
-            to_city_name = getattr(to_city, f'name_{user.language}', to_city.name_uz)
+            to_city_name = geo_index.city_name(data['to_city'], user.language) or ""
     except Exception as e:
         print(f"Error getting location names: {e}")
     
@@ -3958,7 +3856,7 @@ async def taxi_comment(message: Message, state: FSMContext):
     )
     
     # Get taxi group ID from database
-    taxi_group_id = await sync_to_async(BotSettings.get_setting)('taxi_parcel_group_id', '-1002715393990')
+    taxi_group_id = await settings_snapshot.get('taxi_parcel_group_id', '-1002715393990')
     try:
         taxi_group_id = int(taxi_group_id)
     except (ValueError, TypeError):
@@ -3993,7 +3891,7 @@ async def taxi_comment(message: Message, state: FSMContext):
 @main_router.message(ParcelOrder.full_name)
 async def parcel_full_name(message: Message, state: FSMContext):
     await state.update_data(full_name=message.text)
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await message.answer(get_text(user.language, 'phone_prompt'))
     await state.set_state(ParcelOrder.phone)
 
@@ -4006,11 +3904,11 @@ async def parcel_phone(message: Message, state: FSMContext):
         await message.answer("❌ Telefon raqam noto'g'ri! Faqat + bilan boshlanishi yoki raqam bo'lishi mumkin. Masalan: +998901234567 yoki 901234567\nIltimos, qayta kiriting:")
         return
     phone = phone_raw
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     # Update user's phone number in database
     user.phone = phone
-    await sync_to_async(user.save)()
+    await sync_to_async(user.save)(update_fields=['phone'])
     
     await state.update_data(phone=phone)
     keyboard = create_country_keyboard("parcel_from_country_", "main_menu", user.language)
@@ -4020,7 +3918,7 @@ async def parcel_phone(message: Message, state: FSMContext):
 @main_router.callback_query(F.data.startswith("parcel_from_country_"))
 async def parcel_from_country_callback(callback: CallbackQuery, state: FSMContext):
     country_code = callback.data.split("_")[-1]
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await state.update_data(from_country=country_code)
     
     # Show region input prompt instead of keyboard
@@ -4035,7 +3933,7 @@ async def parcel_from_country_callback(callback: CallbackQuery, state: FSMContex
 @main_router.message(ParcelOrder.from_region)
 async def parcel_from_region_input(message: Message, state: FSMContext):
     """Handle from region text input"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     await state.update_data(from_region=message.text, from_region_name=message.text)
     
@@ -4051,7 +3949,7 @@ async def parcel_from_region_input(message: Message, state: FSMContext):
 @main_router.message(ParcelOrder.parcel_content)
 async def parcel_content(message: Message, state: FSMContext):
     await state.update_data(parcel_content=message.text)
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await message.answer(
         get_text(user.language, 'comment_prompt'),
         reply_markup=InlineKeyboardMarkup(inline_keyboard=[
@@ -4065,7 +3963,7 @@ async def parcel_no_comment_callback(callback: CallbackQuery, state: FSMContext)
     await state.update_data(comment="")
     
     data = await state.get_data()
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     # Build location strings with await
     from_country_name = await get_country_name(data.get('from_country', ''), user.language)
@@ -4114,7 +4012,7 @@ async def parcel_comment(message: Message, state: FSMContext):
     await state.update_data(comment=message.text)
     
     data = await state.get_data()
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     # Build location strings with await
     from_country_name = await get_country_name(data.get('from_country', ''), user.language)
@@ -4165,18 +4063,18 @@ async def parcel_comment(message: Message, state: FSMContext):
 @main_router.message(CargoOrder.full_name)
 async def cargo_full_name(message: Message, state: FSMContext):
     await state.update_data(full_name=message.text)
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await message.answer(get_text(user.language, 'phone_prompt'))
     await state.set_state(CargoOrder.phone)
 
 @main_router.message(CargoOrder.phone)
 async def cargo_phone(message: Message, state: FSMContext):
     phone = ''.join(filter(str.isdigit, message.text))
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     # Update user's phone number in database
     user.phone = phone
-    await sync_to_async(user.save)()
+    await sync_to_async(user.save)(update_fields=['phone'])
     
     await state.update_data(phone=phone)
     keyboard = create_country_keyboard("cargo_from_country_", "main_menu", user.language)
@@ -4186,7 +4084,7 @@ async def cargo_phone(message: Message, state: FSMContext):
 @main_router.callback_query(F.data.startswith("cargo_from_country_"))
 async def cargo_from_country_callback(callback: CallbackQuery, state: FSMContext):
     country_code = callback.data.split("_")[-1]
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await state.update_data(from_country=country_code)
     
     # Show region input prompt instead of keyboard
@@ -4201,7 +4099,7 @@ async def cargo_from_country_callback(callback: CallbackQuery, state: FSMContext
 @main_router.message(CargoOrder.from_region)
 async def cargo_from_region_input(message: Message, state: FSMContext):
     """Handle from region text input"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     await state.update_data(from_region=message.text, from_region_name=message.text)
     
@@ -4217,14 +4115,14 @@ async def cargo_from_region_input(message: Message, state: FSMContext):
 @main_router.message(CargoOrder.cargo_weight)
 async def cargo_weight(message: Message, state: FSMContext):
     await state.update_data(cargo_weight=message.text)
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await message.answer(get_text(user.language, 'cargo_price_prompt'))
     await state.set_state(CargoOrder.cargo_price)
 
 @main_router.message(CargoOrder.cargo_price)
 async def cargo_price(message: Message, state: FSMContext):
     await state.update_data(cargo_price=message.text)
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await message.answer(
         get_text(user.language, 'cargo_terms_prompt'),
         reply_markup=InlineKeyboardMarkup(inline_keyboard=[
@@ -4236,7 +4134,7 @@ async def cargo_price(message: Message, state: FSMContext):
 @main_router.message(CargoOrder.cargo_terms)
 async def cargo_terms(message: Message, state: FSMContext):
     await state.update_data(cargo_terms=message.text)
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await message.answer(
         get_text(user.language, 'cargo_comment_prompt'),
         reply_markup=InlineKeyboardMarkup(inline_keyboard=[
@@ -4248,7 +4146,7 @@ async def cargo_terms(message: Message, state: FSMContext):
 @main_router.callback_query(F.data == "cargo_no_terms")
 async def cargo_no_terms_callback(callback: CallbackQuery, state: FSMContext):
     await state.update_data(cargo_terms="")
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await callback.message.edit_text(
         get_text(user.language, 'cargo_comment_prompt'),
         reply_markup=InlineKeyboardMarkup(inline_keyboard=[
@@ -4262,7 +4160,7 @@ async def cargo_no_comment_callback(callback: CallbackQuery, state: FSMContext):
     await state.update_data(comment="")
     
     data = await state.get_data()
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
     # Build location strings with await
     from_country_name = await get_country_name(data.get('from_country', ''), user.language)
@@ -4313,7 +4211,7 @@ async def cargo_comment(message: Message, state: FSMContext):
     
     data = await state.get_data()
     
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     # Build location strings with await
     from_country_name = await get_country_name(data.get('from_country', ''), user.language)
@@ -4365,7 +4263,7 @@ async def cargo_comment(message: Message, state: FSMContext):
 @main_router.callback_query(F.data.startswith("parcel_from_country_"))
 async def parcel_from_country_callback(callback: CallbackQuery, state: FSMContext):
     country_code = callback.data.split("_")[-1]
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await state.update_data(from_country=country_code)
     
     regions = await get_regions_for_country(country_code, user.language)
@@ -4381,12 +4279,11 @@ async def parcel_from_country_callback(callback: CallbackQuery, state: FSMContex
 @main_router.callback_query(F.data.startswith("parcel_from_region_"))
 async def parcel_from_region_callback(callback: CallbackQuery, state: FSMContext):
     region_id = int(callback.data.split("_")[-1])
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     
-    # Get region name from database
-    from set_main.models import Region
-    region = await sync_to_async(Region.objects.get)(id=region_id)
-    region_name = region.name_uz if user.language == 'uz' else region.name_ru
+    # Get region name from geo index
+    await ensure_geo_index()
+    region_name = geo_index.region_name(region_id, 'uz' if user.language == 'uz' else 'ru')
     
     await state.update_data(from_region=region_id, from_region_name=region_name)
     cities = await get_cities_for_region(region_id, user.language)
@@ -4401,7 +4298,7 @@ async def parcel_from_region_callback(callback: CallbackQuery, state: FSMContext
 @main_router.message(ParcelOrder.from_city)
 async def parcel_from_city_input(message: Message, state: FSMContext):
     """Handle from city text input"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     await state.update_data(from_city=message.text, from_city_name=message.text)
     
@@ -4417,7 +4314,7 @@ async def parcel_from_city_input(message: Message, state: FSMContext):
 @main_router.callback_query(F.data.startswith("parcel_to_country_"))
 async def parcel_to_country_callback(callback: CallbackQuery, state: FSMContext):
     country_code = callback.data.split("_")[-1]
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await state.update_data(to_country=country_code)
     
     # Show region input prompt instead of keyboard
@@ -4432,7 +4329,7 @@ async def parcel_to_country_callback(callback: CallbackQuery, state: FSMContext)
 @main_router.message(ParcelOrder.to_region)
 async def parcel_to_region_input(message: Message, state: FSMContext):
     """Handle to region text input"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     await state.update_data(to_region=message.text, to_region_name=message.text)
     
@@ -4448,7 +4345,7 @@ async def parcel_to_region_input(message: Message, state: FSMContext):
 @main_router.message(ParcelOrder.to_city)
 async def parcel_to_city_input(message: Message, state: FSMContext):
     """Handle to city text input"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     await state.update_data(to_city=message.text, to_city_name=message.text)
     
@@ -4463,7 +4360,7 @@ async def parcel_to_city_input(message: Message, state: FSMContext):
 @main_router.callback_query(F.data.startswith("cargo_from_country_"))
 async def cargo_from_country_callback(callback: CallbackQuery, state: FSMContext):
     country_code = callback.data.split("_")[-1]
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await state.update_data(from_country=country_code)
     
     # Show region input prompt instead of keyboard
@@ -4478,7 +4375,7 @@ async def cargo_from_country_callback(callback: CallbackQuery, state: FSMContext
 @main_router.message(CargoOrder.from_region)
 async def cargo_from_region_input(message: Message, state: FSMContext):
     """Handle from region text input"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     await state.update_data(from_region=message.text, from_region_name=message.text)
     
@@ -4494,7 +4391,7 @@ async def cargo_from_region_input(message: Message, state: FSMContext):
 @main_router.message(CargoOrder.from_city)
 async def cargo_from_city_input(message: Message, state: FSMContext):
     """Handle from city text input"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     await state.update_data(from_city=message.text, from_city_name=message.text)
     
@@ -4510,7 +4407,7 @@ async def cargo_from_city_input(message: Message, state: FSMContext):
 @main_router.callback_query(F.data.startswith("cargo_to_country_"))
 async def cargo_to_country_callback(callback: CallbackQuery, state: FSMContext):
     country_code = callback.data.split("_")[-1]
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await state.update_data(to_country=country_code)
     
     # Show region input prompt instead of keyboard
@@ -4525,7 +4422,7 @@ async def cargo_to_country_callback(callback: CallbackQuery, state: FSMContext):
 @main_router.message(CargoOrder.to_region)
 async def cargo_to_region_input(message: Message, state: FSMContext):
     """Handle to region text input"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     await state.update_data(to_region=message.text, to_region_name=message.text)
     
@@ -4541,7 +4438,7 @@ async def cargo_to_region_input(message: Message, state: FSMContext):
 @main_router.message(CargoOrder.to_city)
 async def cargo_to_city_input(message: Message, state: FSMContext):
     """Handle to city text input"""
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     
     await state.update_data(to_city=message.text, to_city_name=message.text)
     
@@ -4555,13 +4452,13 @@ async def cargo_to_city_input(message: Message, state: FSMContext):
 # Manual city input callbacks for Parcel
 @main_router.callback_query(F.data == "parcel_manual_from_city")
 async def parcel_manual_from_city_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await callback.message.edit_text(get_text(user.language, 'enter_city_name'))
     await state.set_state(ParcelOrder.manual_from_city)
 
 @main_router.callback_query(F.data == "parcel_manual_to_city")
 async def parcel_manual_to_city_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await callback.message.edit_text(get_text(user.language, 'enter_city_name'))
     await state.set_state(ParcelOrder.manual_to_city)
 
@@ -4570,7 +4467,7 @@ async def parcel_manual_from_city_input(message: Message, state: FSMContext):
     await state.update_data(from_city=message.text)
     
     # To country selection
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     keyboard = create_country_keyboard("parcel_to_country_", "main_menu", user.language)
     
     await message.answer(
@@ -4588,7 +4485,7 @@ async def parcel_manual_to_city_input(message: Message, state: FSMContext):
     years = [current_year, current_year + 1]
     keyboard = create_compact_keyboard([(str(year), str(year)) for year in years], "parcel_year", "main_menu")
     
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await message.answer(
         get_text(user.language, 'select_year'),
         reply_markup=keyboard
@@ -4598,13 +4495,13 @@ async def parcel_manual_to_city_input(message: Message, state: FSMContext):
 # Manual city input callbacks for Cargo
 @main_router.callback_query(F.data == "cargo_manual_from_city")
 async def cargo_manual_from_city_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await callback.message.edit_text(get_text(user.language, 'enter_city_name'))
     await state.set_state(CargoOrder.manual_from_city)
 
 @main_router.callback_query(F.data == "cargo_manual_to_city")
 async def cargo_manual_to_city_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await callback.message.edit_text(get_text(user.language, 'enter_city_name'))
     await state.set_state(CargoOrder.manual_to_city)
 
@@ -4613,7 +4510,7 @@ async def cargo_manual_from_city_input(message: Message, state: FSMContext):
     await state.update_data(from_city=message.text)
     
     # To country selection
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     keyboard = create_country_keyboard("cargo_to_country_", "main_menu", user.language)
     
     await message.answer(
@@ -4631,7 +4528,7 @@ async def cargo_manual_to_city_input(message: Message, state: FSMContext):
     years = [current_year, current_year + 1]
     keyboard = create_compact_keyboard([(str(year), str(year)) for year in years], "cargo_year", "main_menu")
     
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await message.answer(
         get_text(user.language, 'select_year'),
         reply_markup=keyboard
@@ -4646,7 +4543,7 @@ async def parcel_year_callback(callback: CallbackQuery, state: FSMContext):
     
     keyboard = create_month_keyboard(year, datetime.now().month, "parcel_month", "main_menu")
     
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     keyboard = create_month_keyboard(year, datetime.now().month, "parcel_month", "main_menu", user.language)
     
     await callback.message.edit_text(
@@ -4680,21 +4577,21 @@ async def parcel_day_callback(callback: CallbackQuery, state: FSMContext):
     travel_date = f"{day:02d}.{month:02d}.{year}"
     await state.update_data(travel_date=travel_date)
     
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     await callback.message.edit_text(get_text(user.language, 'passengers_prompt'))
     await state.set_state(ParcelOrder.passengers)
 
 # Back navigation callbacks for parcel
 @main_router.callback_query(F.data == "parcel_from_country_back")
 async def parcel_from_country_back_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     keyboard = create_country_keyboard("parcel_from_country_", "main_menu", user.language)
     await callback.message.edit_text(get_text(user.language, 'country_selection_creative'), reply_markup=keyboard)
     await state.set_state(ParcelOrder.from_country)
 
 @main_router.callback_query(F.data == "parcel_from_region_back")
 async def parcel_from_region_back_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     data = await state.get_data()
     country_code = data.get('from_country', 'UZ')
     regions = await get_regions_for_country(country_code, user.language)
@@ -4704,7 +4601,7 @@ async def parcel_from_region_back_callback(callback: CallbackQuery, state: FSMCo
 
 @main_router.callback_query(F.data == "parcel_to_country_back")
 async def parcel_to_country_back_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     data = await state.get_data()
     country_code = data.get('to_country', 'UZ')
     regions = await get_regions_for_country(country_code, user.language)
@@ -4714,14 +4611,14 @@ async def parcel_to_country_back_callback(callback: CallbackQuery, state: FSMCon
 
 @main_router.callback_query(F.data == "parcel_month_back")
 async def parcel_month_back_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     keyboard = create_month_keyboard(2025, 7, "parcel_month", "parcel_to_city_back", user.language)
     await callback.message.edit_text(get_text(user.language, 'select_month'), reply_markup=keyboard)
     await state.set_state(ParcelOrder.travel_date)
 
 @main_router.callback_query(F.data == "parcel_to_city_back")
 async def parcel_to_city_back_callback(callback: CallbackQuery, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=callback.from_user.id)
+    user = await user_profiles.get(callback.from_user.id)
     data = await state.get_data()
     country_code = data.get('to_country', 'UZ')
     regions = await get_regions_for_country(country_code, user.language)
@@ -4731,7 +4628,7 @@ async def parcel_to_city_back_callback(callback: CallbackQuery, state: FSMContex
 
 @main_router.message(DriverRegistration.full_name)
 async def driver_full_name(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await state.update_data(full_name=message.text)
     await message.answer(
         text=get_text(user.language, 'driver_phone_prompt'),
@@ -4743,7 +4640,7 @@ async def driver_full_name(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.phone)
 async def driver_phone(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     phone = message.text.strip()
     if not (phone.startswith('+') and len(phone) >= 10) and not (phone.isdigit() and len(phone) >= 9):
         await message.answer(
@@ -4764,7 +4661,7 @@ async def driver_phone(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.passport_photo)
 async def driver_passport_photo(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     if not message.photo:
         await message.answer(
             text=get_text(user.language, 'passport_photo_error_creative'),
@@ -4786,7 +4683,7 @@ async def driver_passport_photo(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.sts_photo)
 async def driver_sts_photo(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     if not message.photo:
         await message.answer(
             text=get_text(user.language, 'passport_photo_error_creative'),
@@ -4808,7 +4705,7 @@ async def driver_sts_photo(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.driver_license)
 async def driver_license_photo(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     if not message.photo:
         await message.answer(
             text=get_text(user.language, 'passport_photo_error_creative'),
@@ -4830,7 +4727,7 @@ async def driver_license_photo(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.car_model)
 async def driver_car_model(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await state.update_data(car_model=message.text)
     await message.answer(
         text=get_text(user.language, 'driver_car_number_prompt'),
@@ -4842,7 +4739,7 @@ async def driver_car_model(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.car_number)
 async def driver_car_number(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     await state.update_data(car_number=message.text)
     await message.answer(
         text=get_text(user.language, 'driver_car_year_prompt'),
@@ -4854,7 +4751,7 @@ async def driver_car_number(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.car_year)
 async def driver_car_year(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     try:
         year = int(message.text)
         if year < 1900 or year > 2030:
@@ -4878,7 +4775,7 @@ async def driver_car_year(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.car_capacity)
 async def driver_car_capacity(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     try:
         capacity = int(message.text)
         if capacity < 1 or capacity > 10000:
@@ -4902,7 +4799,7 @@ async def driver_car_capacity(message: Message, state: FSMContext):
 
 @main_router.message(DriverRegistration.car_photo)
 async def driver_car_photo(message: Message, state: FSMContext):
-    user = await sync_to_async(CustomUser.objects.get)(telegram_id=message.from_user.id)
+    user = await user_profiles.get(message.from_user.id)
     if not message.photo:
         await message.answer(
             text=get_text(user.language, 'passport_photo_error_creative'),
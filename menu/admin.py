@@ -8,8 +8,9 @@ from django.utils import timezone
 from datetime import timedelta
 from unfold.admin import ModelAdmin, TabularInline, StackedInline
 from unfold.decorators import display
-from .models import Category, MenuItem, Promotion, Review, Order, OrderItem, SiteSettings, TextContent, RestaurantInfo, Cart, CartItem
+from .models import Category, MenuItem, Promotion, Review, Order, OrderItem, SiteSettings, TextContent, RestaurantInfo, Cart, CartItem, Job
 from .forms import PromotionForm, MenuItemForm, SiteSettingsForm
+from .moderation import moderate_reviews
 
 
 # Custom admin site configuration
@@ -289,13 +290,13 @@ class ReviewAdmin(ModelAdmin):
     
     def approve_reviews(self, request, queryset):
         """Approve selected reviews"""
-        updated = queryset.update(approved=True)
+        updated = len(moderate_reviews(queryset, 'approve', admin_user=request.user.get_username()))
         self.message_user(request, f'{updated} review(s) were successfully approved.')
     approve_reviews.short_description = "Approve selected reviews"
     
     def unapprove_reviews(self, request, queryset):
         """Unapprove selected reviews"""
-        updated = queryset.update(approved=False)
+        updated = len(moderate_reviews(queryset, 'reject', admin_user=request.user.get_username()))
         self.message_user(request, f'{updated} review(s) were successfully unapproved.')
     unapprove_reviews.short_description = "Unapprove selected reviews"
 
@@ -613,3 +614,17 @@ class CartItemAdmin(ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(Job)
+class JobAdmin(ModelAdmin):
+    list_display = ['id', 'name', 'status', 'attempts', 'run_at', 'updated_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'last_error']
+    readonly_fields = ['name', 'payload', 'attempts', 'locked_at', 'last_error', 'created_at', 'updated_at']
+    actions = ['retry_jobs']
+
+    def retry_jobs(self, request, queryset):
+        updated = queryset.filter(status='failed').update(status='pending', attempts=0, run_at=timezone.now())
+        self.message_user(request, f'{updated} failed job(s) were queued again.')
+    retry_jobs.short_description = "Retry failed jobs"
@@ -0,0 +1,68 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from .cache import get_cache_version
+from .compression import compress_variants
+from .config import CONFIG_NAMESPACE, site_settings, restaurant_info
+from .language import get_request_language
+from .models import Category, MenuItem, Review
+from .serializers import CategorySerializer, MenuItemSerializer, ReviewSerializer
+
+
+BOOTSTRAP_KEY = 'menu:bootstrap:{}:{}:{}'
+BOOTSTRAP_TIMEOUT = 60 * 30
+
+# Everything the first page render needs; a change in any of them changes the version
+BOOTSTRAP_NAMESPACES = (CONFIG_NAMESPACE, 'menu', 'reviews')
+
+
+def bootstrap_version():
+    """Combined version of the cached namespaces the document is built from"""
+    return '.'.join(str(get_cache_version(namespace)) for namespace in BOOTSTRAP_NAMESPACES)
+
+
+def build_bootstrap(request, version):
+    """
+    Serialize the data the public site loads on mount into one JSON document,
+    projected to the ?lang= language when one is given
+    """
+    context = {'request': request}
+    categories = Category.objects.filter(is_active=True).order_by('name')
+    menu_items = (
+        MenuItem.objects.filter(is_active=True, category__is_active=True)
+        .select_related('category')
+        .order_by('global_order', 'name')
+    )
+    reviews = Review.objects.filter(approved=True, deleted=False).order_by('-date')
+    data = {
+        'version': version,
+        'site_settings': site_settings.serializer_class(site_settings.get_object(), context=context).data,
+        'restaurant_info': restaurant_info.serializer_class(restaurant_info.get_object(), context=context).data,
+        'categories': CategorySerializer(categories, many=True, context=context).data,
+        'menu_items': MenuItemSerializer(menu_items, many=True, context=context).data,
+        # Same first page as /api/reviews/
+        'reviews': ReviewSerializer(reviews[:settings.REST_FRAMEWORK['PAGE_SIZE']], many=True, context=context).data,
+    }
+    return JSONRenderer().render(data)
+
+
+def get_bootstrap(request):
+    """
+    Return (compressed variants, etag), building the document only when a version changed.
+
+    Absolute URLs in the document depend on the scheme and host, so both are
+    part of the cache key, and the ETag is a hash of the body itself.
+    """
+    version = bootstrap_version()
+    lang = get_request_language(request) or 'all'
+    origin = f'{request.scheme}://{request.get_host()}'
+    key = BOOTSTRAP_KEY.format(version, lang, hashlib.md5(origin.encode()).hexdigest())
+    cached = cache.get(key)
+    if cached is None:
+        body = build_bootstrap(request, version)
+        cached = (compress_variants(body), f'"bootstrap-{hashlib.md5(body).hexdigest()}"')
+        cache.set(key, cached, BOOTSTRAP_TIMEOUT)
+    return cached
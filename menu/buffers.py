@@ -0,0 +1,161 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.core import serializers
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Rows that could not be written at all, as JSON fixtures (replay with loaddata)
+dead_letter_logger = logging.getLogger('menu.dead_letter')
+
+MAX_WRITE_ATTEMPTS = 5
+MAX_RETRY_DELAY = 60.0
+
+# Every writer in this process, for close_all() at shutdown
+writers = []
+
+
+class BufferedWriter:
+    """
+    Collects unsaved model instances and writes them with bulk_create.
+
+    Pending rows are flushed from a background thread once `batch_size` rows
+    are queued or every `flush_interval` seconds, so the request that produced
+    them never waits on the INSERT. `flush()` can also be called directly when
+    the caller needs the rows on disk before it returns.
+
+    The callers have already answered their clients, so a failed write is
+    not dropped: the rows go back to the front of the queue and are retried
+    with exponential backoff. After `max_attempts` failures in a row they
+    are written one by one, and any row that still fails goes to the
+    'menu.dead_letter' log.
+    """
+
+    def __init__(self, model, batch_size=100, flush_interval=2.0, max_pending=None,
+                 max_attempts=MAX_WRITE_ATTEMPTS):
+        self.model = model
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self._pending = []
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        writers.append(self)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, obj):
+        """Queue an instance for writing. Returns False if the buffer is full."""
+        return self.extend([obj])
+
+    def extend(self, objs):
+        """Queue several instances at once. Returns False if they don't fit."""
+        with self._lock:
+            if self.max_pending is not None and len(self._pending) + len(objs) > self.max_pending:
+                return False
+            self._pending.extend(objs)
+            full = len(self._pending) >= self.batch_size
+        self._ensure_thread()
+        if full:
+            self._wakeup.set()
+        return True
+
+    def flush(self):
+        """Write everything pending now, one INSERT per batch. Returns the rows written."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        try:
+            # All or nothing, so a retry never inserts a batch twice
+            with transaction.atomic():
+                self.model.objects.bulk_create(pending, batch_size=self.batch_size)
+        except Exception:
+            return self._write_failed(pending)
+        self._failures = 0
+        return len(pending)
+
+    def close(self):
+        """Final flush at exit; whatever cannot be written goes to the dead-letter log"""
+        self.flush()
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            self._dead_letter(pending)
+
+    def _write_failed(self, pending):
+        self._failures += 1
+        name = self.model.__name__
+        if self._failures < self.max_attempts:
+            logger.warning(
+                "Could not write %d %s row(s), retrying (attempt %d of %d)",
+                len(pending), name, self._failures, self.max_attempts, exc_info=True,
+            )
+            with self._lock:
+                self._pending[:0] = pending
+            return 0
+
+        logger.exception("Could not write %d %s row(s) after %d attempts", len(pending), name, self._failures)
+        self._failures = 0
+        # Write row by row so one bad row doesn't take the rest of the batch with it
+        written, failed = 0, []
+        for obj in pending:
+            try:
+                self.model.objects.bulk_create([obj])
+                written += 1
+            except Exception:
+                failed.append(obj)
+        if failed:
+            self._dead_letter(failed)
+        return written
+
+    def _dead_letter(self, objs):
+        logger.error("Writing %d %s row(s) to the dead-letter log", len(objs), self.model.__name__)
+        dead_letter_logger.error(serializers.serialize('json', objs))
+
+    def _retry_delay(self):
+        return min(self.flush_interval * 2 ** self._failures, MAX_RETRY_DELAY)
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"{self.model.__name__}-writer",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            if self._failures:
+                # Back off while the database keeps failing
+                time.sleep(self._retry_delay())
+            else:
+                self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            close_old_connections()
+
+
+def close_all():
+    """
+    Flush every writer before the process goes away; the background threads
+    are daemons and would drop their queued rows. Runs at interpreter exit
+    and from gunicorn's worker_exit hook (SIGTERM, max_requests recycling).
+    """
+    for writer in writers:
+        writer.close()
+
+
+atexit.register(close_all)
@@ -0,0 +1,112 @@
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.utils.cache import cc_delim_re, get_conditional_response, patch_cache_control, patch_vary_headers
+
+from .compression import compress_variants, precompressed_response
+from .language import get_request_language
+
+
+VERSION_KEY = 'menu:cache-version:{}'
+PAGE_KEY = 'menu:page:{}.{}:{}:{}'
+
+# Query parameters every cached list view reads. Anything else (the
+# frontend's t=/r= cache-busters) is left out of the cache key.
+CACHE_KEY_PARAMS = ('lang', 'fields', 'exclude', 'show_all', 'paginate', 'page', 'search', 'ordering')
+
+# Set per served response rather than stored
+UNCACHED_HEADERS = {'content-length', 'content-encoding', 'set-cookie', 'expires', 'cache-control', 'etag'}
+
+
+def get_cache_version(namespace):
+    """Current version of a cached namespace (e.g. 'reviews', 'menu')"""
+    version = cache.get(VERSION_KEY.format(namespace))
+    if version is None:
+        version = 1
+        cache.add(VERSION_KEY.format(namespace), version, None)
+    return version
+
+
+def bump_cache_version(namespace):
+    """Invalidate every page cached under a namespace in one operation"""
+    from .tasks import schedule_cache_warm
+    
+    key = VERSION_KEY.format(namespace)
+    try:
+        version = cache.incr(key)
+    except ValueError:
+        version = 2
+        cache.set(key, version, None)
+    schedule_cache_warm()
+    return version
+
+
+def page_cache_url(request, params=()):
+    """
+    Absolute URL of the request reduced to the query parameters that affect
+    the response (CACHE_KEY_PARAMS plus the view's own `params`)
+    """
+    names = sorted(set(CACHE_KEY_PARAMS).union(params).intersection(request.GET))
+    query = urlencode([(name, value) for name in names for value in request.GET.getlist(name)])
+    return f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+
+
+def versioned_cache_page(timeout, namespace, params=()):
+    """
+    Cache GET responses of a view under the namespace version, so
+    bump_cache_version() drops all of them at once. Bodies are stored
+    pre-compressed (see menu.compression) and the variant is picked per
+    request from Accept-Encoding.
+
+    `params` lists the view's own filter parameters (filterset_fields);
+    only those and CACHE_KEY_PARAMS are part of the cache key.
+
+    `timeout` only applies to the server-side copy. Clients get no-cache plus
+    an ETag, so they revalidate (and get a 304) instead of showing stale
+    prices for the length of the timeout after a version bump.
+
+    The site-wide UpdateCacheMiddleware is told not to store these responses,
+    otherwise it would keep serving them after the version changes.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            request._cache_update_cache = False
+            key = PAGE_KEY.format(
+                namespace,
+                get_cache_version(namespace),
+                get_request_language(request),
+                hashlib.md5(page_cache_url(request, params).encode()).hexdigest(),
+            )
+            entry = cache.get(key)
+            if entry is None:
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, 'render') and callable(response.render):
+                    response.render()
+                if response.status_code != 200 or response.streaming or response.cookies:
+                    return response
+                headers = [
+                    (header, value) for header, value in response.items()
+                    if header.lower() not in UNCACHED_HEADERS
+                ]
+                etag = '"%s"' % hashlib.md5(response.content).hexdigest()
+                entry = (headers, compress_variants(response.content), etag)
+                cache.set(key, entry, timeout)
+
+            headers, variants, etag = entry
+            response = precompressed_response(request, variants)
+            for header, value in headers:
+                if header.lower() == 'vary':
+                    patch_vary_headers(response, cc_delim_re.split(value))
+                else:
+                    response[header] = value
+            response['ETag'] = etag
+            patch_cache_control(response, no_cache=True, max_age=0)
+            return get_conditional_response(request, etag=etag, response=response)
+        return _wrapped_view
+    return decorator
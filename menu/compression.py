@@ -0,0 +1,79 @@
+import gzip
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, gzip is always available
+    brotli = None
+
+
+# Same threshold as GZipMiddleware
+MIN_COMPRESS_LENGTH = 200
+
+# (gzip level, brotli quality): cheap settings when a request pays for the
+# cache miss, the slowest (smallest) ones in the cache-warm job
+FAST_LEVELS = (6, 5)
+BEST_LEVELS = (9, 11)
+
+_best_compression = ContextVar('best_compression', default=False)
+
+re_accepts_br = re.compile(r'\bbr\b')
+re_accepts_gzip = re.compile(r'\bgzip\b')
+
+
+@contextmanager
+def best_compression():
+    """Use BEST_LEVELS for compress_variants() calls made inside the block"""
+    token = _best_compression.set(True)
+    try:
+        yield
+    finally:
+        _best_compression.reset(token)
+
+
+def compress_variants(body):
+    """
+    identity/gzip/br forms of a response body. Done once per cached content
+    version: FAST_LEVELS on the request path, BEST_LEVELS inside
+    best_compression() (the cache-warm job).
+    """
+    variants = {'identity': body}
+    if len(body) < MIN_COMPRESS_LENGTH:
+        return variants
+    gzip_level, brotli_quality = BEST_LEVELS if _best_compression.get() else FAST_LEVELS
+    compressed = gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    if len(compressed) < len(body):
+        variants['gzip'] = compressed
+    if brotli is not None:
+        compressed = brotli.compress(body, quality=brotli_quality)
+        if len(compressed) < len(body):
+            variants['br'] = compressed
+    return variants
+
+
+def choose_encoding(request, variants):
+    accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if 'br' in variants and re_accepts_br.search(accept_encoding):
+        return 'br'
+    if 'gzip' in variants and re_accepts_gzip.search(accept_encoding):
+        return 'gzip'
+    return 'identity'
+
+
+def precompressed_response(request, variants, content_type='application/json', **kwargs):
+    """
+    Response with the best variant for the client's Accept-Encoding. The
+    Content-Encoding header makes GZipMiddleware leave it alone.
+    """
+    encoding = choose_encoding(request, variants)
+    response = HttpResponse(variants[encoding], content_type=content_type, **kwargs)
+    if encoding != 'identity':
+        response['Content-Encoding'] = encoding
+    response['Content-Length'] = str(len(variants[encoding]))
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
@@ -0,0 +1,58 @@
+import hashlib
+
+from rest_framework.renderers import JSONRenderer
+
+from .cache import get_cache_version
+from .compression import compress_variants
+from .language import get_request_language
+from .models import SiteSettings, RestaurantInfo
+from .serializers import SiteSettingsSerializer, RestaurantInfoSerializer
+
+
+CONFIG_NAMESPACE = 'config'
+
+
+class ConfigSnapshot:
+    """
+    Process-level copy of a singleton config row, kept as rendered (and
+    pre-compressed) JSON plus its ETag. It is rebuilt only when the 'config' cache version changes
+    (bumped on post_save and post_delete), so serving it costs no queries.
+    """
+
+    def __init__(self, model, serializer_class, defaults=None):
+        self.model = model
+        self.serializer_class = serializer_class
+        self.defaults = defaults or {}
+        # Serialized image URLs are absolute, so entries are kept per scheme
+        # and host (and per ?lang= projection)
+        self._entries = {}
+
+    def get_object(self):
+        obj = self.model.objects.first()
+        if obj is None:
+            obj = self.model.objects.create(**self.defaults)
+        return obj
+
+    def get(self, request):
+        """Return (compressed variants, etag) for the current version of the row"""
+        version = get_cache_version(CONFIG_NAMESPACE)
+        key = (request.scheme, request.get_host(), get_request_language(request))
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            data = self.serializer_class(self.get_object(), context={'request': request}).data
+            body = JSONRenderer().render(data)
+            entry = (version, compress_variants(body), '"%s"' % hashlib.md5(body).hexdigest())
+            self._entries[key] = entry
+        return entry[1], entry[2]
+
+
+site_settings = ConfigSnapshot(SiteSettings, SiteSettingsSerializer, defaults={
+    'site_name': 'Tokyo Restaurant',
+    'site_name_uz': 'Tokyo Restoran',
+    'site_name_ru': 'Ресторан Tokyo',
+})
+restaurant_info = ConfigSnapshot(RestaurantInfo, RestaurantInfoSerializer, defaults={
+    'restaurant_name': 'Tokyo Restaurant',
+    'restaurant_name_uz': 'Tokyo Restoran',
+    'restaurant_name_ru': 'Ресторан Tokyo',
+})
@@ -0,0 +1,216 @@
+import base64
+import io
+import os
+import uuid
+from abc import ABCMeta, abstractmethod
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import requests
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connections
+from PIL import Image
+
+from .cache import bump_cache_version
+from .jobs import enqueue_many
+from .models import MenuItem, Promotion
+from .promotions import resolve_promotions
+
+
+FORMAT_EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'WEBP': 'webp'}
+PROGRESS_DIR = settings.BASE_DIR / 'logs'
+
+
+@dataclass
+class ImageTask:
+    """One image to put into `<model>.<field>` of row `pk`"""
+    model: str  # app_label.model_name
+    pk: int
+    field: str
+    # 'name': store `value` as the file name as is (no file I/O)
+    # 'base64': decode a data:image URI
+    # 'url': download `value`
+    # 'unsplash': look up a photo for the search term `value`, then download it
+    source: str
+    value: str
+    directory: str = ''
+    filename: str = ''
+    label: str = ''
+
+    @property
+    def key(self):
+        return f'{self.model}:{self.pk}:{self.field}'
+
+
+def _unsplash_url(search_term):
+    # Unsplash Source API (no API key needed) redirects to a random matching photo
+    response = requests.head(f'https://source.unsplash.com/800x800/?food,{search_term}', allow_redirects=True, timeout=10)
+    response.raise_for_status()
+    if 'unsplash.com' not in response.url:
+        raise ValueError(f'No image found for {search_term!r}')
+    return response.url
+
+
+def fetch_image(task):
+    """
+    Runs in a pool process: get the bytes, check they decode as an image and
+    write the file. Returns (task, stored name, error). Never touches the DB.
+    """
+    try:
+        if task.source == 'base64':
+            content = base64.b64decode(task.value.split(',', 1)[1])
+        else:
+            url = _unsplash_url(task.value) if task.source == 'unsplash' else task.value
+            response = requests.get(url, timeout=15)
+            response.raise_for_status()
+            content = response.content
+
+        with Image.open(io.BytesIO(content)) as image:
+            image.verify()
+            ext = FORMAT_EXTENSIONS.get(image.format, 'jpg')
+        name = default_storage.save(
+            f'{task.directory}{task.filename or uuid.uuid4()}.{ext}', ContentFile(content)
+        )
+        return task, name, None
+    except Exception as e:
+        return task, None, str(e)
+
+
+class ImageImporter:
+    """
+    Import images for many rows at once. File work (downloading, decoding,
+    writing) runs in a process pool; rows are written with bulk_update in
+    batches, and every finished batch is appended to a progress file so an
+    interrupted import resumes where it stopped.
+    """
+
+    def __init__(self, name, workers=None, batch_size=100, log=print):
+        self.workers = workers or os.cpu_count()
+        self.batch_size = batch_size
+        self.log = log
+        self.progress_path = PROGRESS_DIR / f'image_import_{name}.progress'
+        self.updated = self.skipped = self.failed = 0
+        # Menu items whose promotion_image may have changed
+        self.promotion_items = set()
+
+    def _load_progress(self):
+        if not self.progress_path.exists():
+            return set()
+        return set(self.progress_path.read_text().split())
+
+    def _apply(self, results):
+        by_field = defaultdict(list)
+        for task, name, error in results:
+            if error:
+                self.failed += 1
+                self.log(f'  ✗ {task.label or task.key}: {error}')
+                continue
+            model = apps.get_model(task.model)
+            obj = model(pk=task.pk)
+            setattr(obj, task.field, name)
+            by_field[(model, task.field)].append(obj)
+            self.log(f'  ✓ {task.label or task.key}: {name}')
+
+        done = []
+        for (model, field), objs in by_field.items():
+            model.objects.bulk_update(objs, [field], batch_size=500)
+            # bulk_update sends no post_save, so queue the resizing explicitly
+            enqueue_many('images.derivatives', [
+                {'model': model._meta.label_lower, 'pk': obj.pk} for obj in objs
+            ])
+            done.extend(f'{model._meta.label_lower}:{obj.pk}:{field}' for obj in objs)
+            self.updated += len(objs)
+            # Nor does it run resolve_promotions(), so collect the items to re-resolve
+            if model is MenuItem:
+                self.promotion_items.update(obj.pk for obj in objs)
+            elif model is Promotion:
+                self.promotion_items.update(
+                    Promotion.objects.filter(pk__in=[obj.pk for obj in objs], linked_product__isnull=False)
+                    .values_list('linked_product_id', flat=True)
+                )
+
+        if done:
+            PROGRESS_DIR.mkdir(parents=True, exist_ok=True)
+            with open(self.progress_path, 'a') as progress:
+                progress.write('\n'.join(done) + '\n')
+
+    def run(self, tasks, restart=False):
+        if restart and self.progress_path.exists():
+            self.progress_path.unlink()
+        done = self._load_progress()
+        pending = [task for task in tasks if task.key not in done]
+        self.skipped += len(tasks) - len(pending)
+        if self.skipped:
+            self.log(f'Resuming: {self.skipped} images were imported by a previous run')
+
+        local = [task for task in pending if task.source == 'name']
+        remote = [task for task in pending if task.source != 'name']
+        for start in range(0, len(local), self.batch_size):
+            self._apply([(task, task.value, None) for task in local[start:start + self.batch_size]])
+
+        if remote:
+            # Forked workers must not share the parent's DB connections
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                batch = []
+                for result in pool.map(fetch_image, remote, chunksize=4):
+                    batch.append(result)
+                    if len(batch) >= self.batch_size:
+                        self._apply(batch)
+                        batch = []
+                self._apply(batch)
+
+        if self.promotion_items:
+            resolve_promotions(self.promotion_items)
+        if self.updated:
+            bump_cache_version('menu')
+        if not self.failed and self.progress_path.exists():
+            # Finished cleanly, the next run starts from scratch
+            self.progress_path.unlink()
+        return self.updated, self.skipped, self.failed
+
+
+class ImageImportCommand(BaseCommand, metaclass=ABCMeta):
+    """Base for the image import commands: subclasses only build the task list"""
+    import_name = None
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Processes used for downloading/decoding (default: CPU count)',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore the progress of an interrupted run',
+        )
+
+    @abstractmethod
+    def get_tasks(self, options):
+        """Return the list of ImageTasks to import for the parsed command options"""
+
+    def handle(self, *args, **options):
+        tasks = self.get_tasks(options)
+        self.stdout.write(f'{len(tasks)} images to import')
+        if options.get('dry_run'):
+            for task in tasks:
+                self.stdout.write(self.style.WARNING(f'  [DRY RUN] {task.label or task.key}: {task.source} {task.value[:80]}'))
+            return
+
+        importer = ImageImporter(self.import_name, workers=options['workers'], log=self.stdout.write)
+        updated, skipped, failed = importer.run(tasks, restart=options['restart'])
+
+        self.stdout.write(self.style.SUCCESS('\n' + '='*50))
+        self.stdout.write(self.style.SUCCESS(f'  Updated: {updated}'))
+        if skipped:
+            self.stdout.write(self.style.WARNING(f'  Skipped (already imported): {skipped}'))
+        if failed:
+            self.stdout.write(self.style.ERROR(f'  Failed: {failed} (run again to retry them)'))
+        self.stdout.write(self.style.SUCCESS('='*50))
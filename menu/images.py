@@ -0,0 +1,166 @@
+import base64
+import hashlib
+import io
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from PIL import Image, ImageOps, features
+
+# Widths the frontend picks from with srcset/sizes
+DERIVATIVE_WIDTHS = {
+    'thumb': 320,
+    'card': 640,
+    'hero': 1280,
+}
+
+# (extension, Pillow format, save options), best compression first
+DERIVATIVE_FORMATS = [
+    ('webp', 'WEBP', {'quality': 75, 'method': 6}),
+    ('jpeg', 'JPEG', {'quality': 80, 'optimize': True, 'progressive': True}),
+]
+if features.check('avif'):
+    DERIVATIVE_FORMATS.insert(0, ('avif', 'AVIF', {'quality': 55}))
+
+DERIVATIVE_DIR = 'derivatives'
+
+# Tiny blurred-up preview embedded in API payloads as a data URI
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_QUALITY = 30
+
+# Derivative names already encode the source content hash and the width,
+# so they bypass the content-addressed default storage
+derivative_storage = FileSystemStorage()
+
+
+def _encode(image, pil_format, options):
+    if pil_format == 'JPEG' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+        image = background
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def make_placeholder(image):
+    """base64 WebP data URI of a PLACEHOLDER_WIDTH px wide copy, a few hundred bytes"""
+    width, height = image.size
+    small = image.resize((PLACEHOLDER_WIDTH, max(1, round(height * PLACEHOLDER_WIDTH / width))), Image.BILINEAR)
+    data = _encode(small, 'WEBP', {'quality': PLACEHOLDER_QUALITY})
+    return 'data:image/webp;base64,' + base64.b64encode(data).decode()
+
+
+def generate_derivatives(field_file):
+    """
+    Resize an uploaded image to DERIVATIVE_WIDTHS in every DERIVATIVE_FORMATS
+    format. Files are named after the source content hash, so re-saving the
+    same picture reuses existing derivatives. Returns the dict stored in the
+    model's *_variants field; its 'placeholder' goes to *_placeholder.
+    """
+    field_file.open('rb')
+    try:
+        content = field_file.read()
+    finally:
+        field_file.close()
+    digest = hashlib.sha256(content).hexdigest()[:16]
+
+    with Image.open(io.BytesIO(content)) as source:
+        source = ImageOps.exif_transpose(source)
+        source = source.convert('RGBA' if 'A' in source.getbands() or source.mode == 'P' else 'RGB')
+        width, height = source.size
+
+        sizes = {}
+        for size, target_width in DERIVATIVE_WIDTHS.items():
+            # Never upscale; small sources share one derivative for several sizes
+            target_width = min(target_width, width)
+            target_height = max(1, round(height * target_width / width))
+            resized = None
+            entry = {'width': target_width, 'height': target_height}
+            for ext, pil_format, options in DERIVATIVE_FORMATS:
+                name = f'{DERIVATIVE_DIR}/{digest}-{target_width}.{ext}'
+                if not derivative_storage.exists(name):
+                    if resized is None:
+                        resized = source.resize((target_width, target_height), Image.LANCZOS)
+                    name = derivative_storage.save(name, ContentFile(_encode(resized, pil_format, options)))
+                entry[ext] = name
+            sizes[size] = entry
+
+        placeholder = make_placeholder(source)
+
+    return {'source': field_file.name, 'width': width, 'height': height, 'sizes': sizes, 'placeholder': placeholder}
+
+
+def image_fields(model):
+    """(image field, variants field) pairs: every ImageField with a matching <name>_variants field"""
+    names = {field.name for field in model._meta.fields}
+    return [
+        (field.name, f'{field.name}_variants') for field in model._meta.fields
+        if isinstance(field, models.ImageField) and f'{field.name}_variants' in names
+    ]
+
+
+def placeholder_field(instance, image_field):
+    """Name of the <image>_placeholder field, if the model has one"""
+    name = f'{image_field}_placeholder'
+    return name if any(field.name == name for field in instance._meta.fields) else None
+
+
+def needs_refresh(instance, image_field, variants_field):
+    """Whether the stored derivatives belong to a different (or removed) image"""
+    image = getattr(instance, image_field)
+    variants = getattr(instance, variants_field) or {}
+    if variants.get('source') != (image.name if image else None):
+        return True
+    # Images processed before placeholders existed
+    placeholder = placeholder_field(instance, image_field)
+    return bool(image and placeholder and not getattr(instance, placeholder))
+
+
+def refresh_derivatives(instance, image_field, variants_field):
+    """
+    Bring instance.<variants_field> in line with instance.<image_field>.
+    Returns True when the stored value changed.
+    """
+    if not needs_refresh(instance, image_field, variants_field):
+        return False
+
+    image = getattr(instance, image_field)
+    variants = generate_derivatives(image) if image else {}
+    updates = {variants_field: variants}
+    placeholder = placeholder_field(instance, image_field)
+    if placeholder:
+        updates[placeholder] = variants.pop('placeholder', '')
+    else:
+        variants.pop('placeholder', None)
+
+    for field, value in updates.items():
+        setattr(instance, field, value)
+    type(instance).objects.filter(pk=instance.pk).update(**updates)
+    return True
+
+
+def variants_representation(variants, request=None):
+    """URLs per size plus srcset strings per format, for the serializers"""
+    if not variants or not variants.get('sizes'):
+        return None
+
+    def url(name):
+        url = derivative_storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    sizes, srcset = {}, {}
+    for size, entry in variants['sizes'].items():
+        sizes[size] = {'width': entry['width'], 'height': entry['height']}
+        for ext, _, _ in DERIVATIVE_FORMATS:
+            if ext in entry:
+                sizes[size][ext] = url(entry[ext])
+                candidate = f"{sizes[size][ext]} {entry['width']}w"
+                if candidate not in srcset.get(ext, []):
+                    srcset.setdefault(ext, []).append(candidate)
+    return {
+        'width': variants['width'],
+        'height': variants['height'],
+        'sizes': sizes,
+        'srcset': {ext: ', '.join(candidates) for ext, candidates in srcset.items()},
+    }
@@ -0,0 +1,99 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+# A job stuck in 'running' this long belongs to a worker that died
+STALE_AFTER = timedelta(minutes=10)
+RETRY_BASE_DELAY = 5  # seconds, doubled per attempt
+RETRY_MAX_DELAY = 60 * 60
+
+_registry = {}
+
+
+def job(name):
+    """Register a function as a background job under `name`"""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, delay=0, dedupe=False, max_attempts=5):
+    """
+    Queue a job. With dedupe=True nothing is added if the same job is already
+    waiting, so bursts of identical requests (e.g. cache warming after several
+    saves) collapse into one run.
+    """
+    payload = payload or {}
+    if dedupe and Job.objects.filter(name=name, payload=payload, status='pending').exists():
+        return None
+    return Job.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def enqueue_many(name, payloads, max_attempts=5):
+    """Queue one job per payload with a single INSERT"""
+    now = timezone.now()
+    return Job.objects.bulk_create(
+        [Job(name=name, payload=payload, max_attempts=max_attempts, run_at=now) for payload in payloads],
+        batch_size=500,
+    )
+
+
+def claim_next():
+    """Atomically take the oldest due job, or return None"""
+    now = timezone.now()
+    for job_id in Job.objects.filter(status='pending', run_at__lte=now).order_by('run_at').values_list('id', flat=True)[:5]:
+        # Conditional UPDATE: only one worker can move it out of 'pending'
+        claimed = Job.objects.filter(pk=job_id, status='pending').update(
+            status='running', locked_at=now, attempts=F('attempts') + 1, updated_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def run(job_obj):
+    """Run a claimed job; failures are retried with exponential backoff"""
+    func = _registry.get(job_obj.name)
+    try:
+        if func is None:
+            raise LookupError(f'Unknown job {job_obj.name!r}')
+        func(**job_obj.payload)
+    except Exception:
+        error = traceback.format_exc()
+        if job_obj.attempts < job_obj.max_attempts:
+            delay = min(RETRY_BASE_DELAY * 2 ** (job_obj.attempts - 1), RETRY_MAX_DELAY)
+            Job.objects.filter(pk=job_obj.pk).update(
+                status='pending', run_at=timezone.now() + timedelta(seconds=delay),
+                last_error=error, updated_at=timezone.now(),
+            )
+            logger.warning('Job %s failed (attempt %s), retrying in %ss', job_obj, job_obj.attempts, delay)
+        else:
+            Job.objects.filter(pk=job_obj.pk).update(status='failed', last_error=error, updated_at=timezone.now())
+            logger.error('Job %s failed permanently:\n%s', job_obj, error)
+        return False
+
+    Job.objects.filter(pk=job_obj.pk).update(status='done', last_error='', updated_at=timezone.now())
+    return True
+
+
+def release_stale_jobs():
+    """Put jobs of crashed workers back in the queue"""
+    return Job.objects.filter(status='running', locked_at__lt=timezone.now() - STALE_AFTER).update(status='pending')
+
+
+def purge_finished(older_than=timedelta(days=7)):
+    return Job.objects.filter(status='done', updated_at__lt=timezone.now() - older_than).delete()[0]
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.translation.trans_real import parse_accept_lang_header
+
+
+# Translated text is stored as `<field>`, `<field>_uz` and `<field>_ru`;
+# the plain field is what ?lang=en returns
+LANGUAGE_CODES = [code for code, _ in settings.LANGUAGES]
+TRANSLATED_LANGUAGES = ('uz', 'ru')
+
+
+def negotiate_language(accept_language):
+    """Best supported language from an Accept-Language header"""
+    for code, _ in parse_accept_lang_header(accept_language or ''):
+        code = code.split('-')[0]
+        if code in LANGUAGE_CODES:
+            return code
+    return settings.LANGUAGE_CODE
+
+
+def get_request_language(request):
+    """
+    Language asked for with ?lang=uz|ru|en, or negotiated from Accept-Language
+    with ?lang=auto. None (no parameter) keeps every language variant.
+    """
+    if request is None:
+        return None
+    if not hasattr(request, '_projection_language'):
+        lang = request.GET.get('lang', '').lower()
+        if lang == 'auto':
+            lang = negotiate_language(request.META.get('HTTP_ACCEPT_LANGUAGE'))
+        request._projection_language = lang if lang in LANGUAGE_CODES else None
+    return request._projection_language
+
+
+def patch_language_vary(request, response):
+    """Negotiated responses must be cached per Accept-Language"""
+    if request.GET.get('lang', '').lower() == 'auto':
+        patch_vary_headers(response, ('Accept-Language',))
+    return response
+
+
+def project_language(data, lang):
+    """
+    Collapse every `<field>`/`<field>_uz`/`<field>_ru` triple of serialized
+    data into `<field>` holding the requested language. Empty translations
+    fall back to the plain field.
+    """
+    if isinstance(data, list):
+        return [project_language(item, lang) for item in data]
+    if not isinstance(data, dict):
+        return data
+
+    for key in [key for key in data if all(f'{key}_{code}' in data for code in TRANSLATED_LANGUAGES)]:
+        if lang in TRANSLATED_LANGUAGES and data[f'{key}_{lang}'] not in (None, '', []):
+            data[key] = data[f'{key}_{lang}']
+        for code in TRANSLATED_LANGUAGES:
+            del data[f'{key}_{code}']
+    for key, value in data.items():
+        if isinstance(value, (list, dict)):
+            data[key] = project_language(value, lang)
+    return data
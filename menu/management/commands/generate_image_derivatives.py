@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from menu.cache import bump_cache_version
+from menu.images import image_fields, placeholder_field, refresh_derivatives
+from menu.models import Category, MenuItem, Promotion, RestaurantInfo
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/JPEG copies for images uploaded before derivatives existed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate even if derivatives are already stored',
+        )
+
+    def handle(self, *args, **options):
+        for model in (Category, MenuItem, Promotion, RestaurantInfo):
+            fields = image_fields(model)
+            # Everything refresh_derivatives reads, so no row triggers a deferred-field query
+            loaded = ['pk']
+            for image_field, variants_field in fields:
+                loaded += [image_field, variants_field]
+                if placeholder_field(model, image_field):
+                    loaded.append(placeholder_field(model, image_field))
+            changed = 0
+            for instance in model.objects.only(*loaded).iterator():
+                for image_field, variants_field in fields:
+                    if options['force']:
+                        setattr(instance, variants_field, {})
+                    try:
+                        changed += refresh_derivatives(instance, image_field, variants_field)
+                    except Exception as e:
+                        self.stdout.write(self.style.ERROR(f'{model.__name__} #{instance.pk}: {e}'))
+            self.stdout.write(f'{model.__name__}: {changed} images updated')
+
+        bump_cache_version('menu')
+        bump_cache_version('config')
+        self.stdout.write(self.style.SUCCESS('Image derivatives are up to date'))
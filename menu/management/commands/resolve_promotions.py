@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from menu.promotions import resolve_promotions
+
+
+class Command(BaseCommand):
+    help = 'Recompute the active promotion, effective price and image of every menu item'
+
+    def handle(self, *args, **options):
+        changed = resolve_promotions()
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully updated promotion data for {changed} menu items')
+        )
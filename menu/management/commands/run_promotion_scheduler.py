@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from menu.promotions import next_promotion_boundary, sync_promotion_windows
+
+
+class Command(BaseCommand):
+    help = 'Show and hide promotions exactly at their start/end dates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Sync promotions once and exit (e.g. from cron)',
+        )
+        parser.add_argument(
+            '--max-sleep',
+            type=int,
+            default=60,
+            help='Re-check at least this often (seconds) to pick up edited promotions',
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            changed = sync_promotion_windows()
+            self.stdout.write(self.style.SUCCESS(f'{changed} promotions updated'))
+            return
+
+        self.stdout.write('Promotion scheduler started')
+        while True:
+            changed = sync_promotion_windows()
+            if changed:
+                self.stdout.write(f'{timezone.now():%Y-%m-%d %H:%M:%S} - {changed} promotions updated')
+
+            # Sleep until the next start/end date, but wake up regularly since
+            # admins may add promotions with an earlier boundary meanwhile
+            delay = options['max_sleep']
+            boundary = next_promotion_boundary()
+            if boundary is not None:
+                delay = min(delay, max((boundary - timezone.now()).total_seconds(), 0))
+            close_old_connections()
+            time.sleep(delay + 0.05)
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from menu import jobs
+import menu.tasks  # noqa: F401 - registers the jobs
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (image derivatives, cache warming)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run the jobs that are due and exit',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Seconds to wait when the queue is empty',
+        )
+
+    def handle(self, *args, **options):
+        released = jobs.release_stale_jobs()
+        if released:
+            self.stdout.write(self.style.WARNING(f'{released} stale jobs put back in the queue'))
+        purged = jobs.purge_finished()
+        if purged:
+            self.stdout.write(f'{purged} finished jobs removed')
+
+        if not options['once']:
+            self.stdout.write('Worker started')
+        while True:
+            job = jobs.claim_next()
+            if job is None:
+                if options['once']:
+                    break
+                close_old_connections()
+                jobs.release_stale_jobs()
+                time.sleep(options['sleep'])
+                continue
+
+            started = time.monotonic()
+            ok = jobs.run(job)
+            status = self.style.SUCCESS('done') if ok else self.style.ERROR('failed')
+            self.stdout.write(f'{job.name} #{job.pk} {status} in {time.monotonic() - started:.2f}s')
@@ -1,10 +1,11 @@
-from django.core.management.base import BaseCommand
+from menu.image_import import ImageImportCommand, ImageTask
 from menu.models import MenuItem
 
-class Command(BaseCommand):
+class Command(ImageImportCommand):
     help = 'Update menu items with their corresponding images'
+    import_name = 'menu_images'
 
-    def handle(self, *args, **options):
+    def get_tasks(self, options):
         # Map menu item names to image files
         image_mapping = {
             'Bruschetta': 'bruschetta.jpg',
@@ -33,26 +34,12 @@ class Command(BaseCommand):
             'Decadent Chocolate Cake': 'placeholder.jpg',  # No specific image found
         }
 
-        updated_count = 0
-        for menu_item in MenuItem.objects.all():
-            if menu_item.name in image_mapping:
-                image_filename = image_mapping[menu_item.name]
-                # Store just the filename, not the full path
-                menu_item.image = image_filename
-                menu_item.save()
-                updated_count += 1
-                self.stdout.write(
-                    self.style.SUCCESS(f'Updated {menu_item.name} with image: {image_filename}')
-                )
-            else:
-                # Use placeholder for items without specific images
-                menu_item.image = "placeholder.jpg"
-                menu_item.save()
-                updated_count += 1
-                self.stdout.write(
-                    self.style.WARNING(f'Updated {menu_item.name} with placeholder image')
-                )
-
-        self.stdout.write(
-            self.style.SUCCESS(f'Successfully updated {updated_count} menu items with images')
-        )
+        # Store just the filename, not the full path; items without a
+        # specific image get the placeholder
+        return [
+            ImageTask(
+                model='menu.menuitem', pk=pk, field='image', source='name',
+                value=image_mapping.get(name, 'placeholder.jpg'), label=name,
+            )
+            for pk, name in MenuItem.objects.values_list('pk', 'name')
+        ]
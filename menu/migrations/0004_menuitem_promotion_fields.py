@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0003_alter_menuitem_options_remove_menuitem_order_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menuitem',
+            name='active_promotion',
+            field=models.ForeignKey(blank=True, editable=False, help_text="Hozir amalda bo'lgan aksiya", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='menu.promotion'),
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='promotion_image',
+            field=models.CharField(blank=True, editable=False, help_text='Aksiya rasmi URL', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='promotion_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, help_text="Aksiya bo'yicha narx", max_digits=10, null=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:53
+
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+
+
+def set_is_live(apps, schema_editor):
+    Promotion = apps.get_model('menu', 'Promotion')
+    now = timezone.now()
+    Promotion.objects.filter(
+        Q(start_date__isnull=True) | Q(start_date__lte=now),
+        Q(end_date__isnull=True) | Q(end_date__gt=now),
+        is_active=True,
+    ).update(is_live=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0004_menuitem_promotion_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='promotion',
+            name='is_live',
+            field=models.BooleanField(db_index=True, default=False, editable=False, help_text='Faol va muddati ichida - run_promotion_scheduler tomonidan yangilanadi'),
+        ),
+        migrations.RunPython(set_is_live, migrations.RunPython.noop),
+    ]
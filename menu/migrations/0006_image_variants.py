@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0005_promotion_is_live'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text="Avtomatik: o'lchamlar bo'yicha WebP/JPEG nusxalar (menu.images)"),
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text="Avtomatik: o'lchamlar bo'yicha WebP/JPEG nusxalar (menu.images)"),
+        ),
+        migrations.AddField(
+            model_name='promotion',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text="Avtomatik: o'lchamlar bo'yicha WebP/JPEG nusxalar (menu.images)"),
+        ),
+        migrations.AddField(
+            model_name='restaurantinfo',
+            name='about_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text="Avtomatik: o'lchamlar bo'yicha WebP/JPEG nusxalar (menu.images)"),
+        ),
+        migrations.AddField(
+            model_name='restaurantinfo',
+            name='hero_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text="Avtomatik: o'lchamlar bo'yicha WebP/JPEG nusxalar (menu.images)"),
+        ),
+    ]
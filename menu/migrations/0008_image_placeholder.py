@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0007_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False, help_text="Avtomatik: rasm yuklanguncha ko'rsatiladigan kichik WebP (data URI)"),
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False, help_text="Avtomatik: rasm yuklanguncha ko'rsatiladigan kichik WebP (data URI)"),
+        ),
+        migrations.AddField(
+            model_name='promotion',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False, help_text="Avtomatik: rasm yuklanguncha ko'rsatiladigan kichik WebP (data URI)"),
+        ),
+    ]
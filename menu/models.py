@@ -1,9 +1,11 @@
+from decimal import Decimal
+
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 
 
@@ -13,6 +15,8 @@ class Category(models.Model):
     name_ru = models.CharField(max_length=100)
     icon = models.CharField(max_length=10, default="🍽️")
     image = models.ImageField(upload_to='categories/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, help_text="Avtomatik: o'lchamlar bo'yicha WebP/JPEG nusxalar (menu.images)")
+    image_placeholder = models.TextField(blank=True, editable=False, help_text="Avtomatik: rasm yuklanguncha ko'rsatiladigan kichik WebP (data URI)")
     order = models.PositiveIntegerField(default=0, help_text="Display order")
     is_active = models.BooleanField(default=True, verbose_name=_("Faol"))
     created_at = models.DateTimeField(auto_now_add=True)
@@ -37,6 +41,8 @@ class MenuItem(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
     weight = models.DecimalField(max_digits=8, decimal_places=2, validators=[MinValueValidator(0)], blank=True, null=True, help_text="Weight in grams")
     image = models.ImageField(upload_to='menu_items/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, help_text="Avtomatik: o'lchamlar bo'yicha WebP/JPEG nusxalar (menu.images)")
+    image_placeholder = models.TextField(blank=True, editable=False, help_text="Avtomatik: rasm yuklanguncha ko'rsatiladigan kichik WebP (data URI)")
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='menu_items')
     
     # Ikki xil tartib raqami
@@ -60,6 +66,27 @@ class MenuItem(models.Model):
     ingredients = models.JSONField(default=list, blank=True)
     ingredients_uz = models.JSONField(default=list, blank=True)
     ingredients_ru = models.JSONField(default=list, blank=True)
+    
+    # Aksiya ma'lumotlari - menu/promotions.py tomonidan oldindan hisoblanadi
+    active_promotion = models.ForeignKey(
+        'Promotion',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        help_text="Hozir amalda bo'lgan aksiya"
+    )
+    promotion_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Aksiya bo'yicha narx"
+    )
+    promotion_image = models.CharField(max_length=255, blank=True, editable=False, help_text="Aksiya rasmi URL")
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -139,6 +166,8 @@ class Promotion(models.Model):
         null=True,
         help_text="Aksiya rasmi (bo'lmasa, mahsulot rasmi ishlatiladi)"
     )
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, help_text="Avtomatik: o'lchamlar bo'yicha WebP/JPEG nusxalar (menu.images)")
+    image_placeholder = models.TextField(blank=True, editable=False, help_text="Avtomatik: rasm yuklanguncha ko'rsatiladigan kichik WebP (data URI)")
     
     # Muddati
     start_date = models.DateTimeField(
@@ -177,6 +206,12 @@ class Promotion(models.Model):
         verbose_name=_("Ko'rinadi"),
         help_text="Aksiya faolmi?"
     )
+    is_live = models.BooleanField(
+        default=False,
+        db_index=True,
+        editable=False,
+        help_text="Faol va muddati ichida - run_promotion_scheduler tomonidan yangilanadi"
+    )
     
     # Tarkibi (bonus aksiyalar uchun)
     ingredients = models.JSONField(default=list, blank=True, help_text="Tarkibi")
@@ -224,12 +259,15 @@ class Promotion(models.Model):
         if not self.linked_product:
             return self.price
         
-        original_price = self.linked_product.price
-        
+        return self.get_price_for(self.linked_product.price)
+
+    def get_price_for(self, original_price):
+        """Berilgan narxga aksiyani qo'llash"""
         if self.discount_type == 'percent':
-            return original_price * (1 - self.discount_percentage / 100)
+            discounted = original_price * (100 - self.discount_percentage) / 100
+            return discounted.quantize(Decimal('0.01'))
         elif self.discount_type == 'amount':
-            return max(0, original_price - self.discount_amount)
+            return max(Decimal('0'), original_price - self.discount_amount)
         else:
             return original_price
 
@@ -240,6 +278,19 @@ class Promotion(models.Model):
             return timezone.now() > self.end_date
         return False
 
+    def is_running(self, now=None):
+        """Aksiya faol va boshlanish/tugash vaqti oralig'idami?"""
+        now = now or timezone.now()
+        if self.start_date and self.start_date > now:
+            return False
+        if self.end_date and self.end_date <= now:
+            return False
+        return self.is_active
+
+    def save(self, *args, **kwargs):
+        self.is_live = self.is_running()
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.title} ({self.get_discount_type_display()})"
 
@@ -380,9 +431,9 @@ class SiteSettings(models.Model):
 
     def save(self, *args, **kwargs):
         # Ensure only one instance exists
-        if not self.pk and SiteSettings.objects.exists():
+        existing = SiteSettings.objects.first() if not self.pk else None
+        if existing is not None:
             # If this is a new instance and one already exists, update the existing one
-            existing = SiteSettings.objects.first()
             existing.site_name = self.site_name
             existing.site_name_uz = self.site_name_uz
             existing.site_name_ru = self.site_name_ru
@@ -630,6 +681,8 @@ class RestaurantInfo(models.Model):
     # Restaurant Images
     hero_image = models.ImageField(upload_to='restaurant/', blank=True, null=True)
     about_image = models.ImageField(upload_to='restaurant/', blank=True, null=True)
+    hero_image_variants = models.JSONField(default=dict, blank=True, editable=False, help_text="Avtomatik: o'lchamlar bo'yicha WebP/JPEG nusxalar (menu.images)")
+    about_image_variants = models.JSONField(default=dict, blank=True, editable=False, help_text="Avtomatik: o'lchamlar bo'yicha WebP/JPEG nusxalar (menu.images)")
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -643,9 +696,9 @@ class RestaurantInfo(models.Model):
 
     def save(self, *args, **kwargs):
         # Ensure only one instance exists
-        if not self.pk and RestaurantInfo.objects.exists():
+        existing = RestaurantInfo.objects.first() if not self.pk else None
+        if existing is not None:
             # If this is a new instance and one already exists, update the existing one
-            existing = RestaurantInfo.objects.first()
             for field in self._meta.fields:
                 if field.name not in ['id', 'created_at', 'updated_at']:
                     setattr(existing, field.name, getattr(self, field.name))
@@ -667,6 +720,60 @@ def update_menu_items_on_category_change(sender, instance, **kwargs):
         instance.menu_items.filter(is_active=True).update(is_active=False)
 
 
+# Keep precomputed promotion fields of menu items in sync
+@receiver(post_save, sender=Promotion)
+@receiver(post_delete, sender=Promotion)
+def resolve_promotions_on_promotion_change(sender, instance, **kwargs):
+    from .promotions import resolve_promotions
+    
+    # The item it is linked to now, plus any item it was previously active on
+    item_ids = set(MenuItem.objects.filter(active_promotion_id=instance.pk).values_list('id', flat=True))
+    if instance.linked_product_id:
+        item_ids.add(instance.linked_product_id)
+    resolve_promotions(item_ids)
+
+@receiver(post_save, sender=MenuItem)
+def resolve_promotions_on_menu_item_change(sender, instance, **kwargs):
+    from .promotions import resolve_promotions
+    
+    # Price or image may have changed
+    resolve_promotions([instance.pk])
+
+# Any change to menu content invalidates cached menu responses
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+@receiver(post_save, sender=Promotion)
+@receiver(post_delete, sender=Promotion)
+def invalidate_menu_cache(sender, **kwargs):
+    from .cache import bump_cache_version
+    
+    bump_cache_version('menu')
+
+# Resized WebP/JPEG copies of uploaded images
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=MenuItem)
+@receiver(post_save, sender=Promotion)
+@receiver(post_save, sender=RestaurantInfo)
+def generate_image_derivatives(sender, instance, **kwargs):
+    from .tasks import schedule_image_derivatives
+    
+    # Resizing runs in the runworker process, not in the request
+    schedule_image_derivatives(instance)
+
+# Site settings / restaurant info snapshots are rebuilt on the next request
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+@receiver(post_save, sender=RestaurantInfo)
+@receiver(post_delete, sender=RestaurantInfo)
+def invalidate_config_cache(sender, **kwargs):
+    from .cache import bump_cache_version
+    from .config import CONFIG_NAMESPACE
+    
+    bump_cache_version(CONFIG_NAMESPACE)
+
+
 class Feedback(models.Model):
     FEEDBACK_TYPES = [
         ('complaint', 'Shikoyat'),
@@ -692,3 +799,35 @@ class Feedback(models.Model):
 
     def __str__(self):
         return f"{self.name} - {self.get_feedback_type_display()}"
+
+
+class Job(models.Model):
+    """Background job run by the runworker command (see menu.jobs)"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    name = models.CharField(max_length=100, help_text="Registered job name, e.g. images.derivatives")
+    payload = models.JSONField(default=dict, blank=True, help_text="Keyword arguments of the job")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now, help_text="Not started before this time")
+    locked_at = models.DateTimeField(blank=True, null=True, help_text="When a worker picked it up")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Fon vazifasi"
+        verbose_name_plural = "Fon vazifalari"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} - {self.status}"
@@ -0,0 +1,55 @@
+from .buffers import BufferedWriter
+from .cache import bump_cache_version
+from .models import Review, ReviewAction
+
+
+# Moderation verb -> (ReviewAction.action, reviews it applies to, field updates)
+MODERATION_ACTIONS = {
+    'approve': ('approved', {'approved': False}, {'approved': True}),
+    'reject': ('rejected', {'approved': True}, {'approved': False}),
+    'delete': ('deleted', {'deleted': False}, {'approved': False, 'deleted': True}),
+}
+
+AUDIT_BATCH_SIZE = 200
+
+audit_log = BufferedWriter(ReviewAction, batch_size=AUDIT_BATCH_SIZE)
+
+
+def record_action(review, action, admin_user='admin', reason=''):
+    """Queue a ReviewAction row; it is written in the background with the next batch"""
+    audit_log.add(ReviewAction(
+        review=review,
+        action=action,
+        admin_user=admin_user,
+        reason=reason,
+    ))
+
+
+def moderate_reviews(reviews, action, admin_user='admin', reason=''):
+    """
+    Apply a moderation action to many reviews at once.
+
+    `reviews` is a queryset or a list of ids. Only reviews whose state actually
+    changes are touched and audited, so the whole call costs one SELECT of ids,
+    one UPDATE ... WHERE id IN (...) and one batched INSERT of ReviewActions.
+    The UPDATE sends no signals, so cached review responses are invalidated
+    here for every caller (API views and admin actions alike).
+    Returns the list of affected review ids.
+    """
+    action_name, applies_to, updates = MODERATION_ACTIONS[action]
+
+    queryset = reviews if hasattr(reviews, 'model') else Review.objects.filter(id__in=reviews)
+    # Skip reviews that are already in the target state
+    review_ids = list(queryset.filter(**applies_to).values_list('id', flat=True))
+    if not review_ids:
+        return []
+
+    Review.objects.filter(id__in=review_ids).update(**updates)
+    bump_cache_version('reviews')
+
+    audit_log.extend([
+        ReviewAction(review_id=review_id, action=action_name, admin_user=admin_user, reason=reason)
+        for review_id in review_ids
+    ])
+    audit_log.flush()
+    return review_ids
@@ -0,0 +1,113 @@
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from .cache import bump_cache_version
+from .models import MenuItem, Promotion
+
+
+PROMOTION_FIELDS = ['active_promotion', 'promotion_price', 'promotion_image']
+
+
+def running_filter(now):
+    """Q matching promotions that are switched on and inside their start/end window"""
+    return (
+        Q(is_active=True)
+        & (Q(start_date__isnull=True) | Q(start_date__lte=now))
+        & (Q(end_date__isnull=True) | Q(end_date__gt=now))
+    )
+
+
+def running_promotions(now=None):
+    """Promotions that are switched on and inside their start/end window"""
+    return Promotion.objects.filter(running_filter(now or timezone.now()))
+
+
+def pick_promotion(item, promotions):
+    """
+    Choose the promotion shown for a menu item: the one giving the lowest
+    price, newest first on a tie. Returns (promotion, price, image URL).
+    """
+    best, best_price = None, None
+    for promotion in promotions:
+        price = promotion.get_price_for(item.price)
+        if best is None or price < best_price:
+            best, best_price = promotion, price
+
+    if best is None:
+        return None, None, ''
+
+    if best.image:
+        image = best.image.url
+    elif item.image:
+        image = item.image.url
+    else:
+        image = ''
+    return best, best_price, image
+
+
+def resolve_promotions(item_ids=None, now=None):
+    """
+    Precompute active_promotion, promotion_price and promotion_image for menu
+    items (all of them when `item_ids` is None). Only rows whose values change
+    are written, in a single bulk_update. Returns the number of changed items.
+    """
+    items = MenuItem.objects.only('id', 'price', 'image', *PROMOTION_FIELDS)
+    promotions = running_promotions(now).filter(linked_product__isnull=False).order_by('-created_at')
+    if item_ids is not None:
+        item_ids = list(item_ids)
+        if not item_ids:
+            return 0
+        items = items.filter(id__in=item_ids)
+        promotions = promotions.filter(linked_product_id__in=item_ids)
+
+    by_item = {}
+    for promotion in promotions:
+        by_item.setdefault(promotion.linked_product_id, []).append(promotion)
+
+    changed = []
+    for item in items:
+        promotion, price, image = pick_promotion(item, by_item.get(item.id, []))
+        new_values = (promotion.pk if promotion else None, price, image)
+        if new_values != (item.active_promotion_id, item.promotion_price, item.promotion_image):
+            item.active_promotion, item.promotion_price, item.promotion_image = promotion, price, image
+            changed.append(item)
+
+    if changed:
+        MenuItem.objects.bulk_update(changed, PROMOTION_FIELDS)
+        bump_cache_version('menu')
+    return len(changed)
+
+
+def sync_promotion_windows(now=None):
+    """
+    Flip Promotion.is_live for promotions whose start or end time has passed,
+    re-resolve the menu items they are linked to and invalidate menu caches.
+    Returns the number of promotions that changed.
+    """
+    now = now or timezone.now()
+    starting = Promotion.objects.filter(running_filter(now), is_live=False)
+    ending = Promotion.objects.filter(is_live=True).exclude(running_filter(now))
+
+    starting_ids = list(starting.values_list('id', 'linked_product_id'))
+    ending_ids = list(ending.values_list('id', 'linked_product_id'))
+    if not starting_ids and not ending_ids:
+        return 0
+
+    Promotion.objects.filter(id__in=[pk for pk, _ in starting_ids]).update(is_live=True)
+    Promotion.objects.filter(id__in=[pk for pk, _ in ending_ids]).update(is_live=False)
+
+    resolve_promotions({item_id for _, item_id in starting_ids + ending_ids if item_id}, now=now)
+    bump_cache_version('menu')
+    return len(starting_ids) + len(ending_ids)
+
+
+def next_promotion_boundary(now=None):
+    """The nearest future start_date/end_date of an active promotion, or None"""
+    now = now or timezone.now()
+    active = Promotion.objects.filter(is_active=True)
+    boundaries = [
+        active.filter(start_date__gt=now).aggregate(at=Min('start_date'))['at'],
+        active.filter(end_date__gt=now).aggregate(at=Min('end_date'))['at'],
+    ]
+    boundaries = [at for at in boundaries if at is not None]
+    return min(boundaries) if boundaries else None
@@ -1,27 +1,104 @@
+from django.core.exceptions import FieldDoesNotExist
 from rest_framework import serializers
 from .models import Category, MenuItem, Promotion, Review, ReviewAction, Order, OrderItem, SiteSettings, RestaurantInfo, Cart, CartItem, Feedback
-
-
-class CategorySerializer(serializers.ModelSerializer):
+from .language import TRANSLATED_LANGUAGES, get_request_language, project_language
+from .images import variants_representation
+
+
+class LanguageProjectionMixin:
+    """Return only the language asked for with ?lang= (see menu.language)"""
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        lang = get_request_language(self.context.get('request'))
+        return project_language(data, lang) if lang else data
+
+
+class ImageVariantsField(serializers.Field):
+    """srcset-ready URLs of the resized copies of an image (see menu.images)"""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return variants_representation(value, self.context.get('request'))
+
+
+class SparseFieldsetMixin:
+    """Limit the returned fields with ?fields=a,b or ?exclude=a,b on GET requests"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        fields = self._query_list(request, 'fields')
+        exclude = self._query_list(request, 'exclude')
+        if not fields and not exclude:
+            return
+
+        if get_request_language(request):
+            # The ?lang= projection reads the translated variants
+            fields = {f'{name}_{code}' for name in fields for code in TRANSLATED_LANGUAGES} | fields
+            exclude = {f'{name}_{code}' for name in exclude for code in TRANSLATED_LANGUAGES} | exclude
+        for name in list(self.fields):
+            if (fields and name not in fields) or name in exclude:
+                self.fields.pop(name)
+
+    @staticmethod
+    def _query_list(request, param):
+        return {name.strip() for name in request.GET.get(param, '').split(',') if name.strip()}
+
+    def get_model_columns(self):
+        """
+        (only, select_related) needed to serialize the remaining fields, or
+        None when a field reads something other than model columns
+        """
+        opts = self.Meta.model._meta
+        only, related = {opts.pk.name}, set()
+        for field in self.fields.values():
+            if field.write_only:
+                continue
+            if field.source == '*':
+                return None
+            name, _, rest = field.source.partition('.')
+            try:
+                model_field = opts.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete or model_field.many_to_many:
+                return None
+            only.add(name)
+            if rest:
+                related.add(name)
+                only.add(f"{name}__{rest.replace('.', '__')}")
+        return only, related
+
+
+class CategorySerializer(LanguageProjectionMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     image = serializers.ImageField(required=False, allow_null=True)
+    image_variants = ImageVariantsField()
     
     class Meta:
         model = Category
-        fields = ['id', 'name', 'name_uz', 'name_ru', 'icon', 'image', 'order', 'is_active', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'name_uz', 'name_ru', 'icon', 'image', 'image_variants', 'image_placeholder', 'order', 'is_active', 'created_at', 'updated_at']
 
 
-class MenuItemSerializer(serializers.ModelSerializer):
+class MenuItemSerializer(LanguageProjectionMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     category_name_uz = serializers.CharField(source='category.name_uz', read_only=True)
     category_name_ru = serializers.CharField(source='category.name_ru', read_only=True)
     image = serializers.ImageField(required=False, allow_null=True)
+    image_variants = ImageVariantsField()
     
     class Meta:
         model = MenuItem
         fields = [
             'id', 'name', 'name_uz', 'name_ru', 'description', 'description_uz', 'description_ru',
-            'price', 'weight', 'image', 'category', 'global_order', 'category_order', 'category_name', 'category_name_uz', 'category_name_ru',
+            'price', 'weight', 'image', 'image_variants', 'image_placeholder', 'category', 'global_order', 'category_order', 'category_name', 'category_name_uz', 'category_name_ru',
             'available', 'is_active', 'prep_time', 'rating', 'ingredients', 'ingredients_uz', 'ingredients_ru',
+            'active_promotion', 'promotion_price', 'promotion_image',
             'created_at', 'updated_at'
         ]
 
@@ -40,7 +117,7 @@ class LinkedDishSerializer(serializers.ModelSerializer):
         return None
 
 
-class PromotionSerializer(serializers.ModelSerializer):
+class PromotionSerializer(LanguageProjectionMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     # Read-only fields
     category_name = serializers.CharField(source='promotion_category.name', read_only=True)
     category_name_uz = serializers.CharField(source='promotion_category.name_uz', read_only=True)
@@ -50,6 +127,8 @@ class PromotionSerializer(serializers.ModelSerializer):
     linked_product_name_uz = serializers.CharField(source='linked_product.name_uz', read_only=True)
     linked_product_name_ru = serializers.CharField(source='linked_product.name_ru', read_only=True)
     
+    image_variants = ImageVariantsField()
+    
     # Computed fields
     display_image = serializers.SerializerMethodField()
     discounted_price = serializers.SerializerMethodField()
@@ -61,7 +140,7 @@ class PromotionSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'title_uz', 'title_ru', 'description', 'description_uz', 'description_ru',
             'discount_type', 'discount_percentage', 'discount_amount', 'bonus_info', 'bonus_info_uz', 'bonus_info_ru',
-            'image', 'display_image', 'start_date', 'end_date', 'is_active', 'is_expired',
+            'image', 'image_variants', 'image_placeholder', 'display_image', 'start_date', 'end_date', 'is_active', 'is_expired',
             'promotion_category', 'category_name', 'category_name_uz', 'category_name_ru',
             'linked_product', 'linked_product_id', 'linked_product_name', 'linked_product_name_uz', 'linked_product_name_ru',
             'price', 'discounted_price', 'discount_display',
@@ -135,6 +214,13 @@ class ReviewActionSerializer(serializers.ModelSerializer):
         fields = ['id', 'review', 'action', 'admin_user', 'reason', 'created_at']
 
 
+class ReviewBulkActionSerializer(serializers.Serializer):
+    """Serializer for moderating many reviews in one request"""
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000)
+    action = serializers.ChoiceField(choices=['approve', 'reject', 'delete'])
+    reason = serializers.CharField(required=False, allow_blank=True, default='')
+
+
 class OrderItemSerializer(serializers.ModelSerializer):
     menu_item_name = serializers.CharField(source='menu_item.name', read_only=True)
     menu_item_name_uz = serializers.CharField(source='menu_item.name_uz', read_only=True)
@@ -191,7 +277,7 @@ class CreateOrderSerializer(serializers.ModelSerializer):
         return order
 
 
-class SiteSettingsSerializer(serializers.ModelSerializer):
+class SiteSettingsSerializer(LanguageProjectionMixin, serializers.ModelSerializer):
     class Meta:
         model = SiteSettings
         fields = [
@@ -207,7 +293,10 @@ class SiteSettingsSerializer(serializers.ModelSerializer):
 
 
 
-class RestaurantInfoSerializer(serializers.ModelSerializer):
+class RestaurantInfoSerializer(LanguageProjectionMixin, serializers.ModelSerializer):
+    hero_image_variants = ImageVariantsField()
+    about_image_variants = ImageVariantsField()
+    
     class Meta:
         model = RestaurantInfo
         fields = [
@@ -226,7 +315,8 @@ class RestaurantInfoSerializer(serializers.ModelSerializer):
             'rate_us_label', 'rate_us_label_uz', 'rate_us_label_ru',
             'submit_button', 'submit_button_uz', 'submit_button_ru',
             'no_reviews_text', 'no_reviews_text_uz', 'no_reviews_text_ru',
-            'hero_image', 'about_image', 'created_at', 'updated_at'
+            'hero_image', 'hero_image_variants', 'about_image', 'about_image_variants',
+            'created_at', 'updated_at'
         ]
 
 
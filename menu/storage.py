@@ -0,0 +1,40 @@
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Names every saved file after the SHA-256 of its content, keeping the
+    upload directory and extension (menu_items/<hash>.jpg). An identical
+    upload resolves to the existing file instead of writing a copy, and a
+    name always refers to the same bytes, so the files can be cached forever.
+
+    Files are shared between rows, so code must never delete a stored file
+    just because one row stopped using it.
+    """
+    hash_length = 32
+
+    def content_name(self, name, content):
+        sha256 = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        directory, basename = os.path.split(name)
+        ext = os.path.splitext(basename)[1].lower()
+        return os.path.join(directory, sha256.hexdigest()[:self.hash_length] + ext)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
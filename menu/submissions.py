@@ -0,0 +1,23 @@
+from .buffers import BufferedWriter
+from .models import Review, Feedback
+
+
+# Public submissions are written in batches off the request path. The queues
+# are bounded, so a flood is turned away instead of piling up SQLite writes
+# in front of order inserts.
+SUBMISSION_BATCH_SIZE = 50
+SUBMISSION_FLUSH_INTERVAL = 5.0
+SUBMISSION_QUEUE_SIZE = 500
+
+review_queue = BufferedWriter(
+    Review,
+    batch_size=SUBMISSION_BATCH_SIZE,
+    flush_interval=SUBMISSION_FLUSH_INTERVAL,
+    max_pending=SUBMISSION_QUEUE_SIZE,
+)
+feedback_queue = BufferedWriter(
+    Feedback,
+    batch_size=SUBMISSION_BATCH_SIZE,
+    flush_interval=SUBMISSION_FLUSH_INTERVAL,
+    max_pending=SUBMISSION_QUEUE_SIZE,
+)
@@ -0,0 +1,59 @@
+from urllib.parse import urlsplit
+
+from django.apps import apps
+from django.conf import settings
+from django.test import RequestFactory
+from django.urls import resolve
+
+from .cache import bump_cache_version
+from .compression import best_compression
+from .images import image_fields, needs_refresh, refresh_derivatives
+from .jobs import enqueue, job
+
+
+# Public endpoints rebuilt right after their cache version changes
+CACHE_WARM_PATHS = [
+    '/api/categories/',
+    '/api/menu-items/',
+    '/api/promotions/',
+    '/api/bootstrap/',
+]
+CACHE_WARM_DELAY = 2  # seconds, lets a burst of saves settle first
+
+
+@job('images.derivatives')
+def generate_image_derivatives(model, pk):
+    model_class = apps.get_model(model)
+    instance = model_class.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+
+    changed = [refresh_derivatives(instance, *fields) for fields in image_fields(model_class)]
+    if any(changed):
+        bump_cache_version('config' if model_class._meta.model_name == 'restaurantinfo' else 'menu')
+
+
+@job('cache.warm')
+def warm_cache():
+    """
+    Render the public endpoints once so the first visitor gets a cache hit,
+    compressed with the slow, smallest settings since no client is waiting
+    """
+    factory = RequestFactory()
+    for base_url in getattr(settings, 'CACHE_WARM_URLS', []):
+        url = urlsplit(base_url)
+        for path in CACHE_WARM_PATHS:
+            request = factory.get(path, HTTP_HOST=url.netloc, secure=url.scheme == 'https')
+            match = resolve(path)
+            with best_compression():
+                match.func(request, *match.args, **match.kwargs)
+
+
+def schedule_cache_warm():
+    if getattr(settings, 'CACHE_WARM_URLS', None):
+        enqueue('cache.warm', delay=CACHE_WARM_DELAY, dedupe=True)
+
+
+def schedule_image_derivatives(instance):
+    if any(needs_refresh(instance, *fields) for fields in image_fields(type(instance))):
+        enqueue('images.derivatives', {'model': instance._meta.label_lower, 'pk': instance.pk}, dedupe=True)
@@ -1,3 +1,305 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from .buffers import BufferedWriter, writers
+from .cache import get_cache_version, page_cache_url
+from .image_import import ImageImporter, ImageTask
+from .config import site_settings
+from .models import Category, Feedback, MenuItem, Promotion, Review, ReviewAction, SiteSettings
+from .moderation import audit_log, moderate_reviews
+from .promotions import sync_promotion_windows
+from .submissions import review_queue
+
+
+def make_item(**fields):
+    category = Category.objects.get_or_create(name='Sushi', name_uz='Sushi', name_ru='Суши')[0]
+    return MenuItem.objects.create(**{
+        'name': 'Roll', 'name_uz': 'Roll', 'name_ru': 'Ролл',
+        'description': '-', 'description_uz': '-', 'description_ru': '-',
+        'price': Decimal('100.00'), 'category': category, **fields,
+    })
+
+
+def make_promotion(**fields):
+    return Promotion.objects.create(**{
+        'title': 'Aksiya', 'title_uz': 'Aksiya', 'title_ru': 'Акция',
+        'description': '-', 'description_uz': '-', 'description_ru': '-',
+        'discount_type': 'percent', 'discount_percentage': 10, **fields,
+    })
+
+
+class PageCacheKeyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def test_cache_busters_are_ignored(self):
+        first = self.factory.get('/api/menu-items/', {'show_all': 'true', 't': '1', 'r': 'abc'})
+        second = self.factory.get('/api/menu-items/', {'r2': 'x', 'show_all': 'true', 't': '2'})
+        self.assertEqual(page_cache_url(first), page_cache_url(second))
+
+    def test_view_params_are_kept(self):
+        first = self.factory.get('/api/menu-items/', {'category': '1'})
+        second = self.factory.get('/api/menu-items/', {'category': '2'})
+        self.assertNotEqual(
+            page_cache_url(first, params=('category',)),
+            page_cache_url(second, params=('category',)),
+        )
+        self.assertEqual(page_cache_url(first), page_cache_url(second))
+
+    def test_scheme_is_part_of_the_key(self):
+        http = self.factory.get('/api/menu-items/')
+        https = self.factory.get('/api/menu-items/', secure=True)
+        self.assertNotEqual(page_cache_url(http), page_cache_url(https))
+
+    def test_repeated_requests_hit_the_cache(self):
+        self.client.get('/api/menu-items/?t=1', HTTP_HOST='localhost')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/menu-items/?t=2&r=x', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+
+    def test_clients_revalidate_instead_of_caching(self):
+        response = self.client.get('/api/menu-items/', HTTP_HOST='localhost')
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('max-age=0', response['Cache-Control'])
+        response = self.client.get('/api/menu-items/', HTTP_HOST='localhost', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_after_a_menu_edit(self):
+        etag = self.client.get('/api/menu-items/', HTTP_HOST='localhost')['ETag']
+        make_item()
+        response = self.client.get('/api/menu-items/', HTTP_HOST='localhost', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class ReviewSubmissionTests(TestCase):
+    review = {'name': 'Ali', 'surname': 'Valiyev', 'comment': 'Juda mazali', 'rating': 5}
+
+    def setUp(self):
+        cache.clear()
+
+    def post_review(self, **extra):
+        return self.client.post('/api/reviews/', {**self.review, **extra}, content_type='application/json', HTTP_HOST='localhost')
+
+    def test_retry_after_full_queue_is_queued(self):
+        with mock.patch.object(review_queue, 'add', side_effect=[False, True]) as add:
+            self.assertEqual(self.post_review().status_code, 503)
+            self.assertEqual(self.post_review().status_code, 202)
+        self.assertEqual(add.call_count, 2)
+
+    def test_duplicate_is_acknowledged_but_not_queued(self):
+        with mock.patch.object(review_queue, 'add', return_value=True) as add:
+            self.assertEqual(self.post_review().status_code, 202)
+            self.assertEqual(self.post_review().status_code, 202)
+        self.assertEqual(add.call_count, 1)
+
+    def test_honeypot_is_not_queued(self):
+        with mock.patch.object(review_queue, 'add', return_value=True) as add:
+            self.assertEqual(self.post_review(website='http://spam').status_code, 202)
+        add.assert_not_called()
+
+    def test_burst_is_throttled(self):
+        with mock.patch.object(review_queue, 'add', return_value=True) as add, \
+                self.settings(SUBMISSION_THROTTLE_BURST=3):
+            for n in range(3):
+                self.assertEqual(self.post_review(comment=f'Sharh {n}').status_code, 202)
+            response = self.post_review(comment='Yana bitta')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(add.call_count, 3)
+
+
+class BufferedWriterTests(TestCase):
+    def make_writer(self, **options):
+        writer = BufferedWriter(Feedback, **options)
+        self.addCleanup(writers.remove, writer)
+        # Flushed explicitly below, never by the background thread
+        writer._ensure_thread = lambda: None
+        return writer
+
+    def feedback(self, name):
+        return Feedback(name=name, message='-')
+
+    def test_flush_writes_pending_rows(self):
+        writer = self.make_writer()
+        writer.extend([self.feedback('a'), self.feedback('b')])
+        self.assertEqual(writer.flush(), 2)
+        self.assertEqual(len(writer), 0)
+        self.assertEqual(Feedback.objects.count(), 2)
+
+    def test_failed_flush_is_retried(self):
+        writer = self.make_writer()
+        writer.add(self.feedback('a'))
+        with mock.patch.object(Feedback.objects, 'bulk_create', side_effect=DatabaseError), \
+                self.assertLogs('menu.buffers', 'WARNING'):
+            self.assertEqual(writer.flush(), 0)
+        self.assertEqual(len(writer), 1)
+        self.assertEqual(writer.flush(), 1)
+        self.assertEqual(Feedback.objects.count(), 1)
+
+    def test_rows_that_keep_failing_are_dead_lettered(self):
+        writer = self.make_writer(max_attempts=1)
+        writer.extend([self.feedback('good'), self.feedback('bad')])
+        bulk_create = Feedback.objects.bulk_create
+
+        def fail_on_bad(objs, **kwargs):
+            if any(obj.name == 'bad' for obj in objs):
+                raise DatabaseError('bad row')
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(Feedback.objects, 'bulk_create', side_effect=fail_on_bad), \
+                self.assertLogs('menu.buffers', 'ERROR'), \
+                self.assertLogs('menu.dead_letter', 'ERROR') as dead_letter:
+            self.assertEqual(writer.flush(), 1)
+        self.assertEqual(len(writer), 0)
+        self.assertEqual(list(Feedback.objects.values_list('name', flat=True)), ['good'])
+        rows = json.loads(dead_letter.records[0].getMessage())
+        self.assertEqual([row['fields']['name'] for row in rows], ['bad'])
+
+    def test_close_dead_letters_unwritten_rows(self):
+        writer = self.make_writer()
+        writer.add(self.feedback('a'))
+        with mock.patch.object(Feedback.objects, 'bulk_create', side_effect=DatabaseError), \
+                self.assertLogs('menu.buffers', 'WARNING'), \
+                self.assertLogs('menu.dead_letter', 'ERROR'):
+            writer.close()
+        self.assertEqual(len(writer), 0)
+
+
+class ModerateReviewsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.pending = Review.objects.create(name='Ali', surname='Valiyev', comment='-', rating=5)
+        self.approved = Review.objects.create(name='Vali', surname='Aliyev', comment='-', rating=4, approved=True)
+        patcher = mock.patch.object(audit_log, '_ensure_thread')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_only_changed_reviews_are_updated_and_audited(self):
+        version = get_cache_version('reviews')
+        ids = moderate_reviews([self.pending.pk, self.approved.pk], 'approve', admin_user='boss')
+        self.assertEqual(ids, [self.pending.pk])
+        self.pending.refresh_from_db()
+        self.assertTrue(self.pending.approved)
+        self.assertEqual(
+            list(ReviewAction.objects.values_list('review_id', 'action', 'admin_user')),
+            [(self.pending.pk, 'approved', 'boss')],
+        )
+        self.assertNotEqual(get_cache_version('reviews'), version)
+
+    def test_no_op_does_not_invalidate(self):
+        version = get_cache_version('reviews')
+        self.assertEqual(moderate_reviews([self.approved.pk], 'approve'), [])
+        self.assertEqual(get_cache_version('reviews'), version)
+        self.assertFalse(ReviewAction.objects.exists())
+
+
+class PromotionWindowTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+        self.item = make_item()
+        self.promotion = make_promotion(
+            linked_product=self.item,
+            start_date=self.now + timedelta(hours=1),
+            end_date=self.now + timedelta(hours=2),
+        )
+
+    def assertPromotionShown(self, shown):
+        self.promotion.refresh_from_db()
+        self.item.refresh_from_db()
+        self.assertEqual(self.promotion.is_live, shown)
+        self.assertEqual(self.item.active_promotion_id, self.promotion.pk if shown else None)
+        self.assertEqual(self.item.promotion_price, Decimal('90.00') if shown else None)
+
+    def test_not_live_before_start(self):
+        self.assertPromotionShown(False)
+        self.assertEqual(sync_promotion_windows(now=self.promotion.start_date - timedelta(microseconds=1)), 0)
+        self.assertPromotionShown(False)
+
+    def test_goes_live_at_start_date(self):
+        self.assertEqual(sync_promotion_windows(now=self.promotion.start_date), 1)
+        self.assertPromotionShown(True)
+        self.assertEqual(sync_promotion_windows(now=self.promotion.start_date), 0)
+
+    def test_ends_at_end_date(self):
+        sync_promotion_windows(now=self.promotion.start_date)
+        self.assertEqual(sync_promotion_windows(now=self.promotion.end_date - timedelta(microseconds=1)), 0)
+        self.assertPromotionShown(True)
+        self.assertEqual(sync_promotion_windows(now=self.promotion.end_date), 1)
+        self.assertPromotionShown(False)
+
+
+class ImageImportTests(TestCase):
+    def test_import_refreshes_promotion_image(self):
+        item = make_item()
+        make_promotion(linked_product=item)
+        item.refresh_from_db()
+        self.assertEqual(item.promotion_image, '')
+
+        importer = ImageImporter('tests', log=lambda message: None)
+        importer.run([ImageTask('menu.menuitem', item.pk, 'image', 'name', 'menu_items/roll.jpg')])
+
+        item.refresh_from_db()
+        self.assertEqual(item.promotion_image, item.image.url)
+
+
+class ReviewBulkModerationTests(TestCase):
+    url = '/api/admin/reviews/bulk/'
+
+    def setUp(self):
+        cache.clear()
+        self.review = Review.objects.create(name='Ali', surname='Valiyev', comment='Zo\'r', rating=5)
+
+    def post(self, action='approve'):
+        return self.client.post(
+            self.url, {'ids': [self.review.pk], 'action': action},
+            content_type='application/json', HTTP_HOST='localhost',
+        )
+
+    def test_anonymous_is_forbidden(self):
+        self.assertEqual(self.post().status_code, 403)
+        self.review.refresh_from_db()
+        self.assertFalse(self.review.approved)
+
+    def test_non_staff_is_forbidden(self):
+        user = get_user_model().objects.create_user('guest', password='x')
+        self.client.force_login(user)
+        self.assertEqual(self.post().status_code, 403)
+
+    def test_staff_can_moderate(self):
+        admin = get_user_model().objects.create_user('boss', password='x', is_staff=True)
+        self.client.force_login(admin)
+        response = self.post()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['ids'], [self.review.pk])
+        self.review.refresh_from_db()
+        self.assertTrue(self.review.approved)
+
+
+class ConfigSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        SiteSettings.objects.create(site_name='Tokyo Sushi')
+
+    def test_entries_are_kept_per_scheme(self):
+        site_settings.get(self.factory.get('/api/site-settings/'))
+        with self.assertNumQueries(0):
+            site_settings.get(self.factory.get('/api/site-settings/'))
+        with self.assertNumQueries(1):
+            site_settings.get(self.factory.get('/api/site-settings/', secure=True))
+
+    def test_delete_invalidates_snapshot(self):
+        request = self.factory.get('/api/site-settings/')
+        self.assertIn(b'Tokyo Sushi', site_settings.get(request)[0]['identity'])
+        SiteSettings.objects.all().delete()
+        self.assertNotIn(b'Tokyo Sushi', site_settings.get(request)[0]['identity'])
@@ -0,0 +1,70 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+
+class SubmissionRateThrottle(BaseThrottle):
+    """
+    Token bucket limiter for anonymous review/feedback submissions.
+
+    Every client gets one bucket per IP address and one per session; a POST
+    has to take a token from both. Bucket state lives in the shared cache so
+    all workers see the same counts. Safe methods are never throttled.
+    """
+    cache_key = 'menu:throttle:{}'
+
+    def __init__(self):
+        self.capacity = getattr(settings, 'SUBMISSION_THROTTLE_BURST', 5)
+        self.refill_rate = getattr(settings, 'SUBMISSION_THROTTLE_RATE', 1 / 60)
+        self._wait = 0
+
+    def get_bucket_keys(self, request):
+        keys = [self.cache_key.format('ip:' + self.get_ident(request))]
+        session = getattr(request, 'session', None)
+        if session is not None and session.session_key:
+            keys.append(self.cache_key.format('session:' + session.session_key))
+        return keys
+
+    def allow_request(self, request, view):
+        if request.method in SAFE_METHODS:
+            return True
+
+        now = time.time()
+        keys = self.get_bucket_keys(request)
+        stored = cache.get_many(keys)
+
+        buckets = {}
+        for key in keys:
+            tokens, updated_at = stored.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.refill_rate)
+            if tokens < 1:
+                self._wait = (1 - tokens) / self.refill_rate
+                return False
+            buckets[key] = (tokens - 1, now)
+
+        # Idle buckets are full again after this long, so they can expire
+        cache.set_many(buckets, timeout=int(self.capacity / self.refill_rate) + 1)
+        return True
+
+    def wait(self):
+        return self._wait
+
+
+def submission_key(request, text):
+    ident = SubmissionRateThrottle().get_ident(request)
+    digest = hashlib.sha1(f'{ident}:{text.strip().lower()}'.encode('utf-8')).hexdigest()
+    return f'menu:submission:{digest}'
+
+
+def is_duplicate_submission(request, text, timeout=600):
+    """True if the same client already sent this text within `timeout` seconds"""
+    return not cache.add(submission_key(request, text), 1, timeout)
+
+
+def forget_submission(request, text):
+    """Drop the duplicate marker of a submission that was not accepted, so its retry goes through"""
+    cache.delete(submission_key(request, text))
@@ -22,6 +22,7 @@ urlpatterns = [
     path('reviews/', views.ReviewListView.as_view(), name='review-list'),
     path('reviews/<int:pk>/', views.ReviewDetailView.as_view(), name='review-detail'),
     path('admin/reviews/', views.AdminReviewListView.as_view(), name='admin-review-list'),
+    path('admin/reviews/bulk/', views.ReviewBulkModerationView.as_view(), name='admin-review-bulk'),
     
     # Orders
     path('orders/', views.OrderListView.as_view(), name='order-list'),
@@ -39,6 +40,9 @@ urlpatterns = [
     # Restaurant Info
     path('restaurant-info/', views.RestaurantInfoView.as_view(), name='restaurant-info'),
     
+    # First paint
+    path('bootstrap/', views.BootstrapView.as_view(), name='bootstrap'),
+    
     # Cart
     path('cart/', views.CartView.as_view(), name='cart'),
     path('cart/add/', views.AddToCartView.as_view(), name='add-to-cart'),
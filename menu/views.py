@@ -1,3 +1,5 @@
+import logging
+
 from rest_framework import generics, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
@@ -9,18 +11,55 @@ from django.db.models import Q, Avg, F, Max
 from django.middleware.csrf import get_token
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.decorators import method_decorator
+from django.views import View
 from django.views.decorators.cache import cache_page, never_cache
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 
-from .models import Category, MenuItem, Promotion, Review, ReviewAction, Order, OrderItem, SiteSettings, RestaurantInfo, Cart, CartItem, Feedback
+from .models import Category, MenuItem, Promotion, Review, ReviewAction, Order, OrderItem, Cart, CartItem, Feedback
 from .serializers import (
     CategorySerializer, MenuItemSerializer, PromotionSerializer, 
-    ReviewSerializer, ReviewActionSerializer, OrderSerializer, CreateOrderSerializer,
-    SiteSettingsSerializer, RestaurantInfoSerializer,
+    ReviewSerializer, ReviewActionSerializer, ReviewBulkActionSerializer, OrderSerializer, CreateOrderSerializer,
     CartSerializer, CartItemSerializer, AddToCartSerializer, UpdateCartItemSerializer, CreateOrderFromCartSerializer,
     FeedbackSerializer
 )
+from .moderation import record_action, moderate_reviews
+from .cache import versioned_cache_page, bump_cache_version
+from .compression import precompressed_response
+from .config import site_settings, restaurant_info
+from .bootstrap import get_bootstrap
+from .language import patch_language_vary
+from .submissions import review_queue, feedback_queue
+from .throttling import SubmissionRateThrottle, forget_submission, is_duplicate_submission
+
+logger = logging.getLogger(__name__)
+
+
+class LanguageVaryMixin:
+    """Responses negotiated with ?lang=auto are cached per Accept-Language"""
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        return patch_language_vary(request, response)
+
+
+class SparseFieldsetQuerysetMixin:
+    """Load only the columns the serializer needs, pruned further by ?fields=/?exclude="""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method != 'GET':
+            return queryset
+        columns = self.get_serializer().get_model_columns()
+        if columns is None:
+            return queryset
+        only, related = columns
+        if related:
+            queryset = queryset.select_related(*related)
+        if {'fields', 'exclude'} & set(self.request.GET):
+            queryset = queryset.only(*only)
+        return queryset
 
 
 @api_view(['GET'])
@@ -30,8 +69,8 @@ def get_csrf_token(request):
     return JsonResponse({'csrfToken': token})
 
 
-@method_decorator([csrf_exempt, cache_page(60 * 30)], name='dispatch')  # 30 daqiqa cache
-class CategoryListView(generics.ListCreateAPIView):
+@method_decorator([csrf_exempt, versioned_cache_page(60 * 30, 'menu')], name='dispatch')  # 30 daqiqa cache
+class CategoryListView(LanguageVaryMixin, SparseFieldsetQuerysetMixin, generics.ListCreateAPIView):
     queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySerializer
     filter_backends = [SearchFilter, OrderingFilter]
@@ -75,7 +114,7 @@ class CategoryListView(generics.ListCreateAPIView):
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CategoryDetailView(LanguageVaryMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [AllowAny]
@@ -152,8 +191,8 @@ class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
             instance.delete()
 
 
-@method_decorator(csrf_exempt, name='dispatch')
-class MenuItemListView(generics.ListCreateAPIView):
+@method_decorator([csrf_exempt, versioned_cache_page(60 * 30, 'menu', params=('category', 'available'))], name='dispatch')  # 30 daqiqa cache
+class MenuItemListView(LanguageVaryMixin, SparseFieldsetQuerysetMixin, generics.ListCreateAPIView):
     queryset = MenuItem.objects.filter(is_active=True, category__is_active=True)
     serializer_class = MenuItemSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -240,7 +279,7 @@ class MenuItemListView(generics.ListCreateAPIView):
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class MenuItemDetailView(generics.RetrieveUpdateDestroyAPIView):
+class MenuItemDetailView(LanguageVaryMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = MenuItem.objects.all()
     serializer_class = MenuItemSerializer
     permission_classes = [AllowAny]
@@ -343,7 +382,8 @@ class MenuItemDetailView(generics.RetrieveUpdateDestroyAPIView):
             instance.delete()
 
 
-class MenuItemByCategoryView(generics.ListAPIView):
+@method_decorator(versioned_cache_page(60 * 30, 'menu'), name='dispatch')  # 30 daqiqa cache
+class MenuItemByCategoryView(LanguageVaryMixin, SparseFieldsetQuerysetMixin, generics.ListAPIView):
     serializer_class = MenuItemSerializer
     filter_backends = [SearchFilter, OrderingFilter]
     search_fields = ['name', 'name_uz', 'name_ru']
@@ -355,9 +395,9 @@ class MenuItemByCategoryView(generics.ListAPIView):
         return MenuItem.objects.filter(category_id=category_id, available=True, is_active=True, category__is_active=True)
 
 
-@method_decorator(csrf_exempt, name='dispatch')
-class PromotionListView(generics.ListCreateAPIView):
-    queryset = Promotion.objects.filter(is_active=True)
+@method_decorator([csrf_exempt, versioned_cache_page(60 * 30, 'menu', params=('is_active', 'promotion_category', 'discount_type'))], name='dispatch')  # 30 daqiqa cache
+class PromotionListView(LanguageVaryMixin, SparseFieldsetQuerysetMixin, generics.ListCreateAPIView):
+    queryset = Promotion.objects.filter(is_live=True)
     serializer_class = PromotionSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['is_active', 'promotion_category', 'discount_type']
@@ -368,32 +408,68 @@ class PromotionListView(generics.ListCreateAPIView):
     parser_classes = (MultiPartParser, FormParser)
     
     def get_queryset(self):
-        """Return all promotions for admin, only active for public"""
+        """Return all promotions for admin, only running ones for public"""
         show_all = self.request.GET.get('show_all', 'false').lower() == 'true'
         if show_all:
             return Promotion.objects.all()
-        return Promotion.objects.filter(is_active=True)
+        # is_live is kept in sync with start/end dates by run_promotion_scheduler
+        return Promotion.objects.filter(is_live=True)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class PromotionDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PromotionDetailView(LanguageVaryMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Promotion.objects.all()
     serializer_class = PromotionSerializer
     permission_classes = [AllowAny]
     parser_classes = (MultiPartParser, FormParser)
 
 
-@method_decorator(cache_page(60 * 5), name='dispatch')  # 5 daqiqa cache
-class ReviewListView(generics.ListCreateAPIView):
+class QueuedSubmissionMixin:
+    """
+    Accept public POSTs into a bounded write-behind queue instead of
+    inserting inline. Submissions are rate limited per IP and session,
+    and the response is 202 because the row is written with the next batch.
+    """
+    throttle_classes = [SubmissionRateThrottle]
+    submission_queue = None
+    submission_defaults = {}
+    text_field = None
+    honeypot_field = 'website'  # Hidden in the form, only bots fill it in
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        instance = self.get_serializer_class().Meta.model(
+            **{**serializer.validated_data, **self.submission_defaults}
+        )
+        
+        # Spam is acknowledged like a normal submission but never stored
+        text = serializer.validated_data.get(self.text_field, '')
+        is_spam = request.data.get(self.honeypot_field) or is_duplicate_submission(request, text)
+        
+        if not is_spam and not self.submission_queue.add(instance):
+            # Nothing was stored, so the client's retry must not count as a duplicate
+            forget_submission(request, text)
+            return Response(
+                {'error': 'Too many submissions, please try again later'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(int(self.submission_queue.flush_interval) + 1)},
+            )
+        return Response(self.get_serializer(instance).data, status=status.HTTP_202_ACCEPTED)
+
+
+@method_decorator(versioned_cache_page(60 * 5, 'reviews'), name='dispatch')  # 5 daqiqa cache
+class ReviewListView(QueuedSubmissionMixin, generics.ListCreateAPIView):
     queryset = Review.objects.filter(approved=True, deleted=False)
     serializer_class = ReviewSerializer
     filter_backends = [OrderingFilter]
     ordering_fields = ['date', 'rating']
     ordering = ['-date']
-
-    def perform_create(self, serializer):
-        # Reviews are created with approved=False by default
-        serializer.save(approved=False)
+    submission_queue = review_queue
+    # Reviews are created with approved=False by default
+    submission_defaults = {'approved': False, 'deleted': False}
+    text_field = 'comment'
 
 
 class AdminReviewListView(generics.ListAPIView):
@@ -411,91 +487,57 @@ class ReviewDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ReviewSerializer
     permission_classes = [AllowAny]  # Allow admin operations
     
-    def update(self, request, *args, **kwargs):
-        """Update review and create action record"""
-        try:
-            # Get the review before update to check previous state
-            review = self.get_object()
-            was_approved = review.approved
-            
-            # Perform the update
-            response = super().update(request, *args, **kwargs)
-            
-            if response.status_code == 200:
-                # Refresh review from database to get updated values
-                review.refresh_from_db()
-                
-                # Get reason from query parameters or request data
-                reason = request.query_params.get('reason', '') or request.data.get('reason', '')
-                
-                # Create action record for state changes
-                try:
-                    if not was_approved and review.approved:
-                        # Review was approved
-                        ReviewAction.objects.create(
-                            review=review,
-                            action='approved',
-                            admin_user=request.META.get('HTTP_X_ADMIN_USER', 'admin'),
-                            reason=reason
-                        )
-                        print(f"Created approval action for review {review.id}")
-                    elif was_approved and not review.approved:
-                        # Review was rejected
-                        ReviewAction.objects.create(
-                            review=review,
-                            action='rejected',
-                            admin_user=request.META.get('HTTP_X_ADMIN_USER', 'admin'),
-                            reason=reason
-                        )
-                        print(f"Created rejection action for review {review.id}")
-                except Exception as action_error:
-                    print(f"Warning: Could not create ReviewAction: {action_error}")
-                    # Continue even if action record fails
-            
-            return response
-        except Exception as e:
-            import traceback
-            error_details = traceback.format_exc()
-            print(f"Error updating review: {error_details}")
-            return Response(
-                {'error': str(e), 'details': error_details}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+    def perform_update(self, serializer):
+        """Update review and record the approval state change in the audit log"""
+        was_approved = serializer.instance.approved
+        review = serializer.save()
+        
+        if was_approved != review.approved:
+            record_action(
+                review,
+                'approved' if review.approved else 'rejected',
+                admin_user=self.request.META.get('HTTP_X_ADMIN_USER', 'admin'),
+                reason=self._get_reason(),
             )
+            bump_cache_version('reviews')
+            logger.info("Review %s %s", review.id, 'approved' if review.approved else 'rejected')
     
-    def destroy(self, request, *args, **kwargs):
-        """Actually delete the review from database"""
-        try:
-            review = self.get_object()
-            review_id = review.id
-            
-            # Get reason from query parameters or request data
-            reason = request.query_params.get('reason', '') or request.data.get('reason', '')
-            
-            # Try to create action record before deleting
-            try:
-                ReviewAction.objects.create(
-                    review=review,
-                    action='deleted',
-                    admin_user=request.META.get('HTTP_X_ADMIN_USER', 'admin'),
-                    reason=reason
-                )
-            except Exception as action_error:
-                print(f"Warning: Could not create ReviewAction: {action_error}")
-                # Continue with deletion even if action record fails
-            
-            # Delete the review (this will cascade delete the ReviewAction)
-            review.delete()
-            print(f"Successfully deleted review {review_id}")
-            
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        except Exception as e:
-            import traceback
-            error_details = traceback.format_exc()
-            print(f"Error deleting review: {error_details}")
-            return Response(
-                {'error': str(e), 'details': error_details}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+    def perform_destroy(self, instance):
+        """
+        Mark the review as deleted instead of removing the row, so the
+        'deleted' ReviewAction keeps pointing at it (the FK is PROTECT).
+        """
+        moderate_reviews(
+            [instance.id],
+            'delete',
+            admin_user=self.request.META.get('HTTP_X_ADMIN_USER', 'admin'),
+            reason=self._get_reason(),
+        )
+        logger.info("Review %s deleted", instance.id)
+    
+    def _get_reason(self):
+        # Reason can come from query parameters or request data
+        return self.request.query_params.get('reason', '') or self.request.data.get('reason', '')
+
+
+class ReviewBulkModerationView(APIView):
+    """Approve, reject or delete many reviews with a single request (staff only)"""
+    permission_classes = [IsAdminUser]
+    
+    def post(self, request):
+        serializer = ReviewBulkActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        action = serializer.validated_data['action']
+        
+        review_ids = moderate_reviews(
+            serializer.validated_data['ids'],
+            action,
+            admin_user=request.user.get_username(),
+            reason=serializer.validated_data['reason'],
+        )
+        logger.info("Bulk %s applied to %d review(s)", action, len(review_ids))
+        
+        return Response({'action': action, 'updated': len(review_ids), 'ids': review_ids})
 
 
 class OrderListView(generics.ListCreateAPIView):
@@ -595,42 +637,41 @@ def menu_stats(request):
     return Response(stats)
 
 
-# Site Settings Views
-@method_decorator(never_cache, name='dispatch')
-class SiteSettingsView(generics.RetrieveAPIView):
-    queryset = SiteSettings.objects.all()
-    serializer_class = SiteSettingsSerializer
-    
-    def get_object(self):
-        # Always return the first (and only) instance
-        obj, created = SiteSettings.objects.get_or_create(
-            defaults={
-                'site_name': 'Tokyo Restaurant',
-                'site_name_uz': 'Tokyo Restoran',
-                'site_name_ru': 'Ресторан Tokyo',
-            }
-        )
-        return obj
+# Site Settings / Restaurant Info Views
+class ConfigSnapshotView(View):
+    """Serve a pre-rendered singleton config row; clients revalidate with If-None-Match"""
+    snapshot = None
+
+    def get(self, request, *args, **kwargs):
+        variants, etag = self.snapshot.get(request)
+        response = precompressed_response(request, variants)
+        response['ETag'] = etag
+        # max-age=0 also keeps the site-wide cache middleware from storing it
+        patch_cache_control(response, no_cache=True, max_age=0)
+        patch_language_vary(request, response)
+        return get_conditional_response(request, etag=etag, response=response)
 
 
+class SiteSettingsView(ConfigSnapshotView):
+    """API endpoint for site settings"""
+    snapshot = site_settings
 
 
-# Restaurant Info Views
-@method_decorator(never_cache, name='dispatch')
-class RestaurantInfoView(generics.RetrieveAPIView):
-    queryset = RestaurantInfo.objects.all()
-    serializer_class = RestaurantInfoSerializer
-    
-    def get_object(self):
-        # Always return the first (and only) instance
-        obj, created = RestaurantInfo.objects.get_or_create(
-            defaults={
-                'restaurant_name': 'Tokyo Restaurant',
-                'restaurant_name_uz': 'Tokyo Restoran',
-                'restaurant_name_ru': 'Ресторан Tokyo',
-            }
-        )
-        return obj
+class RestaurantInfoView(ConfigSnapshotView):
+    """API endpoint for restaurant information"""
+    snapshot = restaurant_info
+
+
+class BootstrapView(View):
+    """Everything the public site needs for its first paint, in one response"""
+
+    def get(self, request, *args, **kwargs):
+        variants, etag = get_bootstrap(request)
+        response = precompressed_response(request, variants)
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True, max_age=0)
+        patch_language_vary(request, response)
+        return get_conditional_response(request, etag=etag, response=response)
 
 
 # Cart Views
@@ -864,31 +905,7 @@ class CartManagementView(APIView):
 
 
 
-@method_decorator(cache_page(60 * 30), name='dispatch')  # 30 daqiqa cache  
-class SiteSettingsView(generics.RetrieveAPIView):
-    """API endpoint for site settings"""
-    queryset = SiteSettings.objects.all()
-    serializer_class = SiteSettingsSerializer
-    permission_classes = [AllowAny]
-    
-    def get_object(self):
-        obj, created = SiteSettings.objects.get_or_create(pk=1)
-        return obj
-
-
-@method_decorator(cache_page(60 * 30), name='dispatch')  # 30 daqiqa cache
-class RestaurantInfoView(generics.RetrieveAPIView):
-    """API endpoint for restaurant information"""
-    queryset = RestaurantInfo.objects.all()
-    serializer_class = RestaurantInfoSerializer
-    permission_classes = [AllowAny]
-    
-    def get_object(self):
-        obj, created = RestaurantInfo.objects.get_or_create(pk=1)
-        return obj
-
-
-class FeedbackListView(generics.ListCreateAPIView):
+class FeedbackListView(QueuedSubmissionMixin, generics.ListCreateAPIView):
     """API endpoint for feedback list and creation"""
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
@@ -898,6 +915,9 @@ class FeedbackListView(generics.ListCreateAPIView):
     search_fields = ['name', 'message']
     ordering_fields = ['created_at', 'rating']
     ordering = ['-created_at']
+    submission_queue = feedback_queue
+    submission_defaults = {'is_read': False}
+    text_field = 'message'
 
 
 class FeedbackDetailView(generics.RetrieveUpdateDestroyAPIView):
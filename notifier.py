@@ -0,0 +1,170 @@
+"""
+Telegram xabarlarini yuboruvchi dispatcher.
+
+Handlerlar guruh va foydalanuvchilarga xabarlarni ketma-ket
+``await bot.send_message`` bilan yuborardi, xatoda esa xuddi shu xabarni
+qayta yuborardi. Dispatcher:
+
+- bir vaqtdagi yuborishlar sonini cheklaydi (semaphore);
+- Telegram limitlariga token bucket bilan rioya qiladi: umumiy (~30/s) va
+  har bir guruh uchun alohida (20/min);
+- RetryAfter'da Telegram aytgan vaqtni kutadi, tarmoq/server xatolarida
+  eksponensial backoff bilan qayta urinadi;
+- qayta urinib bo'lmaydigan xatoda (masalan, rasm yuborilmadi) fallback
+  xabarni yuboradi.
+
+submit() xabarni fon vazifasi sifatida qo'yadi - handler Telegram javobini
+kutmaydi. bot obyekti tashqaridan beriladi, shuning uchun dispatcher'ni
+soxta (lokal) bot API bilan sinash mumkin.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from aiogram.exceptions import TelegramNetworkError, TelegramRetryAfter, TelegramServerError
+
+logger = logging.getLogger(__name__)
+
+
+# Telegram: bot uchun ~30 xabar/s, bitta guruhga 20 xabar/min
+GLOBAL_RATE = 30
+GROUP_RATE = 20 / 60
+GROUP_BURST = 5
+CONCURRENCY = 8
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+def _default_bot():
+    from bot.loader import bot
+    return bot
+
+
+class NotificationDispatcher:
+    def __init__(
+        self,
+        bot=None,
+        concurrency: int = CONCURRENCY,
+        global_rate: float = GLOBAL_RATE,
+        group_rate: float = GROUP_RATE,
+        group_burst: float = GROUP_BURST,
+        max_attempts: int = MAX_ATTEMPTS,
+        backoff_base: float = BACKOFF_BASE,
+        sleep: Callable[[float], Any] = asyncio.sleep,
+    ):
+        self._bot = bot
+        self.concurrency = concurrency
+        self.global_rate = global_rate
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self._sleep = sleep
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._global_bucket: Optional[TokenBucket] = None
+        self._group_buckets: Dict[Any, TokenBucket] = {}
+        self._tasks = set()
+
+    @property
+    def bot(self):
+        if self._bot is None:
+            self._bot = _default_bot()
+        return self._bot
+
+    def _limits(self):
+        # Event loop ichida yaratiladi
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._global_bucket = TokenBucket(self.global_rate, self.global_rate)
+        return self._semaphore, self._global_bucket
+
+    def _group_bucket(self, chat_id) -> Optional[TokenBucket]:
+        try:
+            is_group = int(chat_id) < 0
+        except (TypeError, ValueError):
+            # @username - kanal yoki guruh
+            is_group = True
+        if not is_group:
+            return None
+        bucket = self._group_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._group_buckets[chat_id] = TokenBucket(self.group_rate, self.group_burst)
+        return bucket
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(BACKOFF_CAP, self.backoff_base * 2 ** (attempt - 1))
+        return delay * (0.5 + random.random() / 2)
+
+    async def send(self, method: str, fallback: Optional[Tuple[str, dict]] = None, **kwargs):
+        """
+        bot.<method>(**kwargs) ni limitlar va qayta urinishlar bilan chaqirish.
+        Muvaffaqiyatsiz bo'lsa fallback=(method, kwargs) yuboriladi.
+        Natija - Telegram javobi yoki None.
+        """
+        semaphore, global_bucket = self._limits()
+        group_bucket = self._group_bucket(kwargs.get('chat_id'))
+
+        for attempt in range(1, self.max_attempts + 1):
+            if group_bucket is not None:
+                await group_bucket.acquire()
+            await global_bucket.acquire()
+            try:
+                async with semaphore:
+                    return await getattr(self.bot, method)(**kwargs)
+            except TelegramRetryAfter as e:
+                delay = e.retry_after
+            except (TelegramNetworkError, TelegramServerError) as e:
+                delay = self._backoff(attempt)
+                logger.warning("%s xatosi (%s/%s): %s", method, attempt, self.max_attempts, e)
+            except Exception as e:
+                logger.warning("%s yuborilmadi (chat %s): %s", method, kwargs.get('chat_id'), e)
+                break
+            if attempt < self.max_attempts:
+                await self._sleep(delay)
+        else:
+            logger.error("%s: %s urinishdan keyin ham yuborilmadi (chat %s)", method, self.max_attempts, kwargs.get('chat_id'))
+
+        if fallback is not None:
+            fallback_method, fallback_kwargs = fallback
+            return await self.send(fallback_method, **fallback_kwargs)
+        return None
+
+    def submit(self, method: str, fallback: Optional[Tuple[str, dict]] = None, **kwargs) -> asyncio.Task:
+        """send() ni fon vazifasi sifatida boshlash"""
+        task = asyncio.ensure_future(self.send(method, fallback=fallback, **kwargs))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def drain(self):
+        """Navbatdagi hamma yuborishlar tugashini kutish (to'xtashda va testlarda)"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+notifier = NotificationDispatcher()
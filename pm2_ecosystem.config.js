@@ -1,6 +1,7 @@
 // PM2 Ecosystem Config - Tokyo Kafe
 // ===================================
-// Frontend (Next.js) uchun PM2 konfiguratsiyasi
+// Frontend (Next.js) va backend fon jarayonlari uchun PM2 konfiguratsiyasi
+// (Gunicorn start_beget.sh orqali ishga tushadi)
 
 module.exports = {
   apps: [
@@ -30,6 +31,38 @@ module.exports = {
       // Monitoring
       listen_timeout: 10000,
       kill_timeout: 5000,
+    },
+    {
+      // Navbatdagi ishlar: rasm o'lchamlari/placeholderlar, kesh isitish
+      name: 'tokyo-runworker',
+      script: 'manage.py',
+      args: 'runworker',
+      cwd: '/home/u1234567/public_html/backend',
+      interpreter: '/home/u1234567/public_html/backend/venv/bin/python',
+      instances: 1,
+      exec_mode: 'fork',
+      watch: false,
+      max_memory_restart: '300M',
+      error_file: '/home/u1234567/public_html/logs/runworker-error.log',
+      out_file: '/home/u1234567/public_html/logs/runworker-out.log',
+      log_date_format: 'YYYY-MM-DD HH:mm:ss',
+      autorestart: true,
+    },
+    {
+      // Aksiyalarni start/end vaqtida yoqish va o'chirish (is_live)
+      name: 'tokyo-promotion-scheduler',
+      script: 'manage.py',
+      args: 'run_promotion_scheduler',
+      cwd: '/home/u1234567/public_html/backend',
+      interpreter: '/home/u1234567/public_html/backend/venv/bin/python',
+      instances: 1,  // Faqat bitta nusxa
+      exec_mode: 'fork',
+      watch: false,
+      max_memory_restart: '200M',
+      error_file: '/home/u1234567/public_html/logs/promotion-scheduler-error.log',
+      out_file: '/home/u1234567/public_html/logs/promotion-scheduler-out.log',
+      log_date_format: 'YYYY-MM-DD HH:mm:ss',
+      autorestart: true,
     }
   ],
 };
@@ -43,6 +76,8 @@ module.exports = {
 // Status:
 // pm2 status
 // pm2 logs tokyo-frontend
+// pm2 logs tokyo-runworker
+// pm2 logs tokyo-promotion-scheduler
 // pm2 monit
 // 
 // Restart:
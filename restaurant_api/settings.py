@@ -148,6 +148,17 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are named after their content hash (menu/storage.py), identical
+# files are stored once and nginx can cache them forever
+STORAGES = {
+    'default': {
+        'BACKEND': 'menu.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -235,6 +246,15 @@ CACHE_MIDDLEWARE_ALIAS = 'default'
 CACHE_MIDDLEWARE_SECONDS = 300  # 5 minutes
 CACHE_MIDDLEWARE_KEY_PREFIX = ''
 
+# Public review/feedback submissions: burst size and refill rate (tokens per second)
+# of the token bucket kept per IP and per session
+SUBMISSION_THROTTLE_BURST = 5
+SUBMISSION_THROTTLE_RATE = 1 / 60
+
+# Background jobs (python manage.py runworker): after a cache version bump the
+# public endpoints are re-rendered for these base URLs, e.g. ['https://api.tokyokafe.uz']
+CACHE_WARM_URLS = []
+
 # Performance settings
 CONN_MAX_AGE = 60  # Database connection pooling
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB max upload size
@@ -90,6 +90,14 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'simple',
         },
+        'dead_letter': {
+            'level': 'ERROR',
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': os.path.join(BASE_DIR, 'logs', 'dead_letter.log'),
+            'maxBytes': 1024*1024*15,  # 15MB
+            'backupCount': 10,
+            'formatter': 'verbose',
+        },
     },
     'root': {
         'handlers': ['console', 'file'],
@@ -101,6 +109,12 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        # Review/feedback/audit rows the background writers could not save
+        'menu.dead_letter': {
+            'handlers': ['dead_letter'],
+            'level': 'ERROR',
+            'propagate': False,
+        },
     },
 }
 
@@ -86,6 +86,28 @@ else
     echo -e "${YELLOW}⚠️  Statik fayllar yig'ishda xatolik${NC}"
 fi
 
+echo -e "\n${YELLOW}[5.7/6]${NC} Fon jarayonlarini ishga tushirish..."
+# runworker - navbatdagi ishlar (rasm o'lchamlari va placeholderlar, kesh isitish)
+# run_promotion_scheduler - aksiyalarni start/end vaqtida yoqish va o'chirish
+start_background() {
+    NAME=$1
+    PID_FILE="$PROJECT_DIR/$NAME.pid"
+    if [ -f "$PID_FILE" ] && kill -0 $(cat $PID_FILE) 2>/dev/null; then
+        echo -e "${YELLOW}$NAME ishlayapti (PID: $(cat $PID_FILE)), qayta ishga tushirilmoqda...${NC}"
+        kill $(cat $PID_FILE)
+        sleep 2
+    elif pgrep -f "manage.py $NAME" > /dev/null; then
+        # Boshqa joydan (masalan, PM2) ishga tushirilgan - ikkinchi nusxa kerak emas
+        echo -e "${GREEN}✅ $NAME allaqachon ishlayapti (PID: $(pgrep -f "manage.py $NAME" | tr '\n' ' '))${NC}"
+        return
+    fi
+    nohup python manage.py $NAME >> $LOGS_DIR/$NAME.log 2>&1 &
+    echo $! > $PID_FILE
+    echo -e "${GREEN}✅ $NAME ishga tushdi (PID: $!, log: $LOGS_DIR/$NAME.log)${NC}"
+}
+start_background runworker
+start_background run_promotion_scheduler
+
 echo -e "\n${YELLOW}[6/6]${NC} Gunicorn serverini ishga tushirish..."
 
 # Gunicorn ishga tushirish (daemon mode)
@@ -57,7 +57,16 @@ else
     echo -e "${RED}❌ Port 8000 bo'sh${NC}"
 fi
 
-echo -e "\n${YELLOW}[4] So'nggi error loglar (oxirgi 10 qator)...${NC}"
+echo -e "\n${YELLOW}[4] Fon jarayonlarini tekshirish...${NC}"
+for NAME in runworker run_promotion_scheduler; do
+    if pgrep -f "manage.py $NAME" > /dev/null; then
+        echo -e "${GREEN}✅ $NAME ISHLAYAPTI (PID: $(pgrep -f "manage.py $NAME" | tr '\n' ' '))${NC}"
+    else
+        echo -e "${RED}❌ $NAME ISHLAMAYAPTI - rasm o'lchamlari / aksiya jadvali yangilanmaydi${NC}"
+    fi
+done
+
+echo -e "\n${YELLOW}[5] So'nggi error loglar (oxirgi 10 qator)...${NC}"
 if [ -f "$LOGS_DIR/gunicorn_error.log" ]; then
     echo -e "${BLUE}----------------------------------------${NC}"
     tail -10 $LOGS_DIR/gunicorn_error.log
@@ -17,7 +17,7 @@ echo -e "${YELLOW}========================================${NC}"
 PROJECT_DIR="/root/tokyo/backend"
 GUNICORN_PID="$PROJECT_DIR/gunicorn.pid"
 
-echo -e "\n${YELLOW}[1/2]${NC} PID fayldan jarayonni to'xtatish..."
+echo -e "\n${YELLOW}[1/3]${NC} PID fayldan jarayonni to'xtatish..."
 if [ -f "$GUNICORN_PID" ]; then
     PID=$(cat $GUNICORN_PID)
     if kill -0 $PID 2>/dev/null; then
@@ -43,7 +43,7 @@ else
     echo -e "${YELLOW}PID fayl topilmadi${NC}"
 fi
 
-echo -e "\n${YELLOW}[2/2]${NC} Qolgan Gunicorn jarayonlarni tekshirish..."
+echo -e "\n${YELLOW}[2/3]${NC} Qolgan Gunicorn jarayonlarni tekshirish..."
 GUNICORN_PIDS=$(ps aux | grep 'gunicorn.*tokyo_restaurant' | grep -v grep | awk '{print $2}')
 
 if [ ! -z "$GUNICORN_PIDS" ]; then
@@ -57,6 +57,18 @@ else
     echo -e "${GREEN}✅ Qolgan jarayonlar yo'q${NC}"
 fi
 
+echo -e "\n${YELLOW}[3/3]${NC} Fon jarayonlarini to'xtatish (runworker, run_promotion_scheduler)..."
+for NAME in runworker run_promotion_scheduler; do
+    PID_FILE="$PROJECT_DIR/$NAME.pid"
+    if [ -f "$PID_FILE" ] && kill -0 $(cat $PID_FILE) 2>/dev/null; then
+        kill $(cat $PID_FILE)
+        echo -e "${GREEN}✅ $NAME to'xtatildi (PID: $(cat $PID_FILE))${NC}"
+    fi
+    rm -f $PID_FILE
+    # PID faylsiz ishga tushirilgan nusxalar
+    pkill -f "manage.py $NAME" 2>/dev/null
+done
+
 echo -e "\n${GREEN}========================================${NC}"
 echo -e "${GREEN}✅ BARCHA JARAYONLAR TO'XTATILDI${NC}"
 echo -e "${GREEN}========================================${NC}"
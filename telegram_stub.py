@@ -0,0 +1,115 @@
+"""
+Yuklama sinovlari uchun lokal Telegram Bot API o'rnini bosuvchi ASGI ilova.
+
+Har qanday /bot<token>/<method> so'roviga muvaffaqiyatli javob qaytaradi
+(sendMessage/sendPhoto uchun Message, getChatMember uchun a'zo va h.k.),
+ixtiyoriy kechikish bilan. Bot'ni unga yo'naltirish:
+
+    from aiogram.client.session.aiohttp import AiohttpSession
+    from aiogram.client.telegram import TelegramAPIServer
+
+    session = AiohttpSession(api=TelegramAPIServer.from_base('http://127.0.0.1:8082'))
+    bot = Bot(token, session=session)
+
+    uvicorn bot.telegram_stub:application --port 8082
+
+STUB_LATENCY (soniya) - har bir javobdan oldingi kechikish;
+/stats - metod bo'yicha chaqiruvlar soni.
+"""
+import asyncio
+import itertools
+import json
+import os
+import time
+from collections import Counter
+from urllib.parse import parse_qsl
+
+
+STUB_LATENCY = float(os.environ.get('STUB_LATENCY', 0.05))
+
+_message_ids = itertools.count(1)
+calls = Counter()
+
+
+def _chat(chat_id):
+    try:
+        chat_id = int(chat_id)
+    except (TypeError, ValueError):
+        return {'id': -1, 'type': 'channel', 'title': str(chat_id)}
+    if chat_id < 0:
+        return {'id': chat_id, 'type': 'supergroup', 'title': 'stub'}
+    return {'id': chat_id, 'type': 'private', 'first_name': 'stub'}
+
+
+def _message(params, **extra):
+    message = {
+        'message_id': next(_message_ids),
+        'date': int(time.time()),
+        'chat': _chat(params.get('chat_id')),
+    }
+    message.update(extra)
+    return message
+
+
+def _result(method: str, params: dict):
+    method = method.lower()
+    if method in ('sendmessage', 'editmessagetext'):
+        return _message(params, text=params.get('text', ''))
+    if method == 'sendphoto':
+        return _message(params, caption=params.get('caption', ''), photo=[
+            {'file_id': 'stub', 'file_unique_id': 'stub', 'width': 1, 'height': 1},
+        ])
+    if method == 'getchatmember':
+        return {'status': 'member', 'user': {'id': int(params.get('user_id', 0)), 'is_bot': False, 'first_name': 'stub'}}
+    if method == 'getme':
+        return {'id': 1, 'is_bot': True, 'first_name': 'stub', 'username': 'stub_bot'}
+    return True
+
+
+async def _read_params(scope, receive) -> dict:
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+    headers = dict(scope['headers'])
+    content_type = headers.get(b'content-type', b'').decode()
+    if content_type.startswith('application/json'):
+        return json.loads(body or b'{}')
+    if content_type.startswith('application/x-www-form-urlencoded'):
+        return dict(parse_qsl(body.decode()))
+    if content_type.startswith('multipart/form-data'):
+        # aiogram oddiy maydonlarni ham multipart bilan yuboradi
+        boundary = content_type.split('boundary=')[-1].encode()
+        params = {}
+        for part in body.split(b'--' + boundary):
+            head, _, value = part.partition(b'\r\n\r\n')
+            if b'name="' not in head:
+                continue
+            name = head.split(b'name="')[1].split(b'"')[0].decode()
+            params[name] = value.rstrip(b'\r\n').decode(errors='replace')
+        return params
+    return {}
+
+
+async def application(scope, receive, send):
+    if scope['type'] != 'http':
+        return
+    parts = scope['path'].strip('/').split('/')
+    if parts == ['stats']:
+        body = json.dumps(calls).encode()
+    else:
+        method = parts[-1] if parts and parts[0].startswith('bot') else ''
+        params = await _read_params(scope, receive)
+        calls[method] += 1
+        if STUB_LATENCY:
+            await asyncio.sleep(STUB_LATENCY)
+        body = json.dumps({'ok': True, 'result': _result(method, params)}).encode()
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': body})
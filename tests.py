@@ -0,0 +1,100 @@
+"""
+Bot testlari: buyurtmani qabul qilish va FSM saqlagich.
+
+Bot paketi (aiogram, set_main) bilan birga ishga tushiriladi; ular yo'q
+muhitda butun modul o'tkazib yuboriladi.
+"""
+import asyncio
+import os
+import tempfile
+import unittest
+
+from django.test import TestCase
+
+try:
+    from aiogram.fsm.storage.base import StorageKey
+    from set_main.models import CustomUser, Order
+    from .bot_queries import claim_order
+    from .fsm_storage import SQLiteStorage
+except ImportError as e:
+    raise unittest.SkipTest(f"Bot muhiti topilmadi: {e}")
+
+
+class ClaimOrderTests(TestCase):
+    def setUp(self):
+        client = CustomUser.objects.create(username='user_1', telegram_id=1, full_name='Mijoz', phone='')
+        self.order = Order.objects.create(
+            client=client, category='taxi', from_location='Toshkent', to_location='Samarqand',
+            date='2026-01-01', description='', passengers=2,
+        )
+        self.first = CustomUser.objects.create(username='user_2', telegram_id=2, full_name='Haydovchi 1', phone='', balls=5)
+        self.second = CustomUser.objects.create(username='user_3', telegram_id=3, full_name='Haydovchi 2', phone='', balls=5)
+
+    def test_second_driver_loses(self):
+        self.assertEqual(claim_order(self.order.pk, self.first.pk, 2, charge=True), 'accepted')
+        self.assertEqual(claim_order(self.order.pk, self.second.pk, 2, charge=True), 'already_accepted')
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.accepted_driver_id, self.first.pk)
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.balls, self.second.balls), (3, 5))
+
+    def test_insufficient_balls_rolls_back(self):
+        self.assertEqual(claim_order(self.order.pk, self.first.pk, 10, charge=True), 'insufficient_balls')
+
+        self.order.refresh_from_db()
+        self.assertNotEqual(self.order.status, 'accepted')
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.balls, 5)
+        # Buyurtma boshqa haydovchi uchun hali ochiq
+        self.assertEqual(claim_order(self.order.pk, self.second.pk, 2, charge=True), 'accepted')
+
+
+class SQLiteStorageTests(unittest.IsolatedAsyncioTestCase):
+    key = StorageKey(bot_id=1, chat_id=2, user_id=2)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'fsm.db')
+
+    async def open(self, **kwargs):
+        storage = SQLiteStorage(self.path, **kwargs)
+        self.addAsyncCleanup(storage.close)
+        return storage
+
+    async def test_state_survives_reopen(self):
+        storage = await self.open()
+        await storage.set_state(self.key, 'TaxiOrder:from_location')
+        await storage.set_data(self.key, {'passengers': 2})
+        await storage.close()
+
+        storage = await self.open()
+        self.assertEqual(await storage.get_state(self.key), 'TaxiOrder:from_location')
+        self.assertEqual(await storage.get_data(self.key), {'passengers': 2})
+
+    async def test_cleared_state_is_dropped(self):
+        storage = await self.open()
+        await storage.set_state(self.key, 'TaxiOrder:from_location')
+        await storage.flush()
+        await storage.set_state(self.key, None)
+        await storage.set_data(self.key, {})
+        self.assertEqual(storage._entries, {})
+        await storage.close()
+
+        storage = await self.open()
+        self.assertIsNone(await storage.get_state(self.key))
+        self.assertEqual(storage._entries, {})
+
+    async def test_expired_state_is_pruned(self):
+        storage = await self.open(state_ttl=0)
+        await storage.set_state(self.key, 'TaxiOrder:from_location')
+        await storage.flush()
+        await asyncio.sleep(0.01)
+        await storage.prune()
+        self.assertEqual(storage._entries, {})
+        await storage.close()
+
+        storage = await self.open()
+        self.assertIsNone(await storage.get_state(self.key))
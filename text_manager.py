@@ -1,55 +1,208 @@
 import json
+import logging
 import os
-from typing import Dict, Any
+import threading
+import time
+from string import Formatter
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 # JSON fayl yo'li
 JSON_FILE_PATH = os.path.join(os.path.dirname(__file__), 'uzb.json')
 
+# Fallback til
+FALLBACK_LANGUAGE = 'uz'
+
+# Botdagi tillar va JSON'dagi eski kodlar
+BOT_LANGUAGES = ('uz', 'ru', 'en', 'tj', 'kz')
+LANGUAGE_ALIASES = {'kk': 'kz'}
+
+# Fayl o'zgarganini tekshirish oralig'i (soniya)
+RELOAD_CHECK_INTERVAL = 2.0
+
 # Global text_manager obyekti
 text_manager = None
 
+
+def _placeholders(text: str) -> FrozenSet[str]:
+    """Shablondagi {nom} maydonlari"""
+    try:
+        return frozenset(field for _, field, _, _ in Formatter().parse(text) if field is not None)
+    except ValueError:
+        return frozenset()
+
+
+def _compile_entry(text: str) -> Tuple[str, str, FrozenSet[str]]:
+    """
+    (shablon, argumentsiz natija, maydonlar). Argumentsiz natija oldindan
+    hisoblanadi - ko'p chaqiruvlar kwargs'siz bo'ladi.
+    """
+    fields = _placeholders(text)
+    if '{' not in text and '}' not in text:
+        return text, text, fields
+    try:
+        plain = text.format()
+    except (KeyError, ValueError, IndexError):
+        plain = text
+    return text, plain, fields
+
+
 class TextManager:
     def __init__(self, json_file_path: str):
         self.json_file_path = json_file_path
-        self.texts = self._load_texts()
-    
-    def _load_texts(self) -> Dict[str, Dict[str, str]]:
-        """JSON faylidan matnlarni yuklash"""
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[], None]] = []
+        self._mtime = None
+        self._failed_mtime = None
+        self._next_check = 0.0
+        self._table: Dict[str, Dict[str, Tuple[str, str, FrozenSet[str]]]] = {}
+        self._missing_reported = set()
+        self.texts = self._load_texts() or {}
+        self._compile()
+
+    def _load_texts(self) -> Optional[Dict[str, Dict[str, str]]]:
+        """
+        JSON faylidan matnlarni yuklash. O'qib bo'lmasa (fayl yo'q, yarim
+        yozilgan yoki buzilgan JSON) None qaytaradi va _mtime o'zgarmaydi -
+        keyingi tekshiruvda yana urinib ko'riladi.
+        """
         try:
+            mtime = os.path.getmtime(self.json_file_path)
             with open(self.json_file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Xatolik: JSON fayl yuklanmadi: {e}")
-            return {}
-    
+                texts = json.load(f)
+            if not isinstance(texts, dict):
+                raise ValueError("JSON ildizi obyekt emas")
+        except (OSError, ValueError):
+            # Bir xil buzilgan faylni har tekshiruvda qayta logga yozmaslik
+            try:
+                failed_mtime = os.path.getmtime(self.json_file_path)
+            except OSError:
+                failed_mtime = -1.0
+            if failed_mtime != self._failed_mtime:
+                logger.exception("JSON fayl yuklanmadi: %s", self.json_file_path)
+            self._failed_mtime = failed_mtime
+            return None
+        for alias, language in LANGUAGE_ALIASES.items():
+            if alias in texts:
+                texts[language] = {**texts.pop(alias), **texts.get(language, {})}
+        self._mtime = mtime
+        self._failed_mtime = None
+        return texts
+
+    def _compile(self):
+        """
+        Har bir til uchun tekis jadval: fallback tildagi kalitlar oldindan
+        qo'shilgan, shablonlar tahlil qilingan.
+        """
+        fallback = {
+            key: _compile_entry(text)
+            for key, text in self.texts.get(FALLBACK_LANGUAGE, {}).items()
+        }
+        table = {FALLBACK_LANGUAGE: fallback}
+        for language, texts in self.texts.items():
+            if language == FALLBACK_LANGUAGE:
+                continue
+            compiled = dict(fallback)
+            compiled.update((key, _compile_entry(text)) for key, text in texts.items())
+            table[language] = compiled
+        self._table = table
+        self._missing_reported = set()
+
     def get_text(self, language: str, key: str, **kwargs) -> str:
         """Matnni olish va formatlash"""
-        # Fallback til
-        fallback_lang = 'uz'
-        
-        # Matnni olish
-        text = None
-        
-        # Avval berilgan tildan olish
-        if language in self.texts and key in self.texts[language]:
-            text = self.texts[language][key]
-        # Fallback tildan olish
-        elif fallback_lang in self.texts and key in self.texts[fallback_lang]:
-            text = self.texts[fallback_lang][key]
-        else:
+        if time.monotonic() >= self._next_check:
+            self.reload_if_changed()
+
+        entry = self._table.get(language, self._table.get(FALLBACK_LANGUAGE, {})).get(key)
+        if entry is None:
+            if key not in self._missing_reported:
+                self._missing_reported.add(key)
+                logger.warning("Matn topilmadi: %s (%s)", key, language)
             # Agar matn topilmasa, kalitni qaytarish
             return f"[{key}]"
-        
+
+        if not kwargs:
+            return entry[1]
         # Formatlash
         try:
-            return text.format(**kwargs)
-        except (KeyError, ValueError) as e:
+            return entry[0].format(**kwargs)
+        except (KeyError, ValueError, IndexError):
             # Agar formatlashda xatolik bo'lsa, oddiy matnni qaytarish
-            return text
-    
-    def reload_texts(self):
-        """Matnlarni qayta yuklash"""
-        self.texts = self._load_texts()
+            return entry[0]
+
+    def has_text(self, language: str, key: str) -> bool:
+        return key in self._table.get(language, self._table.get(FALLBACK_LANGUAGE, {}))
+
+    def add_reload_listener(self, callback: Callable[[], None]):
+        """Matnlar qayta yuklanganda chaqiriladigan funksiya (masalan, klaviatura keshini tozalash)"""
+        self._listeners.append(callback)
+
+    def reload_texts(self) -> bool:
+        """
+        Matnlarni qayta yuklash. Fayl o'qilmasa joriy matnlar va jadval
+        o'zgarishsiz qoladi va False qaytadi.
+        """
+        with self._lock:
+            self._next_check = time.monotonic() + RELOAD_CHECK_INTERVAL
+            texts = self._load_texts()
+            if texts is None:
+                return False
+            self.texts = texts
+            self._compile()
+        for callback in self._listeners:
+            callback()
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """JSON fayl o'zgargan bo'lsa (mtime bo'yicha) qayta yuklash"""
+        self._next_check = time.monotonic() + RELOAD_CHECK_INTERVAL
+        try:
+            mtime = os.path.getmtime(self.json_file_path)
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        if not self.reload_texts():
+            return False
+        logger.info("Matnlar qayta yuklandi: %s", self.json_file_path)
+        return True
+
+    def validation_report(self, languages=BOT_LANGUAGES) -> Dict[str, Dict[str, list]]:
+        """
+        Har bir til uchun fallback tilga nisbatan yo'q kalitlar va
+        {maydon}lari mos kelmaydigan kalitlar.
+        """
+        reference = {
+            key: _placeholders(text)
+            for key, text in self.texts.get(FALLBACK_LANGUAGE, {}).items()
+        }
+        report = {}
+        for language in languages:
+            texts = self.texts.get(language, {})
+            missing = sorted(key for key in reference if key not in texts)
+            placeholders = sorted(
+                key for key, text in texts.items()
+                if key in reference and _placeholders(text) != reference[key]
+            )
+            report[language] = {'missing': missing, 'placeholders': placeholders}
+        return report
+
+    def log_validation_report(self, languages=BOT_LANGUAGES):
+        """Tekshiruv natijasini logga yozish (bot ishga tushganda)"""
+        for language, problems in self.validation_report(languages).items():
+            if problems['missing']:
+                logger.warning(
+                    "%s: %d ta matn yo'q, '%s' ishlatiladi (%s...)",
+                    language, len(problems['missing']), FALLBACK_LANGUAGE,
+                    ', '.join(problems['missing'][:5]),
+                )
+            if problems['placeholders']:
+                logger.warning(
+                    "%s: {maydon}lari mos kelmaydigan matnlar: %s",
+                    language, ', '.join(problems['placeholders']),
+                )
+
 
 # Global text_manager obyektini yaratish
 def get_text_manager() -> TextManager:
@@ -58,7 +211,11 @@ def get_text_manager() -> TextManager:
         text_manager = TextManager(JSON_FILE_PATH)
     return text_manager
 
+
+text_manager = get_text_manager()
+
+
 # Qulaylik funksiyasi
 def get_text(language: str, key: str, **kwargs) -> str:
     """Matnni olish uchun qulaylik funksiyasi"""
-    return get_text_manager().get_text(language, key, **kwargs) 
\ No newline at end of file
+    return text_manager.get_text(language, key, **kwargs)
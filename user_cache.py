@@ -0,0 +1,106 @@
+"""
+Bot foydalanuvchi profillari keshi (jarayon ichida, TTL bilan).
+
+Deyarli har bir handler ish boshida CustomUser'ni telegram_id bo'yicha
+qayta o'qiydi (til, rol, ball uchun). Profil PROFILE_TTL soniya davomida
+xotiradan beriladi. Bot jarayonidagi har bir save/delete (post_save,
+post_delete) yozuvni darhol o'chiradi; queryset.update() bilan yozilganda
+invalidate()/invalidate_pk() chaqiriladi.
+
+Admin paneldagi o'zgarishlar (rol, ball) boshqa jarayonda bo'ladi va bu
+yerga signal kelmaydi. Shuning uchun rol/ballga qarab ruxsat beradigan
+handlerlar get(..., max_age=ROLE_TTL) bilan o'qiydi - bunday o'zgarish
+ko'pi bilan ROLE_TTL soniyada yetib keladi, til uchun PROFILE_TTL yetarli.
+Keshdagi obyekt eskirgan bo'lishi mumkin, shuning uchun uni
+save(update_fields=[...]) bilan saqlang - aks holda boshqa jarayonda
+o'zgargan ustunlar eski qiymat bilan qayta yoziladi.
+"""
+import copy
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from django.db.models.signals import post_delete, post_save
+
+from set_main.models import CustomUser
+
+from .db_executor import sync_to_async
+
+
+PROFILE_TTL = 60
+ROLE_TTL = 10
+MAX_PROFILES = 50000
+
+
+class UserProfileCache:
+    def __init__(self, ttl: float = PROFILE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # telegram_id -> (profil, yuklangan vaqti)
+        self._profiles: Dict[int, Tuple[CustomUser, float]] = {}
+        self._telegram_ids: Dict[int, int] = {}
+
+    def _cached(self, telegram_id: int, max_age: Optional[float] = None) -> Optional[CustomUser]:
+        entry = self._profiles.get(telegram_id)
+        age = min(self.ttl, max_age) if max_age is not None else self.ttl
+        if entry is None or entry[1] + age < time.monotonic():
+            return None
+        # Handler obyektni o'zgartirib save() qilishi mumkin - nusxa beramiz
+        return copy.copy(entry[0])
+
+    def put(self, user: CustomUser):
+        with self._lock:
+            if len(self._profiles) >= MAX_PROFILES:
+                self._profiles.clear()
+                self._telegram_ids.clear()
+            self._profiles[user.telegram_id] = (copy.copy(user), time.monotonic())
+            self._telegram_ids[user.pk] = user.telegram_id
+
+    def invalidate(self, telegram_id: int):
+        with self._lock:
+            self._profiles.pop(telegram_id, None)
+
+    def invalidate_pk(self, pk: int):
+        with self._lock:
+            telegram_id = self._telegram_ids.pop(pk, None)
+            if telegram_id is not None:
+                self._profiles.pop(telegram_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+            self._telegram_ids.clear()
+
+    async def get(self, telegram_id: int, max_age: Optional[float] = None) -> CustomUser:
+        """
+        CustomUser.objects.get(telegram_id=...) kabi, topilmasa DoesNotExist.
+        max_age berilsa keshdagi profil undan eski bo'lmasligi kerak.
+        """
+        user = self._cached(telegram_id, max_age)
+        if user is None:
+            user = await sync_to_async(CustomUser.objects.get)(telegram_id=telegram_id)
+            self.put(user)
+        return user
+
+    async def find(self, telegram_id: int, max_age: Optional[float] = None) -> Optional[CustomUser]:
+        """Topilmasa None (yangi foydalanuvchilar keshlanmaydi)"""
+        try:
+            return await self.get(telegram_id, max_age)
+        except CustomUser.DoesNotExist:
+            return None
+
+    async def language(self, telegram_id: int, default: str = 'uz') -> str:
+        user = await self.find(telegram_id)
+        return user.language if user and user.language else default
+
+
+user_profiles = UserProfileCache()
+
+
+def _invalidate_profile(sender, instance, **kwargs):
+    user_profiles.invalidate(instance.telegram_id)
+    user_profiles.invalidate_pk(instance.pk)
+
+
+post_save.connect(_invalidate_profile, sender=CustomUser, dispatch_uid='user_profiles_save')
+post_delete.connect(_invalidate_profile, sender=CustomUser, dispatch_uid='user_profiles_delete')
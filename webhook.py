@@ -0,0 +1,216 @@
+"""
+Botni webhook rejimida ishlatish uchun ASGI ilova.
+
+Long polling'da barcha update'lar bitta navbatda qayta ishlanadi. Bu ilova
+Telegram'dan kelgan update'ni darhol 200 bilan qabul qiladi va
+BOT_WEBHOOK_WORKERS ta ishchi vazifaga taqsimlaydi. Bitta chatning
+xabarlari doim bitta ishchiga tushadi (tartib saqlanadi), turli chatlar
+parallel qayta ishlanadi; callback_query'lar bosgan foydalanuvchi bo'yicha
+taqsimlanadi. ORM chaqiruvlari db_executor pool'ida bajariladi.
+
+Ishga tushirish (restaurant_api/asgi.py bilan yonma-yon, alohida jarayonda):
+
+    uvicorn bot.webhook:application --port 8081
+
+yoki boshqa ASGI ilova bilan bitta jarayonda:
+
+    application = mount(django_application, create_app(dp, bot), prefix='/bot/')
+
+Yuklama sinovi uchun bot'ni telegram_stub bilan ishlaydigan qilib yarating
+(BOT_API_SERVER=http://127.0.0.1:8082, qarang: telegram_stub).
+"""
+import asyncio
+import hmac
+import json
+import logging
+import os
+from typing import List, Optional
+
+from aiogram.types import Update
+
+from .notifier import notifier
+
+logger = logging.getLogger(__name__)
+
+
+WEBHOOK_PATH = os.environ.get('BOT_WEBHOOK_PATH', '/bot/webhook')
+WEBHOOK_URL = os.environ.get('BOT_WEBHOOK_URL', '')
+WEBHOOK_SECRET = os.environ.get('BOT_WEBHOOK_SECRET', '')
+WEBHOOK_WORKERS = int(os.environ.get('BOT_WEBHOOK_WORKERS', 16))
+# Har bir ishchi navbatining chegarasi; to'lsa 503 qaytadi va Telegram keyinroq qayta yuboradi
+WORKER_QUEUE_SIZE = int(os.environ.get('BOT_WEBHOOK_QUEUE_SIZE', 256))
+
+
+def _update_key(payload: dict) -> int:
+    """
+    Update qaysi ishchiga tushishini aniqlaydigan kalit. Xabarlar chat
+    bo'yicha (chat ichida tartib muhim), callback_query esa bosgan
+    foydalanuvchi bo'yicha: buyurtmalar guruhidagi "qabul qilish"
+    tugmalari turli haydovchilardan keladi va parallel ishlanishi kerak.
+    """
+    callback = payload.get('callback_query')
+    if callback:
+        return (callback.get('from') or {}).get('id', payload.get('update_id', 0))
+    for value in payload.values():
+        if not isinstance(value, dict):
+            continue
+        chat = value.get('chat')
+        if chat and 'id' in chat:
+            return chat['id']
+        user = value.get('from')
+        if user and 'id' in user:
+            return user['id']
+    return payload.get('update_id', 0)
+
+
+async def _respond(send, status: int, body: bytes = b''):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'text/plain'), (b'content-length', str(len(body)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+class BotWebhookApp:
+    def __init__(self, dispatcher=None, bot=None, path: str = WEBHOOK_PATH, secret: str = WEBHOOK_SECRET,
+                 workers: int = WEBHOOK_WORKERS, queue_size: int = WORKER_QUEUE_SIZE, webhook_url: str = WEBHOOK_URL):
+        self._dispatcher = dispatcher
+        self._bot = bot
+        self.path = path
+        self.secret = secret
+        self.workers = workers
+        self.queue_size = queue_size
+        self.webhook_url = webhook_url
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._started: Optional[asyncio.Lock] = None
+
+    def _resolve(self):
+        if self._dispatcher is None or self._bot is None:
+            from bot.loader import bot, dp
+            self._dispatcher = self._dispatcher or dp
+            self._bot = self._bot or bot
+        return self._dispatcher, self._bot
+
+    async def startup(self):
+        if self._tasks:
+            return
+        dispatcher, bot = self._resolve()
+        self._queues = [asyncio.Queue(self.queue_size) for _ in range(self.workers)]
+        self._tasks = [asyncio.ensure_future(self._worker(queue)) for queue in self._queues]
+        await dispatcher.emit_startup(bot=bot)
+        if self.webhook_url:
+            await bot.set_webhook(
+                self.webhook_url,
+                secret_token=self.secret or None,
+                allowed_updates=dispatcher.resolve_used_update_types(),
+                drop_pending_updates=False,
+            )
+        logger.info("Bot webhook: %d ta ishchi, %s", self.workers, self.path)
+
+    async def shutdown(self):
+        dispatcher, bot = self._resolve()
+        # Qabul qilingan update'larni tugatib olish
+        for queue in self._queues:
+            await queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await notifier.drain()
+        await dispatcher.emit_shutdown(bot=bot)
+        await dispatcher.storage.close()
+        await bot.session.close()
+
+    async def _worker(self, queue: asyncio.Queue):
+        dispatcher, bot = self._resolve()
+        while True:
+            payload = await queue.get()
+            try:
+                update = Update.model_validate(payload, context={'bot': bot})
+                await dispatcher.feed_update(bot, update)
+            except Exception:
+                logger.exception("Update %s qayta ishlanmadi", payload.get('update_id'))
+            finally:
+                queue.task_done()
+
+    async def _read_body(self, receive) -> bytes:
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                return body
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.startup()
+                except Exception as e:
+                    logger.exception("Bot webhook ishga tushmadi")
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http':
+            return
+
+        if scope['path'] != self.path:
+            return await _respond(send, 404)
+        if scope['method'] != 'POST':
+            return await _respond(send, 405)
+        if self.secret:
+            headers = dict(scope['headers'])
+            token = headers.get(b'x-telegram-bot-api-secret-token', b'').decode()
+            if not hmac.compare_digest(token, self.secret):
+                return await _respond(send, 403)
+
+        # Lifespan'siz serverlar uchun
+        if not self._tasks:
+            if self._started is None:
+                self._started = asyncio.Lock()
+            async with self._started:
+                await self.startup()
+
+        try:
+            payload = json.loads(await self._read_body(receive))
+        except ValueError:
+            return await _respond(send, 400)
+
+        queue = self._queues[hash(_update_key(payload)) % len(self._queues)]
+        try:
+            queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            return await _respond(send, 503)
+        await _respond(send, 200, b'ok')
+
+
+def create_app(dispatcher=None, bot=None, **kwargs) -> BotWebhookApp:
+    return BotWebhookApp(dispatcher, bot, **kwargs)
+
+
+def mount(app, bot_app: BotWebhookApp, prefix: str = '/bot/'):
+    """
+    Bot webhook'ini boshqa ASGI ilova (masalan, Django) bilan bitta jarayonda
+    ulash: prefix bilan boshlanadigan so'rovlar bot'ga, qolganlari app'ga.
+    """
+    async def router(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await bot_app(scope, receive, send)
+        if scope['type'] == 'http' and scope['path'].startswith(prefix):
+            return await bot_app(scope, receive, send)
+        return await app(scope, receive, send)
+    return router
+
+
+application = create_app()